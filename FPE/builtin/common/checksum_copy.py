@@ -0,0 +1,215 @@
+"""  Copy a file while computing its digest in the same pass.
+
+The digest is written to a sidecar file next to the destination in the
+coreutils "<digest>  <name>" format, so copies can be checked later with
+sha256sum -c / b2sum -c. A file moved on the same device needs no copy and is
+hashed with a single read.
+
+Optionally payloads are kept in a content-addressed store (.objects/ab/abcd...)
+and each destination is a hardlink to its object, so identical files are only
+stored once. An object with as many links as the filesystem allows is replaced
+by a fresh copy that later destinations link to.
+"""
+
+import os
+import uuid
+import errno
+import shutil
+import hashlib
+import pathlib
+from typing import Any
+
+from builtin.common.file_copy import STRATEGY_RENAME, same_device
+from core.error import FPEError
+
+# Digest algorithms that may be named in a handler config
+
+CHECKSUM_ALGORITHMS: tuple[str, ...] = ("blake2b", "blake2s", "sha256", "sha512")
+
+# Strategy names for hashed copies
+
+STRATEGY_HASHED_COPY: str = "hashed_copy"
+STRATEGY_DEDUPLICATED: str = "deduplicated"
+
+# Bytes read per block while copying and hashing
+
+CHECKSUM_BLOCK_SIZE: int = 1024 * 1024
+
+# Content-addressed store directory (under the destination)
+
+CONTENT_STORE: str = ".objects"
+
+
+class ChecksumCopyError(FPEError):
+    """An error occurred in a checksum copy."""
+
+    def __str__(self) -> str:
+        """Return string for exception.
+
+        Returns:
+            str: Exception string.
+        """
+
+        return FPEError.error_prefix("ChecksumCopy") + str(self.error)
+
+
+def _new_hash(algorithm: str) -> Any:
+    """Return new hash object for algorithm.
+
+    Raises:
+        ChecksumCopyError: Unsupported algorithm.
+    """
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        raise ChecksumCopyError(f"Unsupported checksum algorithm '{algorithm}'.")
+    return hashlib.new(algorithm)
+
+
+def file_digest(source_path: pathlib.Path, algorithm: str) -> str:
+    """Return hex digest of a file.
+
+    Args:
+        source_path (pathlib.Path): File.
+        algorithm (str): Digest algorithm.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = _new_hash(algorithm)
+    with open(source_path, "rb") as source:
+        while block := source.read(CHECKSUM_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hashed_copy(
+    source_path: pathlib.Path, destination_path: pathlib.Path, algorithm: str
+) -> str:
+    """Copy file (mode and times as well) returning the digest of the data copied.
+
+    Args:
+        source_path (pathlib.Path): Source file.
+        destination_path (pathlib.Path): Destination file.
+        algorithm (str): Digest algorithm.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = _new_hash(algorithm)
+    buffer: bytearray = bytearray(CHECKSUM_BLOCK_SIZE)
+    view: memoryview = memoryview(buffer)
+    destination_path.unlink(missing_ok=True)
+    with open(source_path, "rb") as source, open(destination_path, "wb") as destination:
+        while read := source.readinto(buffer):
+            digest.update(view[:read])
+            destination.write(view[:read])
+    shutil.copystat(source_path, destination_path)
+    return digest.hexdigest()
+
+
+def _copy_or_move(
+    source_path: pathlib.Path,
+    destination_path: pathlib.Path,
+    algorithm: str,
+    move: bool,
+    destination_device: int | None,
+) -> tuple[str, str]:
+    """Move file if it may be and is on the same device otherwise copy it; hashing it once.
+
+    Returns:
+        tuple[str, str]: Strategy used and hex digest.
+    """
+    if move and same_device(source_path, destination_path, destination_device):
+        os.replace(source_path, destination_path)
+        return STRATEGY_RENAME, file_digest(destination_path, algorithm)
+    return STRATEGY_HASHED_COPY, hashed_copy(source_path, destination_path, algorithm)
+
+
+def _link_object(
+    object_path: pathlib.Path, destination_path: pathlib.Path, content_store: pathlib.Path
+) -> None:
+    """Hardlink destination to a store object; replacing an object that is out of links.
+
+    Args:
+        object_path (pathlib.Path): Store object.
+        destination_path (pathlib.Path): Destination file.
+        content_store (pathlib.Path): Content-addressed store directory.
+    """
+    try:
+        os.link(object_path, destination_path)
+        return
+    except OSError as error:
+        if error.errno != errno.EMLINK:
+            raise
+    # Existing destinations keep the old inode; new ones link to the copy
+    fresh_path: pathlib.Path = content_store / f".{uuid.uuid4().hex}"
+    try:
+        shutil.copy2(object_path, fresh_path)
+        os.replace(fresh_path, object_path)
+    finally:
+        fresh_path.unlink(missing_ok=True)
+    os.link(object_path, destination_path)
+
+
+def write_sidecar(destination_path: pathlib.Path, algorithm: str, digest: str) -> None:
+    """Write digest of a file to its sidecar manifest (<file>.<algorithm>).
+
+    Args:
+        destination_path (pathlib.Path): File the digest is for.
+        algorithm (str): Digest algorithm.
+        digest (str): Hex digest.
+    """
+    sidecar_path: pathlib.Path = destination_path.with_name(
+        f"{destination_path.name}.{algorithm}"
+    )
+    sidecar_path.write_text(f"{digest}  {destination_path.name}\n", encoding="utf-8")
+
+
+def checksum_copy(
+    source_path: pathlib.Path,
+    destination_path: pathlib.Path,
+    algorithm: str,
+    move: bool = False,
+    destination_device: int | None = None,
+    content_store: pathlib.Path | None = None,
+) -> tuple[str, str]:
+    """Copy file computing its digest in the same pass and write the sidecar manifest.
+
+    Args:
+        source_path (pathlib.Path): Source file.
+        destination_path (pathlib.Path): Destination file (its directory must exist).
+        algorithm (str): Digest algorithm (one of CHECKSUM_ALGORITHMS).
+        move (bool, optional): Source may be moved as it is deleted afterwards. Defaults to False.
+        destination_device (int | None, optional): Device of destination directory if known. Defaults to None.
+        content_store (pathlib.Path | None, optional): Content-addressed store directory
+            on the destination filesystem (None to store the file directly). Defaults to None.
+
+    Returns:
+        tuple[str, str]: Strategy used and hex digest.
+    """
+
+    if content_store is None:
+        strategy, digest = _copy_or_move(
+            source_path, destination_path, algorithm, move, destination_device
+        )
+    else:
+        content_store.mkdir(parents=True, exist_ok=True)
+        staging_path: pathlib.Path = content_store / f".{uuid.uuid4().hex}"
+        try:
+            strategy, digest = _copy_or_move(
+                source_path, staging_path, algorithm, move, destination_device
+            )
+            object_path: pathlib.Path = content_store / digest[:2] / digest
+            if object_path.exists():
+                staging_path.unlink()
+                strategy = STRATEGY_DEDUPLICATED
+            else:
+                object_path.parent.mkdir(exist_ok=True)
+                os.replace(staging_path, object_path)
+        finally:
+            staging_path.unlink(missing_ok=True)
+        destination_path.unlink(missing_ok=True)
+        _link_object(object_path, destination_path, content_store)
+
+    write_sidecar(destination_path, algorithm, digest)
+
+    return strategy, digest
@@ -0,0 +1,411 @@
+"""  Import a large CSV file in parallel.
+
+The file is split into newline-aligned byte ranges that are parsed in a pool
+of worker processes. Each worker loads its range through its own connection
+into a staging table and the staging tables are then merged into the target
+table in file order, so a key repeated across ranges keeps its last value.
+Ranges are split on newlines; each worker counts the quote characters in its
+range and, should a range end inside a quoted field (an odd count of quotes
+before it), the import is abandoned before anything is merged so that the
+caller can import the file serially instead.
+"""
+
+import os
+import csv
+import uuid
+import sqlite3
+import pathlib
+import tempfile
+import multiprocessing
+from typing import Any, Iterator
+from concurrent.futures import ProcessPoolExecutor
+import mysql.connector
+
+from builtin.common import sql
+from builtin.common.csv_reader import CSVBatchReader, CSV_BATCH_SIZE
+from core.error import FPEError
+
+ByteRange = tuple[int, int]
+
+# Databases SQLite attaches at once by default (one staging database per range)
+
+SQLITE_MAX_ATTACHED: int = 10
+
+
+class CSVParallelImportError(FPEError):
+    """An error occurred in a parallel CSV import."""
+
+    def __str__(self) -> str:
+        """Return string for exception.
+
+        Returns:
+            str: Exception string.
+        """
+
+        return FPEError.error_prefix("CSVParallelImport") + str(self.error)
+
+
+class CSVParallelSplitError(CSVParallelImportError):
+    """A quoted field spans the boundary between two ranges of a parallel CSV import."""
+
+
+def split_ranges(csv_file: str, chunks: int) -> tuple[tuple[str, ...], list[ByteRange]]:
+    """Read CSV header and split the rest of the file into newline-aligned byte ranges.
+
+    Args:
+        csv_file (str): CSV file name.
+        chunks (int): Number of ranges wanted.
+
+    Returns:
+        tuple[tuple[str, ...], list[ByteRange]]: Field names and (start, end) byte ranges.
+    """
+    size: int = os.path.getsize(csv_file)
+    with open(csv_file, "rb") as file_handle:
+        header: bytes = file_handle.readline()
+        fieldnames: tuple[str, ...] = tuple(
+            next(csv.reader([header.decode("utf-8")]), ())
+        )
+        boundaries: list[int] = [len(header)]
+        for chunk in range(1, max(chunks, 1)):
+            file_handle.seek(len(header) + chunk * (size - len(header)) // chunks)
+            file_handle.readline()
+            if file_handle.tell() > boundaries[-1]:
+                boundaries.append(file_handle.tell())
+        if size > boundaries[-1]:
+            boundaries.append(size)
+    return fieldnames, list(zip(boundaries, boundaries[1:]))
+
+
+def read_lines(csv_file: str, byte_range: ByteRange) -> Iterator[str]:
+    """Yield the lines of a byte range of a file.
+
+    Args:
+        csv_file (str): CSV file name.
+        byte_range (ByteRange): Start and end of range.
+
+    Yields:
+        Iterator[str]: File line.
+    """
+    start, end = byte_range
+    with open(csv_file, "rb") as file_handle:
+        file_handle.seek(start)
+        for line in file_handle:
+            if start >= end:
+                break
+            start += len(line)
+            yield line.decode("utf-8")
+
+
+class _QuoteCounter:
+    """Count the quote characters in the lines passed through it."""
+
+    def __init__(self, lines: Iterator[str]) -> None:
+        self.__lines: Iterator[str] = lines
+        self.quotes: int = 0
+
+    def __iter__(self) -> Iterator[str]:
+        for line in self.__lines:
+            self.quotes += line.count('"')
+            yield line
+
+
+def check_boundaries(quotes: list[int]) -> None:
+    """Check that no range ends inside a quoted field.
+
+    Args:
+        quotes (list[int]): Quote characters in each range (in file order).
+
+    Raises:
+        CSVParallelSplitError: A quoted field spans a range boundary.
+    """
+    total: int = 0
+    for index, count in enumerate(quotes[:-1]):
+        total += count
+        if total % 2:
+            raise CSVParallelSplitError(
+                f"Quoted field spans the end of range {index}; file not split."
+            )
+
+
+def _stage_sqlite(
+    csv_file: str,
+    byte_range: ByteRange,
+    staging_file: str,
+    fieldnames: tuple[str, ...],
+    batch_size: int,
+    statement_rows: int,
+    converters: dict[str, str],
+) -> tuple[int, int]:
+    """Load a byte range of a CSV file into a staging SQLite database (worker process).
+
+    Returns:
+        tuple[int, int]: Number of rows staged and quote characters in range.
+    """
+    try:
+        rows: int = 0
+        lines = _QuoteCounter(read_lines(csv_file, byte_range))
+        staging = sqlite3.connect(staging_file)
+        try:
+            # Staging data is thrown away so needs no journal or syncing
+            staging.execute("PRAGMA journal_mode = OFF")
+            staging.execute("PRAGMA synchronous = OFF")
+            staging.execute(f"CREATE TABLE stage ({','.join(fieldnames)})")
+            for batch in CSVBatchReader(lines, batch_size, converters, fieldnames):
+                rows += sql.write_rows(
+                    staging, sql.DIALECT_SQLITE, "stage", "", fieldnames, batch, statement_rows
+                )
+            staging.commit()
+        finally:
+            staging.close()
+        return rows, lines.quotes
+    except (OSError, ValueError, sqlite3.Error) as error:
+        raise CSVParallelImportError(str(error)) from None
+
+
+def _stage_mysql(
+    connection: dict[str, Any],
+    csv_file: str,
+    byte_range: ByteRange,
+    table_name: str,
+    staging_table: str,
+    key_name: str,
+    fieldnames: tuple[str, ...],
+    batch_size: int,
+    statement_rows: int,
+    converters: dict[str, str],
+) -> tuple[int, int]:
+    """Load a byte range of a CSV file into a MySQL staging table (worker process).
+
+    Returns:
+        tuple[int, int]: Number of rows staged and quote characters in range.
+    """
+    try:
+        rows: int = 0
+        lines = _QuoteCounter(read_lines(csv_file, byte_range))
+        database = mysql.connector.connect(**connection)
+        try:
+            cursor = database.cursor(prepared=True)
+            cursor.execute(f"CREATE TABLE `{staging_table}` LIKE `{table_name}`")
+            for batch in CSVBatchReader(lines, batch_size, converters, fieldnames):
+                rows += sql.write_rows(
+                    cursor,
+                    sql.DIALECT_MYSQL,
+                    staging_table,
+                    key_name,
+                    fieldnames,
+                    batch,
+                    statement_rows,
+                )
+            database.commit()
+            cursor.close()
+        finally:
+            database.close()
+        return rows, lines.quotes
+    except mysql.connector.Error as error:
+        raise CSVParallelImportError(error.msg) from None
+    except (OSError, ValueError) as error:
+        raise CSVParallelImportError(str(error)) from None
+
+
+def _process_pool(workers: int) -> ProcessPoolExecutor:
+    """Create import worker process pool (spawned as the caller is multi-threaded).
+
+    Args:
+        workers (int): Number of worker processes.
+
+    Returns:
+        ProcessPoolExecutor: Worker process pool.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def import_sqlite(
+    database: sqlite3.Connection,
+    database_file: str,
+    csv_file: str,
+    table_name: str,
+    key_name: str,
+    workers: int,
+    batch_size: int = CSV_BATCH_SIZE,
+    statement_rows: int = sql.STATEMENT_ROWS,
+    converters: dict[str, str] | None = None,
+) -> int:
+    """Import CSV file into SQLite table in parallel, merging in a single transaction.
+
+    The file is split into at most SQLITE_MAX_ATTACHED ranges so that every staging
+    database can be attached for the merge.
+
+    Args:
+        database (sqlite3.Connection): Target database connection.
+        database_file (str): Target database file (staging files are created alongside).
+        csv_file (str): CSV file name.
+        table_name (str): Target table name.
+        key_name (str): Key column name ("" to only insert).
+        workers (int): Number of worker processes.
+        batch_size (int, optional): Rows read per batch. Defaults to CSV_BATCH_SIZE.
+        statement_rows (int, optional): Rows per statement. Defaults to sql.STATEMENT_ROWS.
+        converters (dict[str, str] | None, optional): Column converters. Defaults to None.
+
+    Raises:
+        CSVParallelSplitError: A quoted field spans a range boundary (nothing merged).
+
+    Returns:
+        int: Number of rows imported.
+    """
+    fieldnames, byte_ranges = split_ranges(
+        csv_file, min(workers, SQLITE_MAX_ATTACHED)
+    )
+    if not byte_ranges:
+        return 0
+    if (
+        sql.generate_merge(
+            sql.DIALECT_SQLITE, table_name, key_name, fieldnames, "stage"
+        )
+        == ""
+    ):
+        return 0
+
+    with tempfile.TemporaryDirectory(
+        dir=pathlib.Path(database_file).absolute().parent
+    ) as staging_directory:
+        staging_files: list[str] = [
+            str(pathlib.Path(staging_directory) / f"stage{index}.sqlite")
+            for index in range(len(byte_ranges))
+        ]
+        with _process_pool(workers) as pool:
+            staged = [
+                pool.submit(
+                    _stage_sqlite,
+                    csv_file,
+                    byte_range,
+                    staging_file,
+                    fieldnames,
+                    batch_size,
+                    statement_rows,
+                    converters or {},
+                )
+                for byte_range, staging_file in zip(byte_ranges, staging_files)
+            ]
+            results: list[tuple[int, int]] = [future.result() for future in staged]
+        check_boundaries([quotes for _, quotes in results])
+
+        # Merge in file order so later rows win; a database cannot be attached
+        # or detached inside a transaction so all are attached first
+
+        attached: list[str] = []
+        try:
+            for index, staging_file in enumerate(staging_files):
+                database.execute(
+                    f"ATTACH DATABASE ? AS staging{index}", (staging_file,)
+                )
+                attached.append(f"staging{index}")
+            try:
+                for schema in attached:
+                    database.execute(
+                        sql.generate_merge(
+                            sql.DIALECT_SQLITE,
+                            table_name,
+                            key_name,
+                            fieldnames,
+                            f"{schema}.stage",
+                        )
+                    )
+                database.commit()
+            except sqlite3.Error:
+                database.rollback()
+                raise
+        finally:
+            for schema in attached:
+                database.execute(f"DETACH DATABASE {schema}")
+
+    return sum(rows for rows, _ in results)
+
+
+def import_mysql(
+    database: Any,
+    connection: dict[str, Any],
+    csv_file: str,
+    table_name: str,
+    key_name: str,
+    workers: int,
+    batch_size: int = CSV_BATCH_SIZE,
+    statement_rows: int = sql.STATEMENT_ROWS,
+    converters: dict[str, str] | None = None,
+) -> int:
+    """Import CSV file into MySQL table in parallel; the merge is committed here.
+
+    DROP TABLE commits implicitly in MySQL, so the merge is committed (or rolled
+    back on error) before the staging tables are dropped.
+
+    Args:
+        database (Any): Target database connection.
+        connection (dict[str, Any]): Connection parameters for worker connections.
+        csv_file (str): CSV file name.
+        table_name (str): Target table name.
+        key_name (str): Key column name ("" to only insert).
+        workers (int): Number of worker processes.
+        batch_size (int, optional): Rows read per batch. Defaults to CSV_BATCH_SIZE.
+        statement_rows (int, optional): Rows per statement. Defaults to sql.STATEMENT_ROWS.
+        converters (dict[str, str] | None, optional): Column converters. Defaults to None.
+
+    Raises:
+        CSVParallelSplitError: A quoted field spans a range boundary (nothing merged).
+
+    Returns:
+        int: Number of rows imported.
+    """
+    fieldnames, byte_ranges = split_ranges(csv_file, workers)
+    if not byte_ranges:
+        return 0
+
+    staging_prefix: str = f"{table_name}_stage_{uuid.uuid4().hex[:8]}_"
+    staging_tables: list[str] = [
+        f"{staging_prefix}{index}" for index in range(len(byte_ranges))
+    ]
+    cursor = database.cursor()
+    try:
+        with _process_pool(workers) as pool:
+            staged = [
+                pool.submit(
+                    _stage_mysql,
+                    connection,
+                    csv_file,
+                    byte_range,
+                    table_name,
+                    staging_table,
+                    key_name,
+                    fieldnames,
+                    batch_size,
+                    statement_rows,
+                    converters or {},
+                )
+                for byte_range, staging_table in zip(byte_ranges, staging_tables)
+            ]
+            results: list[tuple[int, int]] = [future.result() for future in staged]
+        check_boundaries([quotes for _, quotes in results])
+
+        # Merge in file order so later rows win
+
+        try:
+            for staging_table in staging_tables:
+                cursor.execute(
+                    sql.generate_merge(
+                        sql.DIALECT_MYSQL,
+                        table_name,
+                        key_name,
+                        fieldnames,
+                        f"`{staging_table}`",
+                    )
+                )
+            database.commit()
+        except mysql.connector.Error:
+            database.rollback()
+            raise
+    finally:
+        for staging_table in staging_tables:
+            cursor.execute(f"DROP TABLE IF EXISTS `{staging_table}`")
+        cursor.close()
+
+    return sum(rows for rows, _ in results)
@@ -0,0 +1,141 @@
+"""  Stream CSV file rows as fixed-size batches of tuples.
+
+The header is read once and rows are returned as positional tuples (in header
+order) rather than a dict per row, so memory is bounded by the batch size and
+rows map straight on to positional SQL parameters. Blank lines are skipped
+and short rows are padded with None (missing values are inserted as NULL) so
+every tuple has a value for each field; a row with too many fields is an error.
+"""
+
+import csv
+import itertools
+from typing import Any, Callable, Iterable, Iterator
+
+from core.error import FPEError
+
+Converter = Callable[[str], Any]
+
+# Default number of rows in each batch
+
+CSV_BATCH_SIZE: int = 10000
+
+# Column converters that may be named in a handler config
+
+CSV_CONVERTERS: dict[str, Converter] = {"str": str, "int": int, "float": float}
+
+
+class CSVBatchReaderError(FPEError):
+    """An error occurred in the CSV batch reader."""
+
+    def __str__(self) -> str:
+        """Return string for exception.
+
+        Returns:
+            str: Exception string.
+        """
+
+        return FPEError.error_prefix("CSVBatchReader") + str(self.error)
+
+
+class CSVBatchReader:
+    """Read a CSV file as batches of row tuples."""
+
+    def __init__(
+        self,
+        file_handle: Iterable[str],
+        batch_size: int = CSV_BATCH_SIZE,
+        converters: dict[str, str | Converter] | None = None,
+        fieldnames: tuple[str, ...] | None = None,
+    ) -> None:
+        """Initialise CSV batch reader and read header.
+
+        Args:
+            file_handle (Iterable[str]): Open CSV file (or any iterable of its lines).
+            batch_size (int, optional): Rows per batch. Defaults to CSV_BATCH_SIZE.
+            converters (dict[str, str | Converter] | None, optional): Column name to converter
+                (or converter name from CSV_CONVERTERS); an empty value converts to None. Defaults to None.
+            fieldnames (tuple[str, ...] | None, optional): Field names when the file has
+                no header line (part of a file). Defaults to None.
+
+        Raises:
+            CSVBatchReaderError: Unknown converter.
+        """
+
+        self.__csv_reader = csv.reader(file_handle)
+        self.__batch_size: int = max(batch_size, 1)
+        self.fieldnames: tuple[str, ...] = (
+            fieldnames
+            if fieldnames is not None
+            else tuple(next(self.__csv_reader, ()))
+        )
+
+        # Map converters to column positions once
+
+        self.__converters: list[tuple[int, Converter]] = []
+        for column, converter in (converters or {}).items():
+            if column not in self.fieldnames:
+                continue
+            if isinstance(converter, str):
+                if converter not in CSV_CONVERTERS:
+                    raise CSVBatchReaderError(f"Unknown converter '{converter}'.")
+                converter = CSV_CONVERTERS[converter]
+            self.__converters.append((self.fieldnames.index(column), converter))
+
+    def __fit(self, row: list) -> list:
+        """Pad a short row with None so it has a value for every field.
+
+        Args:
+            row (list): CSV row.
+
+        Raises:
+            ValueError: Row has more values than there are fields.
+
+        Returns:
+            list: Row with a value for every field.
+        """
+        if len(row) > len(self.fieldnames):
+            raise ValueError(
+                f"Line {self.__csv_reader.line_num} has {len(row)} values "
+                f"for {len(self.fieldnames)} fields."
+            )
+        return row + [None] * (len(self.fieldnames) - len(row))
+
+    def __rows(self) -> Iterator[list]:
+        """Yield CSV rows skipping blank lines and padding short rows.
+
+        Yields:
+            Iterator[list]: CSV row.
+        """
+        fields: int = len(self.fieldnames)
+        for row in self.__csv_reader:
+            if len(row) == fields:
+                yield row
+            elif row:
+                yield self.__fit(row)
+
+    def __convert(self, row: list) -> tuple:
+        """Apply column converters to a row.
+
+        Args:
+            row (list): CSV row.
+
+        Returns:
+            tuple: Converted row.
+        """
+        for column, converter in self.__converters:
+            row[column] = converter(row[column]) if row[column] else None
+        return tuple(row)
+
+    def __iter__(self) -> Iterator[list[tuple]]:
+        """Yield batches of row tuples.
+
+        Raises:
+            ValueError: A row has more values than there are fields (or fails conversion).
+
+        Yields:
+            Iterator[list[tuple]]: Batch of rows.
+        """
+        convert: Callable[[list], tuple] = self.__convert if self.__converters else tuple
+        rows: Iterator[list] = self.__rows()
+        while batch := list(map(convert, itertools.islice(rows, self.__batch_size))):
+            yield batch
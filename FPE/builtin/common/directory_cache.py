@@ -0,0 +1,72 @@
+"""  Least recently used cache of directories known to exist.
+
+Lets a handler skip the exists()/mkdir() calls for a destination directory
+it has already created or seen, which on NFS cost more than a small copy.
+The device of each directory is kept too so a same-device check needs no
+extra stat. The cache should be invalidated whenever an operation in a
+cached directory fails, as the directory may have been removed behind it.
+"""
+
+import os
+import pathlib
+from collections import OrderedDict
+from threading import Lock
+
+# Default number of directories remembered
+
+DIRECTORY_CACHE_SIZE: int = 4096
+
+
+class DirectoryCache:
+    """LRU cache of existing directories and their devices."""
+
+    def __init__(self, size: int = DIRECTORY_CACHE_SIZE) -> None:
+        """Initialise directory cache.
+
+        Args:
+            size (int, optional): Directories remembered (0 disables caching). Defaults to DIRECTORY_CACHE_SIZE.
+        """
+        self.size: int = max(size, 0)
+        self.__directories: OrderedDict[str, int] = OrderedDict()
+        self.__lock: Lock = Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def ensure(self, directory_path: pathlib.Path) -> int:
+        """Make sure directory exists; creating it (and its parents) if it is not cached.
+
+        Args:
+            directory_path (pathlib.Path): Directory path.
+
+        Returns:
+            int: Device the directory is on.
+        """
+        key: str = str(directory_path)
+        with self.__lock:
+            device: int | None = self.__directories.get(key)
+            if device is not None:
+                self.__directories.move_to_end(key)
+                self.hits += 1
+                return device
+            self.misses += 1
+        os.makedirs(directory_path, exist_ok=True)
+        device = os.stat(directory_path).st_dev
+        if self.size > 0:
+            with self.__lock:
+                self.__directories[key] = device
+                if len(self.__directories) > self.size:
+                    self.__directories.popitem(last=False)
+        return device
+
+    def invalidate(self) -> None:
+        """Forget all cached directories."""
+        with self.__lock:
+            self.__directories.clear()
+
+    def __len__(self) -> int:
+        """Return number of cached directories.
+
+        Returns:
+            int: Cached directories.
+        """
+        return len(self.__directories)
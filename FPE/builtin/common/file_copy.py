@@ -0,0 +1,280 @@
+"""  Copy (or move) a file using the cheapest strategy the filesystem allows.
+
+Strategies are tried in order until one succeeds:
+
+    rename           Source is to be deleted and is on the destination device.
+    hardlink         Requested and the source is on the destination device.
+    reflink          Copy-on-write clone (FICLONE) on btrfs/XFS/bcachefs etc.
+    sparse           Source has holes; only its data extents are copied.
+    copy_file_range  In-kernel copy (may be offloaded by NFS/SMB servers).
+    sendfile         In-kernel copy on kernels without copy_file_range.
+    copy             Buffered user space copy.
+
+Data copies keep the source permission bits and times as shutil.copy2 does.
+"""
+
+import os
+import sys
+import errno
+import shutil
+import pathlib
+
+from core.error import FPEError
+
+# Names of the copy strategies
+
+STRATEGY_RENAME: str = "rename"
+STRATEGY_HARDLINK: str = "hardlink"
+STRATEGY_REFLINK: str = "reflink"
+STRATEGY_SPARSE: str = "sparse"
+STRATEGY_COPY_FILE_RANGE: str = "copy_file_range"
+STRATEGY_SENDFILE: str = "sendfile"
+STRATEGY_COPY: str = "copy"
+
+# Strategy selection modes that may be named in a handler config
+
+COPY_AUTO: str = "auto"
+COPY_MODES: tuple[str, ...] = (COPY_AUTO, STRATEGY_HARDLINK, STRATEGY_COPY)
+
+# Linux ioctl that clones one file's extents into another
+
+FICLONE: int = 0x40049409
+
+# Bytes requested per in-kernel copy call
+
+COPY_CHUNK_SIZE: int = 1 << 30
+
+# Errors meaning a fast path is not available here (rather than a failed copy)
+
+_UNSUPPORTED: frozenset[int] = frozenset(
+    code
+    for code in (
+        getattr(errno, "EXDEV", None),
+        getattr(errno, "EINVAL", None),
+        getattr(errno, "ENOSYS", None),
+        getattr(errno, "ENOTTY", None),
+        getattr(errno, "EOPNOTSUPP", None),
+        getattr(errno, "ENOTSUP", None),
+        getattr(errno, "EBADF", None),
+        getattr(errno, "EPERM", None),
+        getattr(errno, "EMLINK", None),
+    )
+    if code is not None
+)
+
+
+class FileCopyError(FPEError):
+    """An error occurred in a file copy."""
+
+    def __str__(self) -> str:
+        """Return string for exception.
+
+        Returns:
+            str: Exception string.
+        """
+
+        return FPEError.error_prefix("FileCopy") + str(self.error)
+
+
+def same_device(
+    source_path: pathlib.Path,
+    destination_path: pathlib.Path,
+    destination_device: int | None = None,
+) -> bool:
+    """Return true if source file is on the device of the destination directory.
+
+    Args:
+        source_path (pathlib.Path): Source file.
+        destination_path (pathlib.Path): Destination file.
+        destination_device (int | None, optional): Destination directory device if known. Defaults to None.
+
+    Returns:
+        bool: Same device.
+    """
+    if destination_device is None:
+        destination_device = destination_path.parent.stat().st_dev
+    return source_path.stat().st_dev == destination_device
+
+
+def _reflink(source_fd: int, destination_fd: int) -> bool:
+    """Clone source extents into destination.
+
+    Returns:
+        bool: True if cloned.
+    """
+    if sys.platform != "linux":
+        return False
+    import fcntl  # pylint: disable=import-outside-toplevel
+
+    try:
+        fcntl.ioctl(destination_fd, FICLONE, source_fd)
+        return True
+    except OSError as error:
+        if error.errno in _UNSUPPORTED:
+            return False
+        raise
+
+
+def _kernel_copy(source_fd: int, destination_fd: int, offset: int, length: int) -> str:
+    """Copy a byte range in the kernel with copy_file_range falling back to sendfile.
+
+    A call copying nothing before the end of the range (some filesystems only
+    copy part of a file in the kernel) hands the rest of the range on to the
+    next strategy.
+
+    Returns:
+        str: Strategy used ("" if the range could not be copied in the kernel).
+    """
+    end: int = offset + length
+    if hasattr(os, "copy_file_range"):
+        try:
+            while offset < end:
+                copied: int = os.copy_file_range(
+                    source_fd,
+                    destination_fd,
+                    min(end - offset, COPY_CHUNK_SIZE),
+                    offset,
+                    offset,
+                )
+                if copied == 0:
+                    break
+                offset += copied
+            if offset >= end:
+                return STRATEGY_COPY_FILE_RANGE
+        except OSError as error:
+            if error.errno not in _UNSUPPORTED:
+                raise
+    if hasattr(os, "sendfile") and sys.platform == "linux":
+        try:
+            os.lseek(destination_fd, offset, os.SEEK_SET)
+            while offset < end:
+                sent: int = os.sendfile(
+                    destination_fd, source_fd, offset, min(end - offset, COPY_CHUNK_SIZE)
+                )
+                if sent == 0:
+                    break
+                offset += sent
+            if offset >= end:
+                return STRATEGY_SENDFILE
+        except OSError as error:
+            if error.errno not in _UNSUPPORTED:
+                raise
+    return ""
+
+
+def _data_extents(source_fd: int, size: int) -> list[tuple[int, int]]:
+    """Return (offset, length) of each data extent of a file with holes.
+
+    Returns:
+        list[tuple[int, int]]: Data extents.
+    """
+    extents: list[tuple[int, int]] = []
+    offset: int = 0
+    while offset < size:
+        try:
+            data: int = os.lseek(source_fd, offset, os.SEEK_DATA)
+        except OSError as error:
+            if error.errno == errno.ENXIO:
+                break
+            raise
+        hole: int = os.lseek(source_fd, data, os.SEEK_HOLE)
+        extents.append((data, hole - data))
+        offset = hole
+    return extents
+
+
+def _copy_data(source_path: pathlib.Path, destination_path: pathlib.Path) -> str:
+    """Copy file contents with the cheapest available data copy.
+
+    Returns:
+        str: Strategy used.
+    """
+    with open(source_path, "rb") as source, open(destination_path, "wb") as destination:
+        source_fd: int = source.fileno()
+        destination_fd: int = destination.fileno()
+        stat: os.stat_result = os.fstat(source_fd)
+
+        if stat.st_size > 0 and _reflink(source_fd, destination_fd):
+            return STRATEGY_REFLINK
+
+        # Fewer blocks allocated than the size needs means the file has holes
+        if (
+            hasattr(os, "SEEK_DATA")
+            and stat.st_size > 0
+            and stat.st_blocks * 512 < stat.st_size
+        ):
+            try:
+                extents: list[tuple[int, int]] = _data_extents(source_fd, stat.st_size)
+            except OSError:
+                extents = [(0, stat.st_size)]
+            for offset, length in extents:
+                if _kernel_copy(source_fd, destination_fd, offset, length) == "":
+                    source.seek(offset)
+                    destination.seek(offset)
+                    destination.write(source.read(length))
+            os.ftruncate(destination_fd, stat.st_size)
+            return STRATEGY_SPARSE
+
+        if stat.st_size > 0:
+            strategy: str = _kernel_copy(source_fd, destination_fd, 0, stat.st_size)
+            if strategy != "":
+                return strategy
+
+        # Start again from the beginning of any partial kernel copy
+        source.seek(0)
+        destination.seek(0)
+        shutil.copyfileobj(source, destination)
+        return STRATEGY_COPY
+
+
+def copy_file(
+    source_path: pathlib.Path,
+    destination_path: pathlib.Path,
+    move: bool = False,
+    mode: str = COPY_AUTO,
+    destination_device: int | None = None,
+) -> str:
+    """Copy file to destination (replacing it) choosing the cheapest strategy.
+
+    Args:
+        source_path (pathlib.Path): Source file.
+        destination_path (pathlib.Path): Destination file (its directory must exist).
+        move (bool, optional): Source may be moved as it is deleted afterwards. Defaults to False.
+        mode (str, optional): COPY_AUTO, STRATEGY_HARDLINK (link when possible) or
+            STRATEGY_COPY (always a buffered copy). Defaults to COPY_AUTO.
+        destination_device (int | None, optional): Device of destination directory if
+            already known (saves a stat). Defaults to None.
+
+    Raises:
+        FileCopyError: Unknown copy mode.
+
+    Returns:
+        str: Strategy used.
+    """
+
+    if mode not in COPY_MODES:
+        raise FileCopyError(f"Unknown copy mode '{mode}'.")
+
+    if mode == STRATEGY_COPY:
+        shutil.copy2(source_path, destination_path)
+        return STRATEGY_COPY
+
+    if (move or mode == STRATEGY_HARDLINK) and same_device(
+        source_path, destination_path, destination_device
+    ):
+        if move:
+            os.replace(source_path, destination_path)
+            return STRATEGY_RENAME
+        try:
+            destination_path.unlink(missing_ok=True)
+            os.link(source_path, destination_path)
+            return STRATEGY_HARDLINK
+        except OSError as error:
+            if error.errno not in _UNSUPPORTED:
+                raise
+
+    # Never write through an existing (possibly hard linked) destination
+    destination_path.unlink(missing_ok=True)
+    strategy: str = _copy_data(source_path, destination_path)
+    shutil.copystat(source_path, destination_path)
+    return strategy
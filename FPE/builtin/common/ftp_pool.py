@@ -0,0 +1,422 @@
+"""  Pool of authenticated FTP sessions.
+
+Sessions stay logged in between files. A session idle longer than the
+keepalive interval is checked with NOOP before reuse and is transparently
+reconnected if the server dropped it. Remote directories known to exist are
+cached across the pool, so in the steady state an upload is a single STOR.
+An upload interrupted by a transient error is resumed on a fresh session
+from the size already on the server (REST if supported otherwise APPE). A
+remote file already the full size is only taken as uploaded if the server can
+hash it and the digest matches; otherwise the file is sent again.
+"""
+
+import time
+import hashlib
+import pathlib
+import logging
+import posixpath
+from collections import deque
+from contextlib import contextmanager
+from ftplib import FTP, all_errors, error_perm
+from threading import Lock, BoundedSemaphore
+from typing import Iterator
+
+from core.error import FPEError
+
+# Default FTP server port
+
+FTP_PORT: int = 21
+
+# Default number of sessions kept in a pool
+
+FTP_POOL_SIZE: int = 2
+
+# Seconds a session may sit idle before it is checked with NOOP
+
+FTP_KEEPALIVE: float = 30.0
+
+# Seconds to wait on a server socket operation
+
+FTP_TIMEOUT: float = 60.0
+
+# Default bytes sent per block of an upload
+
+FTP_BLOCK_SIZE: int = 262144
+
+# Attempts made at an upload before giving up
+
+FTP_UPLOAD_ATTEMPTS: int = 3
+
+
+class FTPSessionPoolError(FPEError):
+    """An error occurred in the FTP session pool."""
+
+    def __str__(self) -> str:
+        """Return string for exception.
+
+        Returns:
+            str: Exception string.
+        """
+
+        return FPEError.error_prefix("FTPSessionPool") + str(self.error)
+
+
+class FTPSession:
+    """Logged in FTP connection that tracks its remote working directory."""
+
+    def __init__(self, ftp: FTP) -> None:
+        """Initialise session for a logged in connection.
+
+        Args:
+            ftp (FTP): Logged in FTP connection.
+        """
+        self.ftp: FTP = ftp
+        self.home: str = ftp.pwd()
+        self.cwd: str = self.home
+        self.last_used: float = time.monotonic()
+        self.features: set[str] = set()
+        try:
+            self.features = {
+                line.strip().upper()
+                for line in ftp.sendcmd("FEAT").splitlines()[1:-1]
+            }
+        except all_errors:
+            pass
+
+    @property
+    def can_restart(self) -> bool:
+        """Server supports REST for stream transfers."""
+        return "REST STREAM" in self.features
+
+    def remote_size(self, remote_name: str) -> int:
+        """Return size of file in working directory (0 if it does not exist).
+
+        Args:
+            remote_name (str): Remote file name.
+
+        Returns:
+            int: Remote file size.
+        """
+        try:
+            self.ftp.voidcmd("TYPE I")
+            return self.ftp.size(remote_name) or 0
+        except error_perm:
+            return 0
+
+    def remote_digest(self, remote_name: str) -> tuple[str, str] | None:
+        """Return hash of file in working directory computed by the server.
+
+        Uses HASH (SHA-256) if advertised otherwise XMD5.
+
+        Args:
+            remote_name (str): Remote file name.
+
+        Returns:
+            tuple[str, str] | None: Hash algorithm and hex digest; None if the server cannot hash files.
+        """
+        try:
+            if any(
+                feature.startswith("HASH") and "SHA-256" in feature
+                for feature in self.features
+            ):
+                self.ftp.sendcmd("OPTS HASH SHA-256")
+                reply: list[str] = self.ftp.sendcmd(f"HASH {remote_name}").split()
+                return "sha256", reply[3].lower()
+            if "XMD5" in self.features:
+                reply = self.ftp.sendcmd(f"XMD5 {remote_name}").split()
+                return "md5", reply[-1].lower()
+        except (*all_errors, IndexError):
+            pass
+        return None
+
+    def remote_path(self, directory: str) -> str:
+        """Return absolute remote path of a directory relative to the login directory.
+
+        Args:
+            directory (str): Directory relative to login directory ("" for login directory).
+
+        Returns:
+            str: Absolute remote path.
+        """
+        return posixpath.normpath(posixpath.join(self.home, directory))
+
+    def close(self) -> None:
+        """Quit session; closing the connection if the server does not answer."""
+        try:
+            self.ftp.quit()
+        except all_errors:
+            self.ftp.close()
+
+
+class FTPSessionPool:
+    """Bounded pool of logged in FTP sessions shared by a handler's consumers."""
+
+    def __init__(
+        self,
+        server: str,
+        user: str,
+        password: str,
+        size: int = FTP_POOL_SIZE,
+        port: int = FTP_PORT,
+        keepalive: float = FTP_KEEPALIVE,
+        timeout: float = FTP_TIMEOUT,
+    ) -> None:
+        """Initialise session pool; sessions are created on first use.
+
+        Args:
+            server (str): FTP server.
+            user (str): FTP username.
+            password (str): FTP user password.
+            size (int, optional): Maximum sessions. Defaults to FTP_POOL_SIZE.
+            port (int, optional): FTP server port. Defaults to FTP_PORT.
+            keepalive (float, optional): Idle seconds before a NOOP check. Defaults to FTP_KEEPALIVE.
+            timeout (float, optional): Socket timeout seconds. Defaults to FTP_TIMEOUT.
+
+        Raises:
+            FTPSessionPoolError: Invalid pool size.
+        """
+
+        if size < 1:
+            raise FTPSessionPoolError("Pool size must be at least 1.")
+
+        self.server: str = server
+        self.user: str = user
+        self.password: str = password
+        self.size: int = size
+        self.port: int = port
+        self.keepalive: float = keepalive
+        self.timeout: float = timeout
+
+        self.__idle: deque[FTPSession] = deque()
+        self.__lock: Lock = Lock()
+        self.__slots: BoundedSemaphore = BoundedSemaphore(size)
+        self.__directories: set[str] = set()
+        self.__connects: int = 0
+
+    @property
+    def connects(self) -> int:
+        """Number of server logins made by the pool."""
+        return self.__connects
+
+    def __connect(self) -> FTPSession:
+        """Open and log in a new session.
+
+        Returns:
+            FTPSession: New session.
+        """
+        ftp = FTP(timeout=self.timeout)
+        try:
+            ftp.connect(self.server, self.port)
+            ftp.login(self.user, self.password)
+        except all_errors:
+            ftp.close()
+            raise
+        with self.__lock:
+            self.__connects += 1
+        return FTPSession(ftp)
+
+    def __checkout(self) -> FTPSession:
+        """Return an idle session (checked with NOOP if idle too long) or a new one.
+
+        Returns:
+            FTPSession: Session ready for use.
+        """
+        with self.__lock:
+            session: FTPSession | None = self.__idle.pop() if self.__idle else None
+        if session is not None:
+            if time.monotonic() - session.last_used < self.keepalive:
+                return session
+            try:
+                session.ftp.voidcmd("NOOP")
+                return session
+            except all_errors:
+                logging.debug("FTP session to %s dropped; reconnecting.", self.server)
+                session.ftp.close()
+        return self.__connect()
+
+    @contextmanager
+    def session(self) -> Iterator[FTPSession]:
+        """Borrow a session from the pool, waiting while all are in use.
+
+        A session that raises while borrowed is closed rather than returned,
+        and the directory cache is cleared as the remote tree may have changed.
+
+        Yields:
+            Iterator[FTPSession]: Borrowed session.
+        """
+        with self.__slots:
+            session: FTPSession = self.__checkout()
+            try:
+                yield session
+            except BaseException:
+                self.invalidate()
+                session.close()
+                raise
+            session.last_used = time.monotonic()
+            with self.__lock:
+                self.__idle.append(session)
+
+    def change_directory(self, session: FTPSession, directory: str) -> None:
+        """Change session to a directory relative to its login directory; creating it if needed.
+
+        No command is sent if the session is already there, and only one CWD
+        if the directory is known to exist.
+
+        Args:
+            session (FTPSession): Pool session.
+            directory (str): Directory relative to the login directory.
+        """
+        remote_path: str = session.remote_path(directory)
+        if session.cwd == remote_path:
+            return
+        with self.__lock:
+            known: bool = remote_path in self.__directories
+        if not known:
+            self.__make_directories(session, remote_path)
+        session.ftp.cwd(remote_path)
+        session.cwd = remote_path
+        with self.__lock:
+            self.__directories.add(remote_path)
+
+    @staticmethod
+    def __make_directory(session: FTPSession, path: str) -> None:
+        """Create a remote directory if it does not exist.
+
+        Another session (or client) may create the directory between its CWD
+        failing and its MKD; so a refused MKD is followed by one more CWD.
+
+        Args:
+            session (FTPSession): Pool session.
+            path (str): Absolute remote path.
+
+        Raises:
+            error_perm: Directory could not be created.
+        """
+        try:
+            session.ftp.cwd(path)
+            return
+        except all_errors:
+            pass
+        try:
+            session.ftp.mkd(path)
+        except error_perm as error:
+            try:
+                session.ftp.cwd(path)
+            except all_errors:
+                raise error from None
+
+    @staticmethod
+    def __uploaded(session: FTPSession, source_path: pathlib.Path) -> bool:
+        """Return true if the remote file has the same digest as the local file.
+
+        Args:
+            session (FTPSession): Pool session.
+            source_path (pathlib.Path): Local file.
+
+        Returns:
+            bool: true if the server hashed the file and the digests match.
+        """
+        remote: tuple[str, str] | None = session.remote_digest(source_path.name)
+        if remote is None:
+            return False
+        algorithm, remote_digest = remote
+        digest = hashlib.new(algorithm)
+        with open(source_path, "rb") as file:
+            while block := file.read(FTP_BLOCK_SIZE):
+                digest.update(block)
+        return digest.hexdigest() == remote_digest
+
+    def __make_directories(self, session: FTPSession, remote_path: str) -> None:
+        """Create any missing directories along a remote path.
+
+        Args:
+            session (FTPSession): Pool session.
+            remote_path (str): Absolute remote path.
+        """
+        path: str = "/"
+        for directory in remote_path.strip("/").split("/"):
+            path = posixpath.join(path, directory)
+            with self.__lock:
+                if path in self.__directories:
+                    continue
+            self.__make_directory(session, path)
+            session.cwd = ""
+            with self.__lock:
+                self.__directories.add(path)
+
+    def upload(
+        self,
+        source_path: pathlib.Path,
+        directory: str,
+        block_size: int = FTP_BLOCK_SIZE,
+        attempts: int = FTP_UPLOAD_ATTEMPTS,
+    ) -> None:
+        """Upload a file into a directory; resuming after a transient failure.
+
+        A retry continues from the size of the partial file on the server,
+        using REST + STOR if the server supports it otherwise APPE. A remote
+        file already the full size is skipped only if its digest matches,
+        otherwise the whole file is sent again. Permanent (5xx) errors are not
+        retried.
+
+        Args:
+            source_path (pathlib.Path): Local file.
+            directory (str): Directory relative to the login directory.
+            block_size (int, optional): Bytes sent per block. Defaults to FTP_BLOCK_SIZE.
+            attempts (int, optional): Upload attempts. Defaults to FTP_UPLOAD_ATTEMPTS.
+        """
+        size: int = source_path.stat().st_size
+        for attempt in range(1, max(attempts, 1) + 1):
+            try:
+                with self.session() as session:
+                    self.change_directory(session, directory)
+                    offset: int = 0
+                    if attempt > 1:
+                        offset = session.remote_size(source_path.name)
+                        if offset > size:
+                            offset = 0
+                        elif offset == size:
+                            if self.__uploaded(session, source_path):
+                                return
+                            offset = 0
+                    with open(source_path, "rb") as file:
+                        if offset == 0:
+                            session.ftp.storbinary(
+                                f"STOR {source_path.name}", file, block_size
+                            )
+                        elif session.can_restart:
+                            file.seek(offset)
+                            session.ftp.storbinary(
+                                f"STOR {source_path.name}", file, block_size, rest=offset
+                            )
+                        else:
+                            file.seek(offset)
+                            session.ftp.storbinary(
+                                f"APPE {source_path.name}", file, block_size
+                            )
+                    if offset > 0:
+                        logging.info(
+                            "Resumed upload of %s at byte %d.", source_path, offset
+                        )
+                    return
+            except error_perm:
+                raise
+            except all_errors as error:
+                if attempt >= attempts:
+                    raise
+                logging.info(
+                    "Upload of %s interrupted (%s); retrying.", source_path, error
+                )
+
+    def invalidate(self) -> None:
+        """Forget remote directories known to exist."""
+        with self.__lock:
+            self.__directories.clear()
+
+    def close(self) -> None:
+        """Quit all idle sessions."""
+        with self.__lock:
+            sessions: list[FTPSession] = list(self.__idle)
+            self.__idle.clear()
+        for session in sessions:
+            session.close()
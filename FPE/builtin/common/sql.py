@@ -1,52 +1,203 @@
-"""  Generate SQL query string to insert/update a database table row.
+"""  Generate SQL to upsert database table rows and write batches of rows.
 """
 
 import logging
+import sqlite3
+import itertools
+from functools import lru_cache
+from typing import Any, Sequence
 
+# Supported SQL dialects
 
-def generate(
-    param_style: str, table_name: str, key_name: str, row_fields: [str]
+DIALECT_SQLITE: str = "sqlite"
+DIALECT_MYSQL: str = "mysql"
+
+# Positional parameter placeholder for each dialect
+
+DIALECT_PARAMETER: dict[str, str] = {DIALECT_SQLITE: "?", DIALECT_MYSQL: "%s"}
+
+
+def sqlite_max_parameters(version: tuple[int, ...]) -> int:
+    """Return most parameters a statement may bind for a SQLite library version.
+
+    Args:
+        version (tuple[int, ...]): SQLite version (e.g. sqlite3.sqlite_version_info).
+
+    Returns:
+        int: SQLITE_MAX_VARIABLE_NUMBER default (999 before 3.32.0).
+    """
+    return 32766 if tuple(version) >= (3, 32, 0) else 999
+
+
+# Most parameters a single statement may bind for each dialect
+
+DIALECT_MAX_PARAMETERS: dict[str, int] = {
+    DIALECT_SQLITE: sqlite_max_parameters(sqlite3.sqlite_version_info),
+    DIALECT_MYSQL: 65535,
+}
+
+# Default number of rows in a multi-row VALUES statement
+
+STATEMENT_ROWS: int = 100
+
+
+@lru_cache(maxsize=256)
+def generate_upsert(
+    dialect: str,
+    table_name: str,
+    key_name: str,
+    row_fields: tuple[str, ...],
+    rows: int = 1,
 ) -> str:
-    """Generate SQL for update/insert row of fields.
+    """Generate SQL to insert rows of fields; updating rows whose key already exists.
+
+    Statements are cached per dialect, table, key, fields and row count.
 
     Args:
-        param_style (str):  Parameter substitionn style.
-        table_name (str):   Database table name.
-        key_name (str):     Primary key name.
-        row_fields ([str]): Field name list.
+        dialect (str):                 SQL dialect (DIALECT_SQLITE or DIALECT_MYSQL).
+        table_name (str):              Database table name.
+        key_name (str):                Key column name ("" to only insert).
+        row_fields (tuple[str, ...]):  Field names.
+        rows (int, optional):          Rows in VALUES list. Defaults to 1.
 
     Returns:
-        str: Return SQL query to insert/update a database row.
+        str: Return SQL query to upsert rows (positional parameters); "" if not possible.
     """
 
-    sql: str = ""
+    if dialect not in DIALECT_PARAMETER or len(row_fields) == 0 or rows < 1:
+        logging.error("Cannot generate SQL for %s table %s.", dialect, table_name)
+        return ""
+
+    fields: str = ",".join(row_fields)
+    row_values: str = "(" + ",".join([DIALECT_PARAMETER[dialect]] * len(row_fields)) + ")"
+    sql: str = (
+        f"INSERT INTO `{table_name}` ({fields}) VALUES "
+        + ",".join([row_values] * rows)
+        + _conflict_clause(dialect, key_name, row_fields)
+    )
+
+    logging.debug(sql)
+
+    return sql
+
 
-    try:
-        # Key provided then doing update
+def _conflict_clause(dialect: str, key_name: str, row_fields: tuple[str, ...]) -> str:
+    """Return clause that turns an INSERT into an UPSERT on key.
 
-        if key_name != "":
-            fields = (("{} = " + param_style + ",") * len(row_fields)).format(
-                *sorted(row_fields + row_fields)
-            )[:-1]
+    Args:
+        dialect (str):                 SQL dialect.
+        key_name (str):                Key column name ("" for none).
+        row_fields (tuple[str, ...]):  Field names.
 
-            sql = (
-                f"UPDATE {table_name} SET {fields} WHERE {key_name} ="
-                + param_style.format(key_name)
-            )
+    Returns:
+        str: Conflict clause ("" if no key).
+    """
+    if key_name == "":
+        return ""
+    updates: list[str] = [field for field in row_fields if field != key_name]
+    if dialect == DIALECT_SQLITE:
+        if not updates:
+            return f" ON CONFLICT({key_name}) DO NOTHING"
+        return f" ON CONFLICT({key_name}) DO UPDATE SET " + ",".join(
+            f"{field}=excluded.{field}" for field in updates
+        )
+    # VALUES() rather than a row alias so MariaDB is also supported
+    return " ON DUPLICATE KEY UPDATE " + ",".join(
+        f"{field}=VALUES({field})" for field in (updates or [key_name])
+    )
+
+
+@lru_cache(maxsize=256)
+def generate_merge(
+    dialect: str,
+    table_name: str,
+    key_name: str,
+    row_fields: tuple[str, ...],
+    staging_table: str,
+) -> str:
+    """Generate SQL to upsert all rows of a staging table into a table.
 
-        # Doing an insert of a new record
+    Args:
+        dialect (str):                 SQL dialect (DIALECT_SQLITE or DIALECT_MYSQL).
+        table_name (str):              Database table name.
+        key_name (str):                Key column name ("" to only insert).
+        row_fields (tuple[str, ...]):  Field names.
+        staging_table (str):           Staging table name (may be schema qualified).
 
-        else:
-            fields = ",".join(row_fields)
+    Returns:
+        str: Return SQL query to merge staging table; "" if not possible.
+    """
 
-            values = ((param_style + ",") * (len(row_fields))).format(*row_fields)[:-1]
+    if dialect not in DIALECT_PARAMETER or len(row_fields) == 0:
+        logging.error("Cannot generate SQL for %s table %s.", dialect, table_name)
+        return ""
 
-            sql = f"INSERT INTO `{table_name}` ({fields}) VALUES ({values})"
+    fields: str = ",".join(row_fields)
 
-    except ValueError as error:
-        logging.error(error)
-        sql = ""
+    # SQLite needs a WHERE so ON CONFLICT is not parsed as a join constraint
+    sql: str = (
+        f"INSERT INTO `{table_name}` ({fields}) SELECT {fields} FROM {staging_table}"
+        + (" WHERE true" if dialect == DIALECT_SQLITE else "")
+        + _conflict_clause(dialect, key_name, row_fields)
+    )
 
-    logging.info(sql)
+    logging.debug(sql)
 
     return sql
+
+
+def statement_rows(dialect: str, field_count: int, rows: int = STATEMENT_ROWS) -> int:
+    """Return rows per statement that keeps within the dialect parameter limit.
+
+    Args:
+        dialect (str):          SQL dialect.
+        field_count (int):      Fields per row.
+        rows (int, optional):   Requested rows per statement. Defaults to STATEMENT_ROWS.
+
+    Returns:
+        int: Rows per statement.
+    """
+    return max(1, min(rows, DIALECT_MAX_PARAMETERS[dialect] // max(field_count, 1)))
+
+
+def write_rows(
+    cursor: Any,
+    dialect: str,
+    table_name: str,
+    key_name: str,
+    row_fields: Sequence[str],
+    batch: Sequence[Sequence[Any]],
+    rows: int = STATEMENT_ROWS,
+) -> int:
+    """Upsert a batch of rows using multi-row VALUES statements.
+
+    Args:
+        cursor (Any):                         DB-API cursor.
+        dialect (str):                        SQL dialect.
+        table_name (str):                     Database table name.
+        key_name (str):                       Key column name ("" to only insert).
+        row_fields (Sequence[str]):           Field names.
+        batch (Sequence[Sequence[Any]]):      Rows of field values (in field order).
+        rows (int, optional):                 Rows per statement. Defaults to STATEMENT_ROWS.
+
+    Returns:
+        int: Number of rows written.
+    """
+    fields: tuple[str, ...] = tuple(row_fields)
+    rows = statement_rows(dialect, len(fields), rows)
+    full: int = len(batch) - len(batch) % rows
+    if full > 0:
+        cursor.executemany(
+            generate_upsert(dialect, table_name, key_name, fields, rows),
+            [
+                list(itertools.chain.from_iterable(batch[start : start + rows]))
+                for start in range(0, full, rows)
+            ],
+        )
+    if full < len(batch):
+        cursor.execute(
+            generate_upsert(dialect, table_name, key_name, fields, len(batch) - full),
+            list(itertools.chain.from_iterable(batch[full:])),
+        )
+    return len(batch)
+
@@ -2,10 +2,22 @@
 """
 
 import pathlib
-import shutil
 import logging
 
-from core.constants import CONFIG_DESTINATION
+from builtin.common.file_copy import copy_file, COPY_AUTO, COPY_MODES
+from builtin.common.directory_cache import DirectoryCache, DIRECTORY_CACHE_SIZE
+from builtin.common.checksum_copy import (
+    checksum_copy,
+    CHECKSUM_ALGORITHMS,
+    CONTENT_STORE,
+)
+from core.constants import (
+    CONFIG_DESTINATION,
+    CONFIG_COPYSTRATEGY,
+    CONFIG_DIRECTORYCACHE,
+    CONFIG_CHECKSUM,
+    CONFIG_CONTENTADDRESSED,
+)
 from core.interface.ihandler import IHandler
 from core.config import ConfigDict
 from core.handler import Handler
@@ -22,7 +34,15 @@ class CopyFileHandlerError(FPEError):
 class CopyFileHandler(IHandler):
     """Copy file.
 
-    Copy files created in watch folder to destination folder.
+    Copy files created in watch folder to destination folder. The cheapest copy
+    the filesystems allow is used: a rename when the source is to be deleted and
+    is on the same device, a reflink, or an in-kernel copy that keeps holes in
+    sparse files. The count of each strategy used is reported in the metrics.
+    Destination directories known to exist are cached so that a file landing in
+    one costs no directory checks. With a checksum each file is hashed as it is
+    copied (a single read) and the digest written to a <file>.<checksum> sidecar;
+    content_addressed then stores each payload once under .objects and hardlinks
+    destination files to it.
 
     Handler(Watcher) config values:
         name:            Name of handler object
@@ -31,6 +51,10 @@ class CopyFileHandler(IHandler):
         delete_source:   Boolean == true delete source file on success
         exit_on_failure: Boolean == true exit handler on failure; generating an exception
         recursive:       Boolean == true recursively generate events in source tree
+        copy_strategy:   "auto", "hardlink" (link on same device) or "copy" (always copy data)
+        directory_cache: Destination directories remembered as existing (0 disables)
+        checksum:        Digest computed while copying (blake2b, blake2s, sha256, sha512; "" none)
+        content_addressed: Boolean == true de-duplicate payloads in a content-addressed store
 
     """
 
@@ -41,7 +65,7 @@ class CopyFileHandler(IHandler):
             handler_config (ConfigDict): Handler configuration.
 
         Raises:
-            CopyFileHandlerError: None passed as config.
+            CopyFileHandlerError: None passed as config, unknown copy strategy or checksum.
         """
 
         if handler_config is None:
@@ -50,6 +74,29 @@ class CopyFileHandler(IHandler):
         Handler.set_mandatory_config(self, handler_config)
 
         self.destination = Handler.setup_path(handler_config[CONFIG_DESTINATION])
+        self.copy_strategy: str = handler_config.get(CONFIG_COPYSTRATEGY, COPY_AUTO)
+        self.directory_cache: int = max(
+            int(handler_config.get(CONFIG_DIRECTORYCACHE, DIRECTORY_CACHE_SIZE)), 0
+        )
+        self.content_addressed: bool = bool(
+            handler_config.get(CONFIG_CONTENTADDRESSED, False)
+        )
+        self.checksum: str = handler_config.get(
+            CONFIG_CHECKSUM, "sha256" if self.content_addressed else ""
+        )
+        self.operations: dict[str, int] = {}
+        self.__directories: DirectoryCache = DirectoryCache(self.directory_cache)
+
+        if self.copy_strategy not in COPY_MODES:
+            raise CopyFileHandlerError(
+                f"Unknown copy strategy '{self.copy_strategy}'."
+            )
+
+        if self.checksum != "" and self.checksum not in CHECKSUM_ALGORITHMS:
+            raise CopyFileHandlerError(f"Unknown checksum '{self.checksum}'.")
+
+        if self.content_addressed and self.checksum == "":
+            raise CopyFileHandlerError("Content-addressed storage needs a checksum.")
 
     def process(self, source_path: pathlib.Path) -> bool:
         """Copy file from source(watch) directory to destination directory.
@@ -67,17 +114,43 @@ class CopyFileHandler(IHandler):
                     self.destination
                 ) / Handler.create_relative_source(str(source_path), self.source)
 
-                if not destination_path.parent.exists():
-                    Handler.create_path(destination_path.parent)
-
-                shutil.copy2(source_path, destination_path)
-
-                logging.info("Copied file %s to %s.", source_path, destination_path)
+                destination_device: int = self.__directories.ensure(
+                    destination_path.parent
+                )
+
+                if self.checksum != "":
+                    strategy, _ = checksum_copy(
+                        source_path,
+                        destination_path,
+                        self.checksum,
+                        self.delete_source,
+                        destination_device,
+                        (
+                            pathlib.Path(self.destination) / CONTENT_STORE
+                            if self.content_addressed
+                            else None
+                        ),
+                    )
+                else:
+                    strategy = copy_file(
+                        source_path,
+                        destination_path,
+                        self.delete_source,
+                        self.copy_strategy,
+                        destination_device,
+                    )
+                Handler.increment_operation(self, f"copy_{strategy}")
+
+                logging.info(
+                    "Copied file %s to %s (%s).", source_path, destination_path, strategy
+                )
 
                 return True
 
         except (OSError, KeyError, ValueError) as error:
-            self.errors += 1
+            # A cached directory may have been removed
+            self.__directories.invalidate()
+            Handler.increment_errors(self)
             logging.info(CopyFileHandlerError(error))
 
         return False
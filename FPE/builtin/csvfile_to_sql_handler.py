@@ -1,17 +1,40 @@
 """ FPE CSV file to SQL built-in handler.
 """
 
+import os
 import logging
-import csv
 import pathlib
+from threading import Lock, BoundedSemaphore
 import mysql.connector
+from mysql.connector import pooling
 
-from builtin.common import sql
+from builtin.common import sql, csv_parallel
+from builtin.common.csv_reader import CSVBatchReader, CSV_CONVERTERS
+from core.constants import (
+    CONFIG_BATCHSIZE,
+    CONFIG_POOLSIZE,
+    CONFIG_STATEMENTROWS,
+    CONFIG_CONVERTERS,
+    CONFIG_PARALLELSIZE,
+    CONFIG_IMPORTWORKERS,
+)
 from core.interface.ihandler import IHandler
 from core.config import ConfigDict
 from core.handler import Handler
 from core.error import FPEError
 
+# Rows passed to each executemany() call
+
+MYSQL_BATCH_SIZE: int = 1000
+
+# Connections kept in each handler's pool
+
+MYSQL_POOL_SIZE: int = 4
+
+# Smallest file (bytes) imported in parallel chunks (0 disables)
+
+MYSQL_PARALLEL_SIZE: int = 0
+
 
 class CSVFileToSQLHandlerError(FPEError):
     """An error occurred in the CSVFileToSQL handler."""
@@ -23,9 +46,12 @@ class CSVFileToSQLHandlerError(FPEError):
 class CSVFileToSQLHandler(IHandler):
     """Import CSV file to MySQL database.
 
-    Read in CSV file and insert/update rows within a given MySQL database/table.
+    Read in CSV file and insert/upsert rows within a given MySQL database/table.
     If no key attribute is specified then the rows are inserted otherwise
-    updated.
+    inserted or updated if the key already exists. Connections come from a pool
+    kept by the handler and rows are sent as batches of prepared multi-row
+    statements. Files of at least parallel_size bytes are split into chunks
+    loaded into staging tables by import_workers processes and then merged.
 
     Attributes:
         name:            Name of handler object
@@ -39,6 +65,12 @@ class CSVFileToSQLHandler(IHandler):
         database_name:   MySQL database name
         table_name:      MySQL table name
         key_name:        Table column key used in updates
+        batch_size:      Rows written per executemany() call
+        statement_rows:  Rows in each multi-row INSERT statement
+        pool_size:       Number of pooled database connections
+        converters:      Column name to type converter name (int, float, str)
+        parallel_size:   Smallest file size (bytes) imported in parallel (0 disables)
+        import_workers:  Processes (and connections) used for a parallel import
 
     """
 
@@ -49,7 +81,7 @@ class CSVFileToSQLHandler(IHandler):
             handler_config (ConfigDict): Handler configuration.
 
         Raises:
-            CSVFileToSQLHandlerError: None passed as handler configuration.
+            CSVFileToSQLHandlerError: None passed as handler configuration or unknown converter.
         """
 
         if handler_config is None:
@@ -64,51 +96,166 @@ class CSVFileToSQLHandler(IHandler):
         self.database_name: str = Handler.get_config(handler_config, "database")
         self.table_name: str = Handler.get_config(handler_config, "table")
         self.key_name: str = Handler.get_config(handler_config, "key")
+        self.batch_size: int = max(
+            int(handler_config.get(CONFIG_BATCHSIZE, MYSQL_BATCH_SIZE)), 1
+        )
+        self.statement_rows: int = max(
+            int(handler_config.get(CONFIG_STATEMENTROWS, sql.STATEMENT_ROWS)), 1
+        )
+        self.pool_size: int = min(
+            max(int(handler_config.get(CONFIG_POOLSIZE, MYSQL_POOL_SIZE)), 1),
+            pooling.CNX_POOL_MAXSIZE,
+        )
 
-    def process(self, source_path: pathlib.Path) -> bool:
-        """Import CSV file to SQLite database."""
+        self.converters: dict[str, str] = handler_config.get(CONFIG_CONVERTERS, {})
+        self.parallel_size: int = max(
+            int(handler_config.get(CONFIG_PARALLELSIZE, MYSQL_PARALLEL_SIZE)), 0
+        )
+        self.import_workers: int = max(
+            int(handler_config.get(CONFIG_IMPORTWORKERS, os.cpu_count() or 1)), 1
+        )
 
-        try:
-            database = mysql.connector.connect(
-                host=self.server,
-                port=self.port,
-                user=self.user_name,
-                passwd=self.user_password,
-                database=self.database_name,
-            )
+        for column, converter in self.converters.items():
+            if converter not in CSV_CONVERTERS:
+                raise CSVFileToSQLHandlerError(
+                    f"Unknown converter '{converter}' for column '{column}'."
+                )
 
-            cursor = database.cursor()
+        self.__pool: pooling.MySQLConnectionPool = None  # type: ignore
+        self.__pool_lock: Lock = Lock()
+        # The pool raises rather than blocks when empty so waiters queue here
+        self.__pool_slots: BoundedSemaphore = BoundedSemaphore(self.pool_size)
 
-            logging.info(
-                "Importing CSV file %s to table %s.", source_path, self.table_name
-            )
+    def __get_pool(self) -> pooling.MySQLConnectionPool:
+        """Return handler connection pool; creating it on first use.
+
+        Returns:
+            pooling.MySQLConnectionPool: Connection pool.
+        """
+        with self.__pool_lock:
+            if self.__pool is None:
+                self.__pool = pooling.MySQLConnectionPool(
+                    pool_size=self.pool_size,
+                    pool_name=f"fpe{id(self)}",
+                    host=self.server,
+                    port=self.port,
+                    user=self.user_name,
+                    passwd=self.user_password,
+                    database=self.database_name,
+                )
+            return self.__pool
 
-            with open(source_path, "r", encoding="utf-8") as file_handle:
-                csv_reader = csv.DictReader(file_handle)
+    def __import_rows(self, database, csv_reader: CSVBatchReader) -> None:
+        """Write CSV rows to table in batches of multi-row statements.
 
-                sql_query = sql.generate(
-                    "%({})s",
+        Args:
+            database (Any): Pooled database connection.
+            csv_reader (CSVBatchReader): CSV file batch reader.
+        """
+        # A prepared cursor reuses each server-side statement across executions
+        cursor = database.cursor(prepared=True)
+        try:
+            for batch in csv_reader:
+                sql.write_rows(
+                    cursor,
+                    sql.DIALECT_MYSQL,
                     self.table_name,
                     self.key_name,
                     csv_reader.fieldnames,
+                    batch,
+                    self.statement_rows,
                 )
+        finally:
+            cursor.close()
 
-                if sql_query != "":
-                    for csv_row in csv_reader:
-                        cursor.execute(sql_query, csv_row)
+    def __import_file(self, database, source_path: pathlib.Path) -> None:
+        """Import CSV file over a single pooled connection.
 
-            database.commit()
-            database.close()
+        Args:
+            database (Any): Pooled database connection.
+            source_path (pathlib.Path): CSV file.
+        """
+        with open(source_path, "r", encoding="utf-8") as file_handle:
+            csv_reader = CSVBatchReader(file_handle, self.batch_size, self.converters)
 
-            logging.info(
-                "Finished Importing file %s to table %s.", source_path, self.table_name
+            sql_query = sql.generate_upsert(
+                sql.DIALECT_MYSQL,
+                self.table_name,
+                self.key_name,
+                csv_reader.fieldnames,
             )
 
-            return True
+            if sql_query != "":
+                self.__import_rows(database, csv_reader)
+
+    def process(self, source_path: pathlib.Path) -> bool:
+        """Import CSV file to MySQL database."""
+
+        with self.__pool_slots:
+            try:
+                database = self.__get_pool().get_connection()
+
+                try:
+                    logging.info(
+                        "Importing CSV file %s to table %s.", source_path, self.table_name
+                    )
+
+                    if 0 < self.parallel_size <= Handler.file_size(source_path):
+                        try:
+                            csv_parallel.import_mysql(
+                                database,
+                                {
+                                    "host": self.server,
+                                    "port": self.port,
+                                    "user": self.user_name,
+                                    "passwd": self.user_password,
+                                    "database": self.database_name,
+                                },
+                                str(source_path),
+                                self.table_name,
+                                self.key_name,
+                                self.import_workers,
+                                self.batch_size,
+                                self.statement_rows,
+                                self.converters,
+                            )
+                        except csv_parallel.CSVParallelSplitError as error:
+                            logging.info("%s Importing %s serially.", error, source_path)
+                            self.__import_file(database, source_path)
+                    else:
+                        self.__import_file(database, source_path)
+
+                    database.commit()
+
+                except (
+                    mysql.connector.Error,
+                    ValueError,
+                    csv_parallel.CSVParallelImportError,
+                ):
+                    database.rollback()
+                    raise
+
+                finally:
+                    # Returns connection to the pool
+                    database.close()
+
+                logging.info(
+                    "Finished Importing file %s to table %s.", source_path, self.table_name
+                )
+
+                return True
+
+            except mysql.connector.Error as error:
+                Handler.increment_errors(self)
+                logging.info(CSVFileToSQLHandlerError(error.msg))
+
+            except ValueError as error:
+                Handler.increment_errors(self)
+                logging.info(CSVFileToSQLHandlerError(error))
 
-        except mysql.connector.Error as error:
-            self.errors += 1
-            logging.info(CSVFileToSQLHandlerError(error.msg))
+            except csv_parallel.CSVParallelImportError as error:
+                Handler.increment_errors(self)
+                logging.info(error)
 
         return False
 
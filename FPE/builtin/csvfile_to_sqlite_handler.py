@@ -1,17 +1,51 @@
 """ FPE CSV file to SQLite built-in handler.
 """
 
+import os
+import time
 import logging
-import csv
 import sqlite3
 import pathlib
-
-from builtin.common import sql
+from threading import Lock
+from typing import Any
+
+from builtin.common import sql, csv_parallel
+from builtin.common.csv_reader import CSVBatchReader, CSV_CONVERTERS
+from core.constants import (
+    CONFIG_BATCHSIZE,
+    CONFIG_COMMITROWS,
+    CONFIG_PRAGMAS,
+    CONFIG_STATEMENTROWS,
+    CONFIG_CONVERTERS,
+    CONFIG_PARALLELSIZE,
+    CONFIG_IMPORTWORKERS,
+)
 from core.interface.ihandler import IHandler
 from core.config import ConfigDict
 from core.handler import Handler
 from core.error import FPEError
 
+# Rows passed to each executemany() call
+
+SQLITE_BATCH_SIZE: int = 10000
+
+# Rows imported between intermediate commits
+
+SQLITE_COMMIT_ROWS: int = 100000
+
+# Connection pragmas for bulk loading (cache 64MB, memory map 256MB); those that
+# persist in the database file or trade durability (journal_mode, synchronous)
+# are left to the handler configuration
+
+SQLITE_PRAGMAS: dict[str, Any] = {
+    "cache_size": -65536,
+    "mmap_size": 268435456,
+}
+
+# Smallest file (bytes) imported in parallel chunks (0 disables)
+
+SQLITE_PARALLEL_SIZE: int = 0
+
 
 class CSVFileToSQLiteHandlerError(FPEError):
     """An error occurred in the CSVFileToSQLite handler."""
@@ -23,9 +57,12 @@ class CSVFileToSQLiteHandlerError(FPEError):
 class CSVFileToSQLiteHandler(IHandler):
     """Import CSV file to SQLite database.
 
-    Read in CSV file and insert/update rows within a given SQLite database/table.
+    Read in CSV file and insert/upsert rows within a given SQLite database/table.
     If no key attribute is specified then the rows are inserted otherwise
-    updated.
+    inserted or updated if the key already exists. Rows are written in batches
+    of multi-row statements over a connection kept open between files,
+    committing every commit_rows rows. Files of at least parallel_size bytes
+    are split into chunks staged by import_workers processes and then merged.
 
     Attributes:
         name:            Name of handler object
@@ -36,6 +73,13 @@ class CSVFileToSQLiteHandler(IHandler):
         database_file:   SQLite database file name
         table_name:      SQLite table name
         key_name:        Table column key used in updates
+        batch_size:      Rows written per executemany() call
+        statement_rows:  Rows in each multi-row INSERT statement
+        commit_rows:     Rows written between intermediate commits
+        pragmas:         Pragmas set on the database connection
+        converters:      Column name to type converter name (int, float, str)
+        parallel_size:   Smallest file size (bytes) imported in parallel (0 disables)
+        import_workers:  Processes used for a parallel import
 
     """
 
@@ -46,7 +90,7 @@ class CSVFileToSQLiteHandler(IHandler):
             handler_config (ConfigDict): Handler configuration.
 
         Raises:
-           CSVFileToSQLiteHandlerError: None passed as handler configuration.
+           CSVFileToSQLiteHandlerError: None passed as handler configuration or invalid pragma.
         """
 
         if handler_config is None:
@@ -57,48 +101,187 @@ class CSVFileToSQLiteHandler(IHandler):
         self.table_name: str  = handler_config["table"]
         self.key_name: str  = handler_config["key"]
         self.database_file: str  = handler_config["databasefile"]
+        self.batch_size: int = max(
+            int(handler_config.get(CONFIG_BATCHSIZE, SQLITE_BATCH_SIZE)), 1
+        )
+        self.statement_rows: int = max(
+            int(handler_config.get(CONFIG_STATEMENTROWS, sql.STATEMENT_ROWS)), 1
+        )
+        self.commit_rows: int = max(
+            int(handler_config.get(CONFIG_COMMITROWS, SQLITE_COMMIT_ROWS)), 1
+        )
+        self.pragmas: dict[str, Any] = {
+            **SQLITE_PRAGMAS,
+            **handler_config.get(CONFIG_PRAGMAS, {}),
+        }
+
+        self.converters: dict[str, str] = handler_config.get(CONFIG_CONVERTERS, {})
+        self.parallel_size: int = max(
+            int(handler_config.get(CONFIG_PARALLELSIZE, SQLITE_PARALLEL_SIZE)), 0
+        )
+        self.import_workers: int = max(
+            int(handler_config.get(CONFIG_IMPORTWORKERS, os.cpu_count() or 1)), 1
+        )
+
+        for column, converter in self.converters.items():
+            if converter not in CSV_CONVERTERS:
+                raise CSVFileToSQLiteHandlerError(
+                    f"Unknown converter '{converter}' for column '{column}'."
+                )
 
-    def process(self, source_path: pathlib.Path) -> bool:
-        """Import CSV file to SQLite database."""
+        for pragma, value in self.pragmas.items():
+            if not pragma.isidentifier() or not (
+                isinstance(value, int) or str(value).isidentifier()
+            ):
+                raise CSVFileToSQLiteHandlerError(
+                    f"Invalid pragma '{pragma} = {value}'."
+                )
+
+        self.__database: sqlite3.Connection = None  # type: ignore
+        self.__database_lock: Lock = Lock()
+        self.__rows_imported: int = 0
+        self.__import_seconds: float = 0.0
 
-        try:
+    def __connect(self) -> sqlite3.Connection:
+        """Return handler database connection; opening it on first use.
+
+        Returns:
+            sqlite3.Connection: Database connection.
+        """
+        if self.__database is None:
             if not pathlib.Path(self.database_file).exists():
                 raise IOError("Database file does not exist.")
+            database = sqlite3.connect(self.database_file, check_same_thread=False)
+            for pragma, value in self.pragmas.items():
+                database.execute(f"PRAGMA {pragma} = {value}")
+            self.__database = database
+        return self.__database
+
+    def __disconnect(self) -> None:
+        """Close handler database connection (rolling back anything uncommitted)."""
+        if self.__database is not None:
+            try:
+                self.__database.rollback()
+                self.__database.close()
+            except sqlite3.Error:
+                pass
+            self.__database = None  # type: ignore
+
+    def __import_file(self, database: sqlite3.Connection, source_path: pathlib.Path) -> int:
+        """Import CSV file in batches; committing every commit_rows rows.
+
+        Args:
+            database (sqlite3.Connection): Database connection.
+            source_path (pathlib.Path): CSV file.
 
-            database = sqlite3.connect(self.database_file)
+        Returns:
+            int: Number of rows imported.
+        """
+        rows_imported: int = 0
+        uncommitted: int = 0
 
-            cursor = database.cursor()
+        with open(source_path, "r", encoding="utf-8") as file_handle:
+            csv_reader = CSVBatchReader(file_handle, self.batch_size, self.converters)
 
-            logging.info(
-                "Importing CSV file %s to table %s.", source_path, self.table_name
+            sql_query = sql.generate_upsert(
+                sql.DIALECT_SQLITE,
+                self.table_name,
+                self.key_name,
+                csv_reader.fieldnames,
             )
 
-            with open(source_path, "r", encoding="utf-8") as file_handle:
-                csv_reader = csv.DictReader(file_handle)
+            if sql_query != "":
+                for batch in csv_reader:
+                    rows_imported += sql.write_rows(
+                        database,
+                        sql.DIALECT_SQLITE,
+                        self.table_name,
+                        self.key_name,
+                        csv_reader.fieldnames,
+                        batch,
+                        self.statement_rows,
+                    )
+                    uncommitted += len(batch)
+                    if uncommitted >= self.commit_rows:
+                        database.commit()
+                        uncommitted = 0
+
+        return rows_imported
 
-                sql_query = sql.generate(
-                    ":{}", self.table_name, self.key_name, csv_reader.fieldnames
-                )
+    def process(self, source_path: pathlib.Path) -> bool:
+        """Import CSV file to SQLite database."""
 
-                if sql_query != "":
-                    for csv_row in csv_reader:
-                        cursor.execute(sql_query, csv_row)
+        with self.__database_lock:
+            try:
+                database = self.__connect()
 
-            database.commit()
-            database.close()
+                logging.info(
+                    "Importing CSV file %s to table %s.", source_path, self.table_name
+                )
 
-            logging.info(
-                "Finished Importing file %s to table %s.", source_path, self.table_name
-            )
+                started: float = time.perf_counter()
+
+                if 0 < self.parallel_size <= Handler.file_size(source_path):
+                    try:
+                        rows_imported: int = csv_parallel.import_sqlite(
+                            database,
+                            self.database_file,
+                            str(source_path),
+                            self.table_name,
+                            self.key_name,
+                            self.import_workers,
+                            self.batch_size,
+                            self.statement_rows,
+                            self.converters,
+                        )
+                    except csv_parallel.CSVParallelSplitError as error:
+                        logging.info("%s Importing %s serially.", error, source_path)
+                        rows_imported = self.__import_file(database, source_path)
+                else:
+                    rows_imported = self.__import_file(database, source_path)
+
+                database.commit()
+
+                self.__rows_imported += rows_imported
+                self.__import_seconds += time.perf_counter() - started
+
+                logging.info(
+                    "Finished Importing file %s to table %s.",
+                    source_path,
+                    self.table_name,
+                )
 
-            return True
+                return True
 
-        except (IOError, sqlite3.Error, sqlite3.Warning) as error:
-            self.errors += 1
-            logging.info(CSVFileToSQLiteHandlerError(str(error)))
+            except (
+                IOError,
+                ValueError,
+                sqlite3.Error,
+                sqlite3.Warning,
+                csv_parallel.CSVParallelImportError,
+            ) as error:
+                self.__disconnect()
+                Handler.increment_errors(self)
+                logging.info(CSVFileToSQLiteHandlerError(str(error)))
 
         return False
 
+    def close(self) -> None:
+        """Close handler database connection."""
+        with self.__database_lock:
+            self.__disconnect()
+
+    @property
+    def rows_per_second(self) -> float:
+        """Average rows imported per second.
+
+        Returns:
+            float: Rows per second.
+        """
+        if self.__import_seconds == 0.0:
+            return 0.0
+        return self.__rows_imported / self.__import_seconds
+
     def status(self) -> str:
         """Return current handler status string
 
@@ -106,4 +289,4 @@ class CSVFileToSQLiteHandler(IHandler):
             str: Handler status string.
         """
 
-        return Handler.status(self)
+        return Handler.status(self) + f"Rows/sec = {self.rows_per_second:.0f}\n"
@@ -1,16 +1,27 @@
 """FPE FTP copy file built-in handler.
 """
 
-import os
 import pathlib
 import logging
-from ftplib import FTP, all_errors
-
+from ftplib import all_errors
+
+from builtin.common.ftp_pool import (
+    FTPSessionPool,
+    FTP_PORT,
+    FTP_POOL_SIZE,
+    FTP_KEEPALIVE,
+    FTP_BLOCK_SIZE,
+)
 from core.constants import (
     CONFIG_DESTINATION,
     CONFIG_SERVER,
     CONFIG_USER,
     CONFIG_PASSWORD,
+    CONFIG_PORT,
+    CONFIG_POOLSIZE,
+    CONFIG_KEEPALIVE,
+    CONFIG_CONNECTIONS,
+    CONFIG_BLOCKSIZE,
 )
 from core.interface.ihandler import IHandler
 from core.config import ConfigDict
@@ -29,6 +40,10 @@ class FTPCopyFileHandler(IHandler):
     """FTP Copy file/directories.
 
     FTP Copy files created in watch folder to destination folder on remote FTP server.
+    Logged in sessions are pooled between files and remote directories known to
+    exist are cached, so in the steady state each file is a single STOR.
+    Files keep their path relative to the watch folder, up to connections files
+    are uploaded at once and an interrupted upload is resumed.
 
     Attributes:
         name:            Name of handler object
@@ -40,6 +55,11 @@ class FTPCopyFileHandler(IHandler):
         server:          FTP Server
         user:            FTP Server username
         password:        FTP Server user password
+        port:            FTP Server port
+        connections:     Number of files uploaded in parallel (one session each)
+        pool_size:       Number of pooled FTP sessions (at least connections)
+        block_size:      Bytes sent per block of an upload
+        keepalive:       Idle seconds before a pooled session is checked with NOOP
 
     """
 
@@ -63,22 +83,31 @@ class FTPCopyFileHandler(IHandler):
         self.server: str = Handler.get_config(handler_config, CONFIG_SERVER)
         self.user: str = Handler.get_config(handler_config, CONFIG_USER)
         self.password: str = Handler.get_config(handler_config, CONFIG_PASSWORD)
-
-    @staticmethod
-    def __cwd_destination(ftp: FTP, destination: str) -> None:
-        """Change current working directory to destination on FTP server.
-
-        Args:
-            ftp (FTP): FTP server object.
-            destination (str): Destination path.
-        """
-
-        for directory in destination.split(os.sep):
-            try:
-                ftp.cwd(directory)
-            except all_errors:
-                ftp.mkd(directory)
-                ftp.cwd(directory)
+        self.port: int = int(handler_config.get(CONFIG_PORT, FTP_PORT))
+        self.connections: int = max(int(handler_config.get(CONFIG_CONNECTIONS, 1)), 1)
+        self.pool_size: int = max(
+            int(handler_config.get(CONFIG_POOLSIZE, FTP_POOL_SIZE)), self.connections
+        )
+        self.block_size: int = max(
+            int(handler_config.get(CONFIG_BLOCKSIZE, FTP_BLOCK_SIZE)), 1
+        )
+        self.keepalive: float = float(
+            handler_config.get(CONFIG_KEEPALIVE, FTP_KEEPALIVE)
+        )
+
+        self.__pool: FTPSessionPool = FTPSessionPool(
+            self.server,
+            self.user,
+            self.password,
+            self.pool_size,
+            self.port,
+            self.keepalive,
+        )
+
+    @property
+    def pool(self) -> FTPSessionPool:
+        """FTP session pool used by handler."""
+        return self.__pool
 
     def process(self, source_path: pathlib.Path) -> bool:
         """FTP Copy file from source(watch) directory to a destination directory on remote server.
@@ -91,28 +120,31 @@ class FTPCopyFileHandler(IHandler):
         """
 
         try:
-            with FTP(host=self.server, user=self.user, passwd=self.password) as ftp:
-                if self.destination != "":
-                    self.__cwd_destination(ftp, self.destination)
+            if source_path.is_file():
+                # Keep sub-directory of file relative to the watch folder
+                directory: pathlib.PurePath = pathlib.PurePath(
+                    self.destination,
+                    Handler.create_relative_source(str(source_path), self.source),
+                ).parent
 
-                if source_path.is_file():
-                    with open(source_path, "rb") as file:
-                        ftp.storbinary(f"STOR {source_path.name}", file)
+                self.__pool.upload(source_path, directory.as_posix(), self.block_size)
 
-                    logging.info(
-                        "Uploaded file %s to server %s", source_path, self.server
-                    )
+                logging.info("Uploaded file %s to server %s", source_path, self.server)
 
-                    return True
+                return True
 
             return False
 
         except all_errors as error:
-            self.errors += 1
+            Handler.increment_errors(self)
             logging.info(FTPCopyFileHandlerError(error))
 
         return False
 
+    def close(self) -> None:
+        """Quit pooled FTP sessions (the pool logs in again if processing restarts)."""
+        self.__pool.close()
+
     def status(self) -> str:
         """Return current handler status string
 
@@ -0,0 +1,247 @@
+"""FPE asyncio consumer. Run an asyncio event loop in a thread that processes files
+   queued by an observer with many in-flight handler process() coroutines, bounded
+   by a configurable concurrency limit. Synchronous handlers are run through an
+   adapter that offloads their processing to a worker thread.
+
+"""
+
+import time
+import asyncio
+import inspect
+import pathlib
+from threading import Thread, current_thread
+from queue import Queue
+from concurrent.futures import ThreadPoolExecutor
+
+from core.handler import Handler
+from core.coalescer import EventCoalescer
+from core.interface.icompletion import ICompletionDetector
+from core.journal import JournalQueue
+from core.metrics import WatcherMetrics
+from core.event import FileEvent
+from core.interface.ihandler import IHandler
+from core.interface.iasynchandler import IAsyncHandler
+from core.interface.iconsumer import IConsumer
+from core.consumer import ConsumerError, FailureCallBackFunction
+
+# Default maximum number of files being processed at once
+
+ASYNC_CONCURRENCY: int = 16
+
+
+class AsyncHandlerAdapter(IAsyncHandler):
+    """Adapt a synchronous handler to the async handler interface."""
+
+    def __init__(self, watcher_handler: IHandler) -> None:
+        """Initialise async handler adapter.
+
+        Args:
+            watcher_handler (IHandler): Synchronous watcher handler.
+        """
+        self.__watcher_handler: IHandler = watcher_handler
+
+    async def process(self, source_path: pathlib.Path) -> bool:
+        """Run synchronous handler process() in a worker thread.
+
+        Args:
+            source_path (pathlib.Path): Source file path.
+
+        Returns:
+            bool: true if file processed successfully.
+        """
+        return await asyncio.to_thread(self.__watcher_handler.process, source_path)
+
+    def status(self) -> str:
+        """Return current handler status string
+
+        Returns:
+            str: Handler status string.
+        """
+        return self.__watcher_handler.status()
+
+
+class AsyncConsumer(IConsumer):
+    """Asyncio consumer file queue processor."""
+
+    def __init__(
+        self,
+        file_queue: Queue,
+        watcher_handler: IHandler | IAsyncHandler,
+        failure_callback_fn: FailureCallBackFunction,
+        concurrency: int = ASYNC_CONCURRENCY,
+        coalescer: EventCoalescer = None,  # type: ignore
+        completion: ICompletionDetector = None,  # type: ignore
+        journal: JournalQueue = None,  # type: ignore
+        metrics: WatcherMetrics = None,  # type: ignore
+    ) -> None:
+        """Initialise asyncio consumer.
+
+        Args:
+            file_queue (Queue): File queue.
+            watcher_handler (IHandler | IAsyncHandler): Watcher handler.
+            failure_callback_fn (FailureCallBackFunction): Watcher handler failure callback.
+            concurrency (int, optional): Maximum in-flight files. Defaults to ASYNC_CONCURRENCY.
+            coalescer (EventCoalescer, optional): Watcher event coalescer. Defaults to None.
+            completion (ICompletionDetector, optional): Copy completion detector. Defaults to None.
+            journal (JournalQueue, optional): Journal to acknowledge handled events. Defaults to None.
+            metrics (WatcherMetrics, optional): Watcher metrics. Defaults to None.
+
+        Raises:
+            ConsumerError: An invalid consumer parameter was passed.
+        """
+
+        if file_queue is None:
+            raise ConsumerError("File queue cannot be None.")
+
+        if watcher_handler is None:
+            raise ConsumerError("Watcher handler cannot be None.")
+
+        if failure_callback_fn is None:
+            raise ConsumerError("Failure callback cannot be None.")
+
+        if concurrency < 1:
+            raise ConsumerError("Consumer concurrency must be at least one.")
+
+        self.__watcher_failure_callback: FailureCallBackFunction = failure_callback_fn
+        self.__watcher_handler: IHandler | IAsyncHandler = watcher_handler
+        self.__async_handler: IAsyncHandler = (
+            watcher_handler
+            if inspect.iscoroutinefunction(watcher_handler.process)
+            else AsyncHandlerAdapter(watcher_handler)  # type: ignore
+        )
+        self.__root_path: pathlib.Path = pathlib.Path(self.__watcher_handler.source)
+        self.__file_queue: Queue = file_queue
+        self.__concurrency: int = concurrency
+        self.__coalescer: EventCoalescer = coalescer
+        self.__completion: ICompletionDetector = completion
+        self.__journal: JournalQueue = journal
+        self.__metrics: WatcherMetrics = metrics
+        self.__handle_events_thread: Thread = None
+        self.__running: bool = False
+        # Running is cleared by a failure; stopped only once stop() has cleaned up
+        self.__stopped: bool = True
+
+    def __wait_for_file(self, src_path: str, complete: bool = False) -> pathlib.Path | None:
+        """Settle queued file and wait for its copy to complete.
+
+        Args:
+            src_path (str): Source path to file.
+            complete (bool, optional): File is known to be complete. Defaults to False.
+
+        Returns:
+            pathlib.Path | None: File to process or None if there is nothing to process.
+        """
+        if self.__coalescer is not None:
+            self.__coalescer.settle(src_path)
+        source_path: pathlib.Path = pathlib.Path(src_path)
+        if not source_path.exists():
+            return None
+        return Handler.wait_for_copy_completion(
+            source_path, self.__completion, complete
+        )
+
+    async def __handle_event(
+        self, event: FileEvent, concurrency_limit: asyncio.Semaphore
+    ) -> None:
+        """Handle file event and release its concurrency slot when done.
+
+        Args:
+            event (FileEvent): Queued file event.
+            concurrency_limit (asyncio.Semaphore): In-flight file limit.
+        """
+        acknowledge: bool = True
+        if self.__metrics is not None:
+            self.__metrics.record_wait(event.enqueued, time.monotonic())
+        try:
+            source_path: pathlib.Path | None = await asyncio.to_thread(
+                self.__wait_for_file, event.src_path, event.complete
+            )
+            if source_path is not None:
+                size: int = (
+                    Handler.file_size(source_path) if self.__metrics is not None else 0
+                )
+                started: float = time.monotonic()
+                if await self.__async_handler.process(source_path):
+                    if self.__metrics is not None:
+                        self.__metrics.record_processed(
+                            time.monotonic() - started, size
+                        )
+                    Handler.increment_files_processed(self.__watcher_handler)
+                    if self.__watcher_handler.delete_source:
+                        await asyncio.to_thread(
+                            Handler.remove_source, self.__root_path, source_path
+                        )
+                elif self.__watcher_handler.exit_on_failure and self.__running:
+                    acknowledge = False
+                    self.__running = False
+                    self.__file_queue.put(None)
+                    self.__watcher_failure_callback(self.__watcher_handler.name)
+        finally:
+            concurrency_limit.release()
+        if acknowledge and self.__journal is not None:
+            self.__journal.acknowledge(event)
+
+    async def __process_file_queue(self) -> None:
+        """Read file queue and start a processing task for each file received."""
+
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=self.__concurrency)
+        )
+        concurrency_limit = asyncio.Semaphore(self.__concurrency)
+        in_flight: set[asyncio.Task] = set()
+
+        # Blocking queue reads get their own thread so never wait on handler threads
+
+        with ThreadPoolExecutor(max_workers=1) as queue_reader:
+            while self.__running:
+                await concurrency_limit.acquire()
+                event = await asyncio.get_running_loop().run_in_executor(
+                    queue_reader, self.__file_queue.get
+                )
+                if event is None or not self.__running:
+                    concurrency_limit.release()
+                    break
+                task = asyncio.create_task(
+                    self.__handle_event(event, concurrency_limit)
+                )
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+    def start(self) -> None:
+        """Create consumer thread and start event loop running."""
+        if self.__running:
+            return
+        self.stop()
+        self.__running = True
+        self.__stopped = False
+        self.__handle_events_thread = Thread(
+            target=asyncio.run,
+            args=(self.__process_file_queue(),),
+            name=self.__watcher_handler.name,
+        )
+        self.__handle_events_thread.daemon = True
+        self.__handle_events_thread.start()
+
+    def stop(self) -> None:
+        """Set not running flag, punt out no event to queue, wait for in-flight files and thread to end."""
+        if self.__stopped:
+            return
+        self.__stopped = True
+        self.__running = False
+        self.__file_queue.put(None)
+        if self.__handle_events_thread is not current_thread():
+            self.__handle_events_thread.join()
+        while not self.__file_queue.empty():
+            _ = self.__file_queue.get()
+
+    @property
+    def is_running(self) -> bool:
+        """Is the consumer thread running ?
+
+        Returns:
+            bool: == true then consumer thread running
+        """
+        return self.__running
@@ -0,0 +1,168 @@
+"""FPE startup backlog scanner.
+
+Enumerate files already present in a watcher source directory (those copied in
+while FPE was down or the watcher stopped) and add them to the file queue before
+live events are processed. Directories are walked with os.scandir so entries are
+streamed rather than listed; files are ordered oldest first through a bounded
+sort window so that memory use stays flat however many entries a directory holds.
+Paths are offered to the watcher event coalescer so any file that also produces
+a live event during the scan is only queued once, and files that still have an
+unacknowledged entry in the watcher journal (replayed on start) are skipped.
+
+"""
+
+import os
+import time
+import heapq
+import logging
+from queue import Queue
+from typing import Iterator, Tuple
+
+from core.interface.ihandler import IHandler
+from core.coalescer import EventCoalescer
+from core.event import FileEvent
+from core.journal import JournalQueue
+from core.observers.ignore_filter import IgnoreFilter
+from core.error import FPEError
+
+# Number of files held back to sort by age before the oldest is released
+
+BACKLOG_WINDOW: int = 10000
+
+# Number of files added to the file queue at a time
+
+BACKLOG_BATCH: int = 1000
+
+
+class BacklogScannerError(FPEError):
+    """An error occurred in backlog scanner."""
+
+    def __str__(self) -> str:
+        """Return string for exception.
+
+        Returns:
+            str: Exception string.
+        """
+
+        return FPEError.error_prefix("BacklogScanner") + str(self.error)
+
+
+class BacklogScanner:
+    """Queue files already present in a watcher source directory."""
+
+    def __init__(
+        self,
+        file_queue: Queue,
+        watcher_handler: IHandler,
+        coalescer: EventCoalescer = None,  # type: ignore
+        window: int = BACKLOG_WINDOW,
+        batch_size: int = BACKLOG_BATCH,
+        ignore: IgnoreFilter = None,  # type: ignore
+        journal: JournalQueue = None,  # type: ignore
+        changed_since: int = 0,
+    ) -> None:
+        """Initialise backlog scanner.
+
+        Args:
+            file_queue (Queue): File queue.
+            watcher_handler (IHandler): Watcher handler.
+            coalescer (EventCoalescer, optional): Watcher event coalescer. Defaults to None.
+            window (int, optional): Files sorted by age at once. Defaults to BACKLOG_WINDOW.
+            batch_size (int, optional): Files queued at a time. Defaults to BACKLOG_BATCH.
+            ignore (IgnoreFilter, optional): Files not to queue. Defaults to None.
+            journal (JournalQueue, optional): Journal of files already queued. Defaults to None.
+            changed_since (int, optional): Only queue files changed (ctime ns) after this. Defaults to 0.
+
+        Raises:
+            BacklogScannerError: An invalid scanner parameter was passed.
+        """
+
+        if file_queue is None:
+            raise BacklogScannerError("File queue cannot be None.")
+
+        if watcher_handler is None:
+            raise BacklogScannerError("Watcher handler cannot be None.")
+
+        if window < 1 or batch_size < 1:
+            raise BacklogScannerError("Window and batch size must be at least one.")
+
+        self.__file_queue: Queue = file_queue
+        self.__source: str = watcher_handler.source
+        self.__recursive: bool = watcher_handler.recursive
+        self.__coalescer: EventCoalescer = coalescer
+        self.__window: int = window
+        self.__batch_size: int = batch_size
+        self.__ignore: IgnoreFilter = ignore
+        self.__journal: JournalQueue = journal
+        self.__changed_since: int = changed_since
+
+    def __entries(self) -> Iterator[Tuple[int, str]]:
+        """Walk source directory yielding each file found with its modification time.
+
+        Yields:
+            Iterator[Tuple[int, str]]: File modification time (ns) and path.
+        """
+        directories: list[str] = [self.__source]
+        while directories:
+            try:
+                with os.scandir(directories.pop()) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if self.__recursive:
+                                    directories.append(entry.path)
+                            elif entry.is_file():
+                                if self.__ignore is not None and self.__ignore.ignored(
+                                    entry.name
+                                ):
+                                    continue
+                                stat: os.stat_result = entry.stat()
+                                if stat.st_ctime_ns < self.__changed_since:
+                                    continue
+                                yield stat.st_mtime_ns, entry.path
+                        except OSError:
+                            # File removed since directory read
+                            continue
+            except OSError as error:
+                logging.info(BacklogScannerError(error))
+
+    def __queue_batch(self, batch: list[str]) -> int:
+        """Add batch of files to file queue skipping any that are already pending or journaled.
+
+        Args:
+            batch (list[str]): File paths.
+
+        Returns:
+            int: Number of files queued.
+        """
+        queued: int = 0
+        for src_path in batch:
+            if self.__journal is not None and self.__journal.contains(src_path):
+                continue
+            if self.__coalescer is None or self.__coalescer.offer(src_path):
+                self.__file_queue.put(FileEvent(src_path, enqueued=time.monotonic()))
+                queued += 1
+        batch.clear()
+        return queued
+
+    def scan(self) -> int:
+        """Queue all files in source directory; oldest first.
+
+        Returns:
+            int: Number of files queued.
+        """
+        queued: int = 0
+        window: list[Tuple[int, str]] = []
+        batch: list[str] = []
+        for entry in self.__entries():
+            if len(window) < self.__window:
+                heapq.heappush(window, entry)
+                continue
+            batch.append(heapq.heappushpop(window, entry)[1])
+            if len(batch) == self.__batch_size:
+                queued += self.__queue_batch(batch)
+        while window:
+            batch.append(heapq.heappop(window)[1])
+            if len(batch) == self.__batch_size:
+                queued += self.__queue_batch(batch)
+        return queued + self.__queue_batch(batch)
@@ -0,0 +1,94 @@
+"""FPE event coalescer.
+
+Path keyed coalescing of file events so that only one entry per path is
+pending on a watcher file queue at any time. Repeat notifications for a
+pending path are dropped (and counted) and restart that path's debounce
+window; the consumer waits for the window to pass without any further
+notification before processing the file.
+
+"""
+
+import time
+from threading import Lock
+
+
+class EventCoalescer:
+    """Coalesce and de-duplicate file events by path."""
+
+    def __init__(self, debounce: float = 0.0) -> None:
+        """Initialise event coalescer.
+
+        Args:
+            debounce (float, optional): Quiet period in seconds after last event. Defaults to 0.0.
+        """
+        self.__debounce: float = max(debounce, 0.0)
+        self.__pending: dict[str, float] = {}
+        self.__duplicates: int = 0
+        self.__lock: Lock = Lock()
+
+    def offer(self, src_path: str) -> bool:
+        """Offer an event for a path.
+
+        Args:
+            src_path (str): Event file path.
+
+        Returns:
+            bool: true if path is not already pending and should be queued.
+        """
+        with self.__lock:
+            first_event: bool = src_path not in self.__pending
+            if not first_event:
+                self.__duplicates += 1
+            self.__pending[src_path] = time.monotonic()
+            return first_event
+
+    def refresh(self, src_path: str) -> None:
+        """Restart debounce window for a path if it is pending.
+
+        Args:
+            src_path (str): Event file path.
+        """
+        with self.__lock:
+            if src_path in self.__pending:
+                self.__duplicates += 1
+                self.__pending[src_path] = time.monotonic()
+
+    def settle(self, src_path: str) -> None:
+        """Wait for a path's debounce window to pass then release it so that any
+        later events for the path are queued again.
+
+        Args:
+            src_path (str): Event file path.
+        """
+        while True:
+            with self.__lock:
+                remaining: float = (
+                    self.__pending.get(src_path, 0.0) + self.__debounce - time.monotonic()
+                )
+                if remaining <= 0.0:
+                    self.__pending.pop(src_path, None)
+                    return
+            time.sleep(remaining)
+
+    def clear(self) -> None:
+        """Forget all pending paths."""
+        with self.__lock:
+            self.__pending.clear()
+
+    @property
+    def pending(self) -> int:
+        """Number of paths pending.
+
+        Returns:
+            int: Pending path count.
+        """
+        return len(self.__pending)
+
+    @property
+    def duplicates(self) -> int:
+        """Number of duplicate events dropped.
+
+        Returns:
+            int: Duplicate event count.
+        """
+        return self.__duplicates
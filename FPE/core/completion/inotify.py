@@ -0,0 +1,83 @@
+"""FPE inotify completion detector (Linux).
+
+Wait for the writer of a file to close it (IN_CLOSE_WRITE). As the writer may
+have closed the file before the watch is added, a size/mtime check each settle
+period acts as a safety net. Should an inotify instance or watch not be had
+(fs.inotify.max_user_instances or max_user_watches reached) the file is left
+to size/mtime quiescence instead.
+
+"""
+
+import errno
+import pathlib
+
+from core.interface.icompletion import ICompletionDetector
+from core.inotify import (
+    Inotify,
+    InotifyError,
+    IN_CLOSE_WRITE,
+    IN_DELETE_SELF,
+    IN_MOVE_SELF,
+)
+from core.completion.quiescence import QuiescenceCompletion, QUIESCENCE_SETTLE
+
+
+class InotifyCompletion(ICompletionDetector):
+    """Detect copy completion with inotify IN_CLOSE_WRITE."""
+
+    def __init__(self, settle: float = QUIESCENCE_SETTLE) -> None:
+        """Initialise inotify detector.
+
+        Args:
+            settle (float, optional): Period between safety net checks. Defaults to QUIESCENCE_SETTLE.
+
+        Raises:
+            InotifyError: inotify is not available.
+        """
+        Inotify().close()  # Fail early if not available
+        self.__settle: float = max(settle, 0.01)
+        self.__quiescence: QuiescenceCompletion = QuiescenceCompletion(settle)
+
+    def wait(self, source_path: pathlib.Path) -> pathlib.Path | None:
+        """Wait for writer to close file.
+
+        Args:
+            source_path (pathlib.Path): Queued file path.
+
+        Returns:
+            pathlib.Path | None: File to process or None if it has gone.
+        """
+        try:
+            inotify = Inotify()
+        except InotifyError:
+            return self.__quiescence.wait(source_path)
+        try:
+            try:
+                inotify.add_watch(
+                    str(source_path), IN_CLOSE_WRITE | IN_DELETE_SELF | IN_MOVE_SELF
+                )
+                stat = source_path.stat()
+            except InotifyError as error:
+                if getattr(error.error, "errno", None) == errno.ENOENT:
+                    return None
+                return self.__quiescence.wait(source_path)
+            except FileNotFoundError:
+                return None
+            previous: tuple[int, int] = (stat.st_size, stat.st_mtime_ns)
+            while True:
+                if inotify.wait(self.__settle):
+                    for event in inotify.read_events():
+                        if event.mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                            return None
+                        if event.mask & IN_CLOSE_WRITE:
+                            return source_path
+                try:
+                    stat = source_path.stat()
+                except FileNotFoundError:
+                    return None
+                current: tuple[int, int] = (stat.st_size, stat.st_mtime_ns)
+                if current == previous:
+                    return source_path
+                previous = current
+        finally:
+            inotify.close()
@@ -0,0 +1,50 @@
+"""FPE marker file completion detector.
+
+Writers signal that a file is complete by creating a marker file alongside it
+(the file name plus a suffix; for example data.csv.done). Marker files are
+never processed themselves; whichever of the file or its marker arrives last
+releases the file for processing and the marker is then removed.
+
+"""
+
+import pathlib
+
+from core.interface.icompletion import ICompletionDetector
+
+# Default marker file suffix
+
+MARKER_SUFFIX: str = ".done"
+
+
+class MarkerCompletion(ICompletionDetector):
+    """Detect copy completion by marker file."""
+
+    def __init__(self, suffix: str = MARKER_SUFFIX) -> None:
+        """Initialise marker detector.
+
+        Args:
+            suffix (str, optional): Marker file suffix. Defaults to MARKER_SUFFIX.
+        """
+        self.__suffix: str = suffix
+
+    def wait(self, source_path: pathlib.Path) -> pathlib.Path | None:
+        """Return file to process once both it and its marker exist.
+
+        Args:
+            source_path (pathlib.Path): Queued file (or marker) path.
+
+        Returns:
+            pathlib.Path | None: File to process or None if it is not yet complete.
+        """
+        if source_path.name.endswith(self.__suffix):
+            marker_path: pathlib.Path = source_path
+            source_path = source_path.with_name(source_path.name[: -len(self.__suffix)])
+        else:
+            marker_path = source_path.with_name(source_path.name + self.__suffix)
+        if not source_path.is_file():
+            return None
+        try:
+            marker_path.unlink()  # Only one of the two events claims the file
+        except FileNotFoundError:
+            return None
+        return source_path
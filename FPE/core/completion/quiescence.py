@@ -0,0 +1,83 @@
+"""FPE size/mtime quiescence completion detector.
+
+A file is taken to be completely written once its size and modification time
+stop changing. Polling backs off exponentially so that large, slow copies are
+checked less often; the file body is never read.
+
+"""
+
+import os
+import time
+import errno
+import pathlib
+
+from core.interface.icompletion import ICompletionDetector
+
+# Default quiet period and poll interval limits (seconds)
+
+QUIESCENCE_SETTLE: float = 0.05
+QUIESCENCE_MAX_POLL: float = 2.0
+
+
+class QuiescenceCompletion(ICompletionDetector):
+    """Detect copy completion by size/mtime quiescence."""
+
+    def __init__(
+        self, settle: float = QUIESCENCE_SETTLE, max_poll: float = QUIESCENCE_MAX_POLL
+    ) -> None:
+        """Initialise quiescence detector.
+
+        Args:
+            settle (float, optional): Quiet period before a file is complete. Defaults to QUIESCENCE_SETTLE.
+            max_poll (float, optional): Maximum poll interval. Defaults to QUIESCENCE_MAX_POLL.
+        """
+        self.__settle: float = max(settle, 0.0)
+        self.__max_poll: float = max(max_poll, self.__settle)
+
+    def __wait_for_access(self, source_path: pathlib.Path) -> None:
+        """Wait for any exclusive (Windows sharing) lock on the file to be released.
+
+        Args:
+            source_path (pathlib.Path): Source file path.
+        """
+        poll: float = max(self.__settle, 0.01)
+        while True:
+            try:
+                with open(source_path, "rb"):
+                    return
+            except IOError as error:
+                if error.errno != errno.EACCES:
+                    return
+            time.sleep(poll)
+            poll = min(poll * 2, self.__max_poll)
+
+    def wait(self, source_path: pathlib.Path) -> pathlib.Path | None:
+        """Wait until file size and modification time have been stable for the settle period.
+
+        Args:
+            source_path (pathlib.Path): Queued file path.
+
+        Returns:
+            pathlib.Path | None: File to process or None if it has gone.
+        """
+        poll: float = self.__settle
+        previous: tuple[int, int] | None = None
+        while True:
+            try:
+                stat = source_path.stat()
+            except FileNotFoundError:
+                return None
+            current: tuple[int, int] = (stat.st_size, stat.st_mtime_ns)
+            age: float = time.time() - stat.st_mtime
+            if current == previous or age >= self.__settle:
+                break
+            if previous is None:
+                # A file just written need only wait out the rest of its settle period
+                time.sleep(self.__settle - max(age, 0.0))
+            else:
+                time.sleep(poll)
+                poll = min(max(poll * 2, 0.01), self.__max_poll)
+            previous = current
+        if os.name == "nt":
+            self.__wait_for_access(source_path)
+        return source_path
@@ -16,10 +16,53 @@ CONFIG_DELETESOURCE: Final[str] = "deletesource"
 CONFIG_SERVER: Final[str] = "server"
 CONFIG_USER: Final[str] = "user"
 CONFIG_PASSWORD: Final[str] = "password"
+CONFIG_PORT: Final[str] = "port"
 CONFIG_NOGUI: Final[str] = "nogui"
 CONFIG_RECURSIVE: Final[str] = "recursive"
 CONFIG_EXITONFAILURE: Final[str] = "exitonfailure"
 CONFIG_FILES_PROCESSED: Final[str] = "processed"
+CONFIG_WORKERS: Final[str] = "workers"
+CONFIG_ORDERED: Final[str] = "ordered"
+CONFIG_EXECUTOR: Final[str] = "executor"
+EXECUTOR_THREAD: Final[str] = "thread"
+EXECUTOR_PROCESS: Final[str] = "process"
+EXECUTOR_ASYNC: Final[str] = "async"
+CONFIG_CONCURRENCY: Final[str] = "concurrency"
+CONFIG_DEBOUNCE: Final[str] = "debounce"
+CONFIG_COMPLETION: Final[str] = "completion"
+CONFIG_SETTLE: Final[str] = "settle"
+CONFIG_MARKERSUFFIX: Final[str] = "markersuffix"
+COMPLETION_QUIESCENCE: Final[str] = "quiescence"
+COMPLETION_INOTIFY: Final[str] = "inotify"
+COMPLETION_MARKER: Final[str] = "marker"
+CONFIG_JOURNAL: Final[str] = "journal"
+CONFIG_JOURNALWINDOW: Final[str] = "journalwindow"
+CONFIG_BACKLOG: Final[str] = "backlog"
+CONFIG_SHAREDWORKERS: Final[str] = "sharedworkers"
+CONFIG_WEIGHT: Final[str] = "weight"
+CONFIG_PRIORITY: Final[str] = "priority"
+CONFIG_METRICSPORT: Final[str] = "metricsport"
+CONFIG_BATCHSIZE: Final[str] = "batchsize"
+CONFIG_COMMITROWS: Final[str] = "commitrows"
+CONFIG_PRAGMAS: Final[str] = "pragmas"
+CONFIG_POOLSIZE: Final[str] = "poolsize"
+CONFIG_STATEMENTROWS: Final[str] = "statementrows"
+CONFIG_CONVERTERS: Final[str] = "converters"
+CONFIG_PARALLELSIZE: Final[str] = "parallelsize"
+CONFIG_IMPORTWORKERS: Final[str] = "importworkers"
+CONFIG_KEEPALIVE: Final[str] = "keepalive"
+CONFIG_CONNECTIONS: Final[str] = "connections"
+CONFIG_BLOCKSIZE: Final[str] = "blocksize"
+CONFIG_COPYSTRATEGY: Final[str] = "copystrategy"
+CONFIG_DIRECTORYCACHE: Final[str] = "directorycache"
+CONFIG_CHECKSUM: Final[str] = "checksum"
+CONFIG_CONTENTADDRESSED: Final[str] = "contentaddressed"
+CONFIG_OBSERVER: Final[str] = "observer"
+OBSERVER_WATCHDOG: Final[str] = "watchdog"
+OBSERVER_INOTIFY: Final[str] = "inotify"
+OBSERVER_POLLING: Final[str] = "polling"
+CONFIG_POLLINTERVAL: Final[str] = "pollinterval"
+CONFIG_IGNOREPATTERNS: Final[str] = "ignorepatterns"
 CONFIG_MANDATORY_KEYS: Final[Tuple[str, ...]] = (CONFIG_PLUGINS, CONFIG_WATCHERS)
 CONFIG_WATCHER_MANDATORY_KEYS: Final[Tuple[str, ...]] = (
     CONFIG_NAME,
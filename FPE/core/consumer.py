@@ -1,21 +1,35 @@
 """FPE consumer file processing thread. Create a thread to process each file queued
    by an observer and process it using a custom processing handler passed in on creation.
+   A consumer pool runs one or more of these threads against a watcher's file queue.
    
 """
 
 from typing import Callable
-import pathlib
 import time
-from threading import Thread
+import pathlib
+from threading import Thread, current_thread
 from queue import Queue, Empty
 
 from core.handler import Handler
+from core.coalescer import EventCoalescer
+from core.interface.icompletion import ICompletionDetector
+from core.journal import JournalQueue
+from core.metrics import WatcherMetrics
+from core.event import FileEvent
 from core.interface.ihandler import IHandler
 from core.interface.iconsumer import IConsumer
 from core.error import FPEError
 
 FailureCallBackFunction = Callable[..., None]
 
+# Maximum number of ready events drained from the file queue in one pass
+
+CONSUMER_BATCH_SIZE: int = 64
+
+# Maximum events held for each worker of an ordered pool (the router waits when full)
+
+CONSUMER_WORKER_QUEUE_SIZE: int = 1000
+
 
 class ConsumerError(FPEError):
     """An error occurred in consumer file processing."""
@@ -38,6 +52,11 @@ class Consumer(IConsumer):
         file_queue: Queue,
         watcher_handler: IHandler,
         failure_callback_fn: FailureCallBackFunction,
+        batch_size: int = CONSUMER_BATCH_SIZE,
+        coalescer: EventCoalescer = None,  # type: ignore
+        completion: ICompletionDetector = None,  # type: ignore
+        journal: JournalQueue = None,  # type: ignore
+        metrics: WatcherMetrics = None,  # type: ignore
     ) -> None:
         """Initialise consumer event processing thread.
 
@@ -45,6 +64,11 @@ class Consumer(IConsumer):
             file_queue (Queue): File queue.
             watcher_handler (IHandler): Watcher handler.
             failure_callback_fn (FailureCallBackFunction, optional): Watcher handler failure callback. Defaults to None.
+            batch_size (int, optional): Maximum events taken from queue per pass. Defaults to CONSUMER_BATCH_SIZE.
+            coalescer (EventCoalescer, optional): Watcher event coalescer. Defaults to None.
+            completion (ICompletionDetector, optional): Copy completion detector. Defaults to None.
+            journal (JournalQueue, optional): Journal to acknowledge handled events. Defaults to None.
+            metrics (WatcherMetrics, optional): Watcher metrics. Defaults to None.
         """
 
         if file_queue is None:
@@ -60,43 +84,88 @@ class Consumer(IConsumer):
         self.__watcher_handler: IHandler = watcher_handler
         self.__root_path: pathlib.Path = pathlib.Path(self.__watcher_handler.source)
         self.__file_queue: Queue = file_queue
+        self.__batch_size: int = max(batch_size, 1)
+        self.__coalescer: EventCoalescer = coalescer
+        self.__completion: ICompletionDetector = completion
+        self.__journal: JournalQueue = journal
+        self.__metrics: WatcherMetrics = metrics
         self.__handle_events_thread: Thread = None
         self.__running: bool = False
 
-    def __handle_event(self, source_path: pathlib.Path) -> bool:
+    def __handle_event(self, source_path: pathlib.Path, complete: bool = False) -> bool:
         """Handle file event.
 
         Args:
             source_path (pathlib.Path): Source path to file.
+            complete (bool, optional): File is known to be complete. Defaults to False.
 
         Returns:
             bool: Return true if processed successfully.
         """
         processing_success: bool = True
         if source_path.exists():
-            Handler.wait_for_copy_completion(source_path)
-            if self.__watcher_handler.process(source_path):
-                self.__watcher_handler.files_processed += 1
+            completed_path = Handler.wait_for_copy_completion(
+                source_path, self.__completion, complete
+            )
+            if completed_path is None:
+                return processing_success
+            size: int = (
+                Handler.file_size(completed_path) if self.__metrics is not None else 0
+            )
+            started: float = time.monotonic()
+            if self.__watcher_handler.process(completed_path):
+                if self.__metrics is not None:
+                    self.__metrics.record_processed(time.monotonic() - started, size)
+                Handler.increment_files_processed(self.__watcher_handler)
                 if self.__watcher_handler.delete_source:
-                    Handler.remove_source(self.__root_path, source_path)
+                    Handler.remove_source(self.__root_path, completed_path)
             elif self.__watcher_handler.exit_on_failure:
                 self.__watcher_failure_callback(self.__watcher_handler.name)
                 processing_success = False
                 self.__running = False
         return processing_success
 
+    def __next_batch(self) -> list:
+        """Block until an event is queued then drain any others that are ready.
+
+        Returns:
+            list: Batch of queued events (a None entry is the stop sentinel).
+        """
+        batch: list = [self.__file_queue.get()]
+        try:
+            while len(batch) < self.__batch_size and batch[-1] is not None:
+                batch.append(self.__file_queue.get_nowait())
+        except Empty:
+            pass
+        return batch
+
+    def handle(self, event: FileEvent) -> bool:
+        """Settle, process and acknowledge a queued file event.
+
+        Args:
+            event (FileEvent): Queued file event.
+
+        Returns:
+            bool: Return false if processing failed and the watcher is to exit.
+        """
+        if self.__metrics is not None:
+            self.__metrics.record_wait(event.enqueued, time.monotonic())
+        if self.__coalescer is not None:
+            self.__coalescer.settle(event.src_path)
+        if not self.__handle_event(pathlib.Path(event.src_path), event.complete):
+            return False
+        if self.__journal is not None:
+            self.__journal.acknowledge(event)
+        return True
+
     def __process_file_queue(self) -> None:
-        """Read file queue and process each file received."""
-        handle_events: bool = True
-        while handle_events and self.__running:
-            time.sleep(0.1)
-            try:
-                event = self.__file_queue.get()
-            except Empty:
-                pass
-            else:
-                if self.__running:
-                    handle_events = self.__handle_event(pathlib.Path(event.src_path))
+        """Wait on file queue and process each batch of files received."""
+        while self.__running:
+            for event in self.__next_batch():
+                if event is None or not self.__running:
+                    break
+                if not self.handle(event):
+                    break
 
     def start(self) -> None:
         """Create consumer thread and start event loop running."""
@@ -109,13 +178,27 @@ class Consumer(IConsumer):
         self.__handle_events_thread.daemon = True
         self.__handle_events_thread.start()
 
-    def stop(self) -> None:
-        """Set not running flag, punt out no event to queue and wait for thread to end."""
+    def signal_stop(self) -> None:
+        """Set not running flag and punt out no event to queue to wake thread."""
         if self.__running is False:
             return
         self.__running = False
         self.__file_queue.put(None)
-        self.__handle_events_thread.join()
+
+    def join(self) -> None:
+        """Wait for consumer thread to end."""
+        if (
+            self.__handle_events_thread is not None
+            and self.__handle_events_thread is not current_thread()
+        ):
+            self.__handle_events_thread.join()
+
+    def stop(self) -> None:
+        """Signal consumer thread to stop, wait for it to end and discard queued events."""
+        if self.__running is False:
+            return
+        self.signal_stop()
+        self.join()
         while not self.__file_queue.empty():
             _ = self.__file_queue.get()
 
@@ -127,3 +210,162 @@ class Consumer(IConsumer):
             bool: == true then consumer thread running
         """
         return self.__running
+
+
+class ConsumerPool(IConsumer):
+    """Pool of consumer threads sharing a watcher file queue.
+
+    In ordered mode files are routed to a worker by their parent directory so
+    that files from one directory are processed in sequence while different
+    directories are processed in parallel.
+    """
+
+    def __init__(
+        self,
+        file_queue: Queue,
+        watcher_handler: IHandler,
+        failure_callback_fn: FailureCallBackFunction,
+        workers: int = 1,
+        ordered: bool = False,
+        coalescer: EventCoalescer = None,  # type: ignore
+        completion: ICompletionDetector = None,  # type: ignore
+        journal: JournalQueue = None,  # type: ignore
+        metrics: WatcherMetrics = None,  # type: ignore
+    ) -> None:
+        """Initialise consumer pool.
+
+        Args:
+            file_queue (Queue): File queue.
+            watcher_handler (IHandler): Watcher handler.
+            failure_callback_fn (FailureCallBackFunction): Watcher handler failure callback.
+            workers (int, optional): Number of consumer threads. Defaults to 1.
+            ordered (bool, optional): Keep files from a directory in sequence. Defaults to False.
+            coalescer (EventCoalescer, optional): Watcher event coalescer. Defaults to None.
+            completion (ICompletionDetector, optional): Copy completion detector. Defaults to None.
+            journal (JournalQueue, optional): Journal to acknowledge handled events. Defaults to None.
+            metrics (WatcherMetrics, optional): Watcher metrics. Defaults to None.
+
+        Raises:
+            ConsumerError: An invalid pool parameter was passed.
+        """
+
+        if file_queue is None:
+            raise ConsumerError("File queue cannot be None.")
+
+        if watcher_handler is None:
+            raise ConsumerError("Watcher handler cannot be None.")
+
+        if workers < 1:
+            raise ConsumerError("Consumer pool must have at least one worker.")
+
+        self.__file_queue: Queue = file_queue
+        self.__name: str = watcher_handler.name
+        self.__ordered: bool = ordered and workers > 1
+        self.__worker_queues: list[Queue] = []
+        self.__consumers: list[Consumer] = []
+        self.__route_events_thread: Thread = None
+        self.__running: bool = False
+
+        if self.__ordered:
+            self.__worker_queues = [
+                Queue(CONSUMER_WORKER_QUEUE_SIZE) for _ in range(workers)
+            ]
+            for worker_queue in self.__worker_queues:
+                self.__consumers.append(
+                    Consumer(
+                        worker_queue,
+                        watcher_handler,
+                        failure_callback_fn,
+                        CONSUMER_BATCH_SIZE,
+                        coalescer,
+                        completion,
+                        journal,
+                        metrics,
+                    )
+                )
+        else:
+            # Workers share the queue so only take one event at a time
+            batch_size: int = CONSUMER_BATCH_SIZE if workers == 1 else 1
+            for _ in range(workers):
+                self.__consumers.append(
+                    Consumer(
+                        file_queue,
+                        watcher_handler,
+                        failure_callback_fn,
+                        batch_size,
+                        coalescer,
+                        completion,
+                        journal,
+                        metrics,
+                    )
+                )
+
+    def __route_file_queue(self) -> None:
+        """Route each queued file to the worker owning its parent directory."""
+        while self.__running:
+            event = self.__file_queue.get()
+            if event is None or not self.__running:
+                break
+            worker: int = hash(str(pathlib.Path(event.src_path).parent)) % len(
+                self.__worker_queues
+            )
+            self.__worker_queues[worker].put(event)
+
+    def __discard_worker_queues(self) -> None:
+        """Discard events held for workers (so blocked puts to them complete)."""
+        for worker_queue in self.__worker_queues:
+            while not worker_queue.empty():
+                _ = worker_queue.get()
+
+    def start(self) -> None:
+        """Start consumer threads (plus router when ordered)."""
+        if self.__running:
+            return
+        self.__running = True
+        for consumer in self.__consumers:
+            consumer.start()
+        if self.__ordered:
+            self.__route_events_thread = Thread(
+                target=self.__route_file_queue, name=self.__name + " router"
+            )
+            self.__route_events_thread.daemon = True
+            self.__route_events_thread.start()
+
+    def stop(self) -> None:
+        """Stop all consumer threads and discard any queued events."""
+        if self.__running is False:
+            return
+        self.__running = False
+        if self.__route_events_thread is not None:
+            self.__file_queue.put(None)
+            # Router may be waiting on a full worker queue
+            self.__discard_worker_queues()
+            if self.__route_events_thread is not current_thread():
+                self.__route_events_thread.join()
+            self.__route_events_thread = None
+            self.__discard_worker_queues()
+        for consumer in self.__consumers:
+            consumer.signal_stop()
+        for consumer in self.__consumers:
+            consumer.join()
+        while not self.__file_queue.empty():
+            _ = self.__file_queue.get()
+        self.__discard_worker_queues()
+
+    @property
+    def is_running(self) -> bool:
+        """Is the consumer pool running ?
+
+        Returns:
+            bool: == true then consumer pool running
+        """
+        return self.__running
+
+    @property
+    def workers(self) -> int:
+        """Number of consumer threads in pool.
+
+        Returns:
+            int: Number of consumer threads.
+        """
+        return len(self.__consumers)
@@ -5,12 +5,22 @@ import logging
 import json
 
 from builtin.handler_list import fpe_handler_list
-from core.constants import CONFIG_NAME, CONFIG_WATCHERS, CONFIG_FILENAME, CONFIG_NOGUI
+from core.constants import (
+    CONFIG_NAME,
+    CONFIG_WATCHERS,
+    CONFIG_FILENAME,
+    CONFIG_NOGUI,
+    CONFIG_SHAREDWORKERS,
+    CONFIG_METRICSPORT,
+)
 from core.error import FPEError
 from core.consumer import FailureCallBackFunction
 from core.config import ConfigDict
 from core.factory import Factory
 from core.watcher import Watcher
+from core.scheduler import WorkerScheduler
+from core.observers.observer_registry import ObserverRegistry
+from core.metrics import MetricsExporter, MetricsSnapshot
 from core.plugin import PluginLoader
 
 
@@ -51,6 +61,26 @@ class Engine:
 
         PluginLoader.load(self.__config["plugins"])
 
+        # Watchers share a pool of worker threads if configured
+
+        if CONFIG_SHAREDWORKERS not in self.__config:
+            self.__config[CONFIG_SHAREDWORKERS] = 0
+
+        self.__scheduler: WorkerScheduler = None  # type: ignore
+        if int(self.__config[CONFIG_SHAREDWORKERS]) > 0:
+            self.__scheduler = WorkerScheduler(int(self.__config[CONFIG_SHAREDWORKERS]))
+
+        # Watchers schedule their sources on one shared watchdog observer
+
+        self.__observer_registry: ObserverRegistry = ObserverRegistry()
+
+        # Metrics are served on a local port if one is configured
+
+        if CONFIG_METRICSPORT not in self.__config:
+            self.__config[CONFIG_METRICSPORT] = 0
+
+        self.__metrics_exporter: MetricsExporter = None  # type: ignore
+
         self.__watchers: dict[str, Watcher] = {}
         self.__watcher_failure_callback: FailureCallBackFunction = None
         self.__running: bool = False
@@ -61,7 +91,12 @@ class Engine:
         Args:
             watcher_config (ConfigDict): Watcher configuration.
         """
-        current_watcher = Watcher(watcher_config, self.__watcher_failure_callback)
+        current_watcher = Watcher(
+            watcher_config,
+            self.__watcher_failure_callback,
+            self.__scheduler,
+            self.__observer_registry,
+        )
         if current_watcher is not None:
             self.__watchers[watcher_config[CONFIG_NAME]] = current_watcher
 
@@ -128,6 +163,12 @@ class Engine:
         for watcher_name, _ in self.__watchers.items():
             self.start_watcher(watcher_name)
 
+        if int(self.__config[CONFIG_METRICSPORT]) > 0 and self.__metrics_exporter is None:
+            self.__metrics_exporter = MetricsExporter(
+                self.metrics, int(self.__config[CONFIG_METRICSPORT])
+            )
+            self.__metrics_exporter.start()
+
         self.__running = True
 
         logging.info("File Processing Engine started.")
@@ -139,6 +180,12 @@ class Engine:
             watcher.stop()
 
         self.__watchers.clear()
+        if self.__scheduler is not None:
+            self.__scheduler.shutdown()
+        self.__observer_registry.shutdown()
+        if self.__metrics_exporter is not None:
+            self.__metrics_exporter.stop()
+            self.__metrics_exporter = None  # type: ignore
         self.__running = False
 
     @property
@@ -146,6 +193,17 @@ class Engine:
         """Return true if engine running."""
         return self.__running
 
+    def metrics(self) -> dict[str, MetricsSnapshot]:
+        """Return metrics for each watcher.
+
+        Returns:
+            dict[str, MetricsSnapshot]: Watcher metrics keyed by watcher name.
+        """
+        return {
+            watcher_name: watcher.metrics
+            for watcher_name, watcher in list(self.__watchers.items())
+        }
+
     @property
     def watchers_list(self) -> list[str]:
         """Return list of current watcher names."""
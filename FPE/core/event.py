@@ -0,0 +1,18 @@
+"""FPE file event.
+
+Compact record placed on a watcher file queue for each file to be processed.
+
+"""
+
+from typing import NamedTuple
+
+
+class FileEvent(NamedTuple):
+    """Queued file event (sequence is the journal entry id when journaled,
+    enqueued the monotonic time it was queued; 0.0 when not known and complete
+    true if the file is known to be fully written, e.g. renamed into place)."""
+
+    src_path: str
+    sequence: int = 0
+    enqueued: float = 0.0
+    complete: bool = False
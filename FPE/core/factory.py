@@ -101,6 +101,15 @@ class Factory:
         """
         return list(Factory.__handler_creation_funcs.keys())
 
+    @staticmethod
+    def handler_functions() -> dict[str, Callable[..., IHandler]]:
+        """Return copy of all current watch handler creation functions.
+
+        Returns:
+            dict[str, Callable[..., IHandler]]: Watch handler type to creation function.
+        """
+        return Factory.__handler_creation_funcs.copy()
+
     @staticmethod
     def clear() -> None:
         """Clear watch handler type list."""
@@ -0,0 +1,47 @@
+"""FPE watcher file queue.
+
+Queue of file events for a watcher that calls a listener each time an event
+is put on it, so that a consumer serving many queues (the shared worker
+scheduler) can be woken without polling them. The journal queue extends it.
+
+"""
+
+from typing import Any, Callable
+from queue import Queue
+
+PutListenerFunction = Callable[[], None]
+
+
+class FileQueue(Queue):
+    """File event queue with a put listener."""
+
+    def __init__(self, maxsize: int = 0) -> None:
+        """Initialise file queue.
+
+        Args:
+            maxsize (int, optional): Maximum queued events (0 for unbounded). Defaults to 0.
+        """
+        super().__init__(maxsize)
+        self.__listener: PutListenerFunction | None = None
+
+    @property
+    def listener(self) -> PutListenerFunction | None:
+        """Function called after each put (None if there is none)."""
+        return self.__listener
+
+    @listener.setter
+    def listener(self, listener: PutListenerFunction | None) -> None:
+        self.__listener = listener
+
+    def put(self, item: Any, block: bool = True, timeout: float | None = None) -> None:
+        """Put an event on the queue then call the listener.
+
+        Args:
+            item (Any): File event (None is a consumer stop sentinel).
+            block (bool, optional): Wait for a free slot. Defaults to True.
+            timeout (float | None, optional): Maximum seconds to wait. Defaults to None.
+        """
+        super().put(item, block, timeout)
+        listener: PutListenerFunction | None = self.__listener
+        if listener is not None:
+            listener()
@@ -6,9 +6,9 @@ Handler utility static methods.
 
 
 import os
-import errno
 import pathlib
 import logging
+from threading import Lock
 from decouple import config
 
 from core.constants import (
@@ -20,11 +20,21 @@ from core.constants import (
 )
 from core.config import ConfigDict
 from core.interface.ihandler import IHandler
+from core.interface.icompletion import ICompletionDetector
+from core.completion.quiescence import QuiescenceCompletion
 
 
 class Handler:
     """Directory watcher handler utility static methods."""
 
+    # Guards handler counters updated from concurrent consumer threads
+
+    __counter_lock: Lock = Lock()
+
+    # Completion detector used when a watcher does not configure one
+
+    __default_completion: ICompletionDetector = QuiescenceCompletion()
+
     @staticmethod
     def normalize_path(path_to_normalise: str) -> str:
         """Normalise passed in path string.
@@ -74,27 +84,53 @@ class Handler:
         return directory_path
 
     @staticmethod
-    def wait_for_copy_completion(source_path: pathlib.Path) -> None:
+    def wait_for_copy_completion(
+        source_path: pathlib.Path,
+        completion: ICompletionDetector = None,  # type: ignore
+        complete: bool = False,
+    ) -> pathlib.Path | None:
         """Wait for file copy to be completed.
 
         Args:
             source_path (pathlib.Path):  Source file path.
+            completion (ICompletionDetector, optional): Completion detector. Defaults to size/mtime quiescence.
+            complete (bool, optional): File is known to be complete (no waiting). Defaults to False.
+
+        Returns:
+            pathlib.Path | None: File to process or None if there is nothing to process.
         """
 
-        if source_path.is_file() and source_path.exists():
-            failure: bool = True
-            while failure:
-                try:
-                    with open(source_path, "rb") as file_path:
-                        _ = file_path.read()
-                    failure = False
-                except IOError as error:
-                    if error.errno == errno.EACCES:
-                        pass
-                    else:
-                        failure = False
-
-            source_path.chmod(source_path.stat().st_mode | 0o664)
+        if completion is None:
+            completion = Handler.__default_completion
+
+        if not source_path.is_file():
+            return source_path
+
+        completed_path: pathlib.Path | None = (
+            source_path if complete else completion.wait(source_path)
+        )
+        if completed_path is not None:
+            try:
+                completed_path.chmod(completed_path.stat().st_mode | 0o664)
+            except FileNotFoundError:
+                return None
+
+        return completed_path
+
+    @staticmethod
+    def file_size(source_path: pathlib.Path) -> int:
+        """Return size of file (0 if it cannot be read).
+
+        Args:
+            source_path (pathlib.Path): Source file path.
+
+        Returns:
+            int: File size in bytes.
+        """
+        try:
+            return source_path.stat().st_size
+        except OSError:
+            return 0
 
     @staticmethod
     def remove_source(root_path: pathlib.Path, source_path: pathlib.Path):
@@ -104,15 +140,18 @@ class Handler:
             root_path (pathlib.Path): Root path.
             source_path (pathlib.Path): Source file path.
         """
-        if source_path.is_file() and source_path.exists():
+        if source_path.is_file():
             source_path.unlink()
-            while source_path.parent != root_path:
-                if len(os.listdir(source_path.parent)) == 0:
-                    source_path.parent.chmod(source_path.parent.stat().st_mode | 0o664)
-                    source_path.parent.rmdir()
-                    source_path = source_path.parent
-                    continue
-                break
+        elif source_path.exists():
+            return
+        # A handler may have already moved the file; still prune its directories
+        while source_path.parent != root_path and source_path.parent.exists():
+            if len(os.listdir(source_path.parent)) == 0:
+                source_path.parent.chmod(source_path.parent.stat().st_mode | 0o664)
+                source_path.parent.rmdir()
+                source_path = source_path.parent
+                continue
+            break
 
     @staticmethod
     def get_config(handler_config: ConfigDict, attribute: str) -> any:
@@ -149,6 +188,40 @@ class Handler:
 
         ihandler.source = Handler.setup_path(ihandler.source)
 
+    @staticmethod
+    def increment_operation(handler: IHandler, operation: str) -> None:
+        """Increment count of a handler specific operation (e.g. copy strategy used).
+
+        Args:
+            handler (IHandler): Handler.
+            operation (str): Operation name.
+        """
+        with Handler.__counter_lock:
+            handler.operations = {
+                **handler.operations,
+                operation: handler.operations.get(operation, 0) + 1,
+            }
+
+    @staticmethod
+    def increment_files_processed(handler: IHandler) -> None:
+        """Increment handler files processed count.
+
+        Args:
+            handler (IHandler): Handler.
+        """
+        with Handler.__counter_lock:
+            handler.files_processed += 1
+
+    @staticmethod
+    def increment_errors(handler: IHandler) -> None:
+        """Increment handler error count.
+
+        Args:
+            handler (IHandler): Handler.
+        """
+        with Handler.__counter_lock:
+            handler.errors += 1
+
     @staticmethod
     def status(handler: IHandler) -> str:
         """Return string and current handler status.
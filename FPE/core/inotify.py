@@ -0,0 +1,205 @@
+"""FPE Linux inotify.
+
+Minimal ctypes binding to the Linux inotify API used by the native observer
+and completion detection code.
+
+"""
+
+import os
+import sys
+import select
+import struct
+import ctypes
+import ctypes.util
+from typing import NamedTuple
+
+from core.error import FPEError
+
+# inotify event masks (see inotify(7))
+
+IN_ACCESS: int = 0x00000001
+IN_MODIFY: int = 0x00000002
+IN_ATTRIB: int = 0x00000004
+IN_CLOSE_WRITE: int = 0x00000008
+IN_CLOSE_NOWRITE: int = 0x00000010
+IN_OPEN: int = 0x00000020
+IN_MOVED_FROM: int = 0x00000040
+IN_MOVED_TO: int = 0x00000080
+IN_CREATE: int = 0x00000100
+IN_DELETE: int = 0x00000200
+IN_DELETE_SELF: int = 0x00000400
+IN_MOVE_SELF: int = 0x00000800
+IN_UNMOUNT: int = 0x00002000
+IN_Q_OVERFLOW: int = 0x00004000
+IN_IGNORED: int = 0x00008000
+IN_ONLYDIR: int = 0x01000000
+IN_DONT_FOLLOW: int = 0x02000000
+IN_EXCL_UNLINK: int = 0x04000000
+IN_ISDIR: int = 0x40000000
+
+IN_NONBLOCK: int = os.O_NONBLOCK
+IN_CLOEXEC: int = getattr(os, "O_CLOEXEC", 0o2000000)
+
+# Size of struct inotify_event header (int wd; uint32 mask, cookie, len)
+
+_EVENT_HEADER: struct.Struct = struct.Struct("iIII")
+_READ_SIZE: int = 64 * 1024
+
+
+class InotifyError(FPEError):
+    """An error occurred in the inotify binding."""
+
+    def __str__(self) -> str:
+        """Return string for exception.
+
+        Returns:
+            str: Exception string.
+        """
+
+        return FPEError.error_prefix("Inotify") + str(self.error)
+
+
+class InotifyEvent(NamedTuple):
+    """Decoded inotify event."""
+
+    wd: int
+    mask: int
+    cookie: int
+    name: bytes
+
+
+def _load_libc() -> ctypes.CDLL:
+    """Load C library if running on Linux.
+
+    Returns:
+        ctypes.CDLL: C library (None if not available).
+    """
+    if not sys.platform.startswith("linux"):
+        return None  # type: ignore
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    libc.inotify_init1.argtypes = [ctypes.c_int]
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    return libc
+
+
+_libc: ctypes.CDLL = _load_libc()
+
+
+def available() -> bool:
+    """Is inotify available on this platform ?
+
+    Returns:
+        bool: true if inotify can be used.
+    """
+    return _libc is not None
+
+
+def max_user_watches() -> int:
+    """Return the per user inotify watch limit.
+
+    Returns:
+        int: Maximum watches (0 if not known).
+    """
+    try:
+        with open(
+            "/proc/sys/fs/inotify/max_user_watches", "r", encoding="utf-8"
+        ) as limit_file:
+            return int(limit_file.read())
+    except (OSError, ValueError):
+        return 0
+
+
+class Inotify:
+    """Non-blocking inotify instance."""
+
+    def __init__(self) -> None:
+        """Create inotify instance.
+
+        Raises:
+            InotifyError: inotify not available or could not be initialised.
+        """
+        if _libc is None:
+            raise InotifyError("inotify is only available on Linux.")
+        self.__fd: int = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.__fd < 0:
+            raise InotifyError(os.strerror(ctypes.get_errno()))
+        # poll (unlike select) is not limited to descriptors below FD_SETSIZE
+        self.__poll = select.poll()
+        self.__poll.register(self.__fd, select.POLLIN)
+
+    def add_watch(self, path: str, mask: int) -> int:
+        """Add (or modify) watch on a path.
+
+        Args:
+            path (str): Path to watch.
+            mask (int): Event mask.
+
+        Raises:
+            InotifyError: Watch could not be added.
+
+        Returns:
+            int: Watch descriptor.
+        """
+        wd: int = _libc.inotify_add_watch(self.__fd, os.fsencode(path), mask)
+        if wd < 0:
+            error_number: int = ctypes.get_errno()
+            raise InotifyError(OSError(error_number, os.strerror(error_number), path))
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        """Remove watch (ignoring any already removed by the kernel).
+
+        Args:
+            wd (int): Watch descriptor.
+        """
+        _libc.inotify_rm_watch(self.__fd, wd)
+
+    def wait(self, timeout: float = None) -> bool:  # type: ignore
+        """Wait for events to be readable.
+
+        Args:
+            timeout (float, optional): Timeout in seconds (None waits forever). Defaults to None.
+
+        Returns:
+            bool: true if events are ready to be read.
+        """
+        return (
+            len(self.__poll.poll(None if timeout is None else int(timeout * 1000)))
+            != 0
+        )
+
+    def read_events(self) -> list[InotifyEvent]:
+        """Read and decode all currently queued events.
+
+        Returns:
+            list[InotifyEvent]: Queued events (empty if none).
+        """
+        events: list[InotifyEvent] = []
+        while True:
+            try:
+                buffer: bytes = os.read(self.__fd, _READ_SIZE)
+            except BlockingIOError:
+                break
+            offset: int = 0
+            while offset < len(buffer):
+                wd, mask, cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                name: bytes = buffer[offset : offset + length].rstrip(b"\0")
+                offset += length
+                events.append(InotifyEvent(wd, mask, cookie, name))
+        return events
+
+    def fileno(self) -> int:
+        """Return inotify file descriptor.
+
+        Returns:
+            int: File descriptor.
+        """
+        return self.__fd
+
+    def close(self) -> None:
+        """Close inotify instance."""
+        if self.__fd >= 0:
+            os.close(self.__fd)
+            self.__fd = -1
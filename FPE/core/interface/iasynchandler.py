@@ -0,0 +1,38 @@
+"""FPE file watcher async handler interface.
+
+Protocol class that defines the watcher file handler interface for handlers
+whose file processing is an asyncio coroutine.
+
+"""
+
+import pathlib
+from typing import Protocol
+
+
+class IAsyncHandler(Protocol):
+    """Interface for async watcher file handler."""
+
+    name: str = ""
+    source: str = ""
+    recursive: bool = False
+    exit_on_failure: bool = False
+    delete_source: bool = True
+    files_processed: int = 0
+    errors: int = 0
+
+    async def process(self, source_path: pathlib.Path) -> bool:
+        """Perform watcher file processing.
+
+        Args:
+            source_path (pathlib.Path): Source file path.
+        """
+
+    def status(self) -> str:
+        """Return current handler status string
+
+        Returns:
+            str: Handler status string.
+        """
+
+    def close(self) -> None:
+        """Release anything held open between files (called when the watcher stops)."""
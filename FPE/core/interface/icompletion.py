@@ -0,0 +1,23 @@
+"""FPE file copy completion detector interface.
+
+Protocol class that defines how a consumer decides that a file queued by an
+observer has been completely written and is ready to be processed.
+
+"""
+
+import pathlib
+from typing import Protocol
+
+
+class ICompletionDetector(Protocol):
+    """Interface for file copy completion detector."""
+
+    def wait(self, source_path: pathlib.Path) -> pathlib.Path | None:
+        """Wait for file to be completely written.
+
+        Args:
+            source_path (pathlib.Path): Queued file path.
+
+        Returns:
+            pathlib.Path | None: File to process or None if nothing to process yet.
+        """
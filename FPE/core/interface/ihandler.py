@@ -18,6 +18,7 @@ class IHandler(Protocol):
     delete_source: bool = True
     files_processed: int = 0
     errors: int = 0
+    operations: dict[str, int] = {}
 
     def process(self, source_path: pathlib.Path) -> bool:
         """Perform watcher file processing.
@@ -32,3 +33,6 @@ class IHandler(Protocol):
         Returns:
             str: Handler status string.
         """
+
+    def close(self) -> None:
+        """Release anything held open between files (called when the watcher stops)."""
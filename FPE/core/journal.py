@@ -0,0 +1,316 @@
+"""FPE durable file queue journal.
+
+A watcher file queue backed by an append-only SQLite (WAL) table so that
+queued files survive a restart or crash. New entries are written and fsynced
+in batches (by count or after a short interval) and removed once a consumer
+acknowledges them; anything not acknowledged is replayed when the watcher
+starts. Only a bounded window of entries is held in memory, the rest are paged
+in from the journal as the window empties. A closed journal is reopened when
+it is next replayed.
+
+"""
+
+import time
+import sqlite3
+from collections import deque
+from threading import Timer
+
+from core.event import FileEvent
+from core.file_queue import FileQueue
+from core.error import FPEError
+
+# Default in-memory window size and journal sync batching
+
+JOURNAL_WINDOW: int = 10000
+JOURNAL_SYNC_BATCH: int = 1000
+JOURNAL_SYNC_INTERVAL: float = 0.05
+
+
+class JournalError(FPEError):
+    """An error occurred in the file queue journal."""
+
+    def __str__(self) -> str:
+        """Return string for exception.
+
+        Returns:
+            str: Exception string.
+        """
+
+        return FPEError.error_prefix("Journal") + str(self.error)
+
+
+class JournalQueue(FileQueue):
+    """File queue with a durable on-disk journal."""
+
+    def __init__(
+        self,
+        journal_file: str,
+        window: int = JOURNAL_WINDOW,
+        sync_batch: int = JOURNAL_SYNC_BATCH,
+        sync_interval: float = JOURNAL_SYNC_INTERVAL,
+    ) -> None:
+        """Open (or create) journal and initialise queue.
+
+        Args:
+            journal_file (str): Journal SQLite file.
+            window (int, optional): Maximum entries held in memory. Defaults to JOURNAL_WINDOW.
+            sync_batch (int, optional): Journal changes per sync. Defaults to JOURNAL_SYNC_BATCH.
+            sync_interval (float, optional): Maximum time before a sync. Defaults to JOURNAL_SYNC_INTERVAL.
+
+        Raises:
+            JournalError: Journal could not be opened.
+        """
+
+        if window < 1 or sync_batch < 1:
+            raise JournalError("Journal window and sync batch must be at least one.")
+
+        self.__journal_file: str = journal_file
+        self.__window_size: int = window
+        self.__sync_batch: int = sync_batch
+        self.__sync_interval: float = sync_interval
+        self.__connection: sqlite3.Connection = None  # type: ignore
+
+        self.__open()
+
+        super().__init__()
+
+    def __open(self) -> None:
+        """Open (or create) journal file.
+
+        Raises:
+            JournalError: Journal could not be opened.
+        """
+        try:
+            self.__connection = sqlite3.connect(
+                self.__journal_file, check_same_thread=False
+            )
+            self.__connection.execute("PRAGMA journal_mode=WAL")
+            self.__connection.execute("PRAGMA synchronous=FULL")
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS events "
+                "(id INTEGER PRIMARY KEY, src_path TEXT NOT NULL)"
+            )
+            self.__connection.execute(
+                "CREATE INDEX IF NOT EXISTS events_src_path ON events (src_path)"
+            )
+            self.__connection.commit()
+            self.__next_id: int = (
+                self.__connection.execute("SELECT MAX(id) FROM events").fetchone()[0]
+                or 0
+            ) + 1
+        except sqlite3.Error as error:
+            raise JournalError(error) from error
+
+    def _init(self, maxsize: int) -> None:
+        """Initialise queue storage (called by Queue with its mutex available).
+
+        Args:
+            maxsize (int): Unused; journal queue is unbounded.
+        """
+        self.__window: deque[FileEvent] = deque()
+        self.__sentinels: int = 0
+        self.__unsynced: dict[int, str] = {}
+        self.__acknowledged: list[int] = []
+        self.__last_sync: float = time.monotonic()
+        self.__sync_timer: Timer = None  # type: ignore
+        self.__loaded_upto: int = 0
+        self.__spilled: int = self.__journal_count()
+
+    def _qsize(self) -> int:
+        """Return number of queued entries.
+
+        Returns:
+            int: Queued entry count.
+        """
+        return len(self.__window) + self.__spilled + self.__sentinels
+
+    def _put(self, item: FileEvent | None) -> None:
+        """Journal an event and add it to the window if there is room.
+
+        Args:
+            item (FileEvent | None): File event (None is the consumer stop sentinel).
+        """
+        if item is None:
+            self.__sentinels += 1
+            return
+        sequence: int = self.__next_id
+        self.__next_id += 1
+        self.__unsynced[sequence] = item.src_path
+        if self.__spilled == 0 and len(self.__window) < self.__window_size:
+            self.__window.append(item._replace(sequence=sequence))
+            self.__loaded_upto = sequence
+        else:
+            self.__spilled += 1
+        self.__sync_when_due()
+
+    def _get(self) -> FileEvent | None:
+        """Return next queued event; paging entries in from journal as needed.
+
+        Returns:
+            FileEvent | None: File event (None is the consumer stop sentinel).
+        """
+        if self.__sentinels:
+            self.__sentinels -= 1
+            return None
+        if not self.__window:
+            self.__load_window()
+        return self.__window.popleft()
+
+    def __journal_count(self) -> int:
+        """Return number of entries in journal.
+
+        Returns:
+            int: Journal entry count.
+        """
+        try:
+            return self.__connection.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        except sqlite3.Error as error:
+            raise JournalError(error) from error
+
+    def __load_window(self) -> None:
+        """Page next block of spilled entries in from journal."""
+        self.__sync()
+        try:
+            rows = self.__connection.execute(
+                "SELECT id, src_path FROM events WHERE id > ? ORDER BY id LIMIT ?",
+                (self.__loaded_upto, self.__window_size),
+            ).fetchall()
+        except sqlite3.Error as error:
+            raise JournalError(error) from error
+        for sequence, src_path in rows:
+            self.__window.append(FileEvent(src_path, sequence))
+        if rows:
+            self.__loaded_upto = rows[-1][0]
+        self.__spilled -= len(rows)
+
+    def __sync_when_due(self) -> None:
+        """Sync journal if batch is full or interval has passed, otherwise make sure a sync is scheduled."""
+        if (
+            len(self.__unsynced) + len(self.__acknowledged) >= self.__sync_batch
+            or time.monotonic() - self.__last_sync >= self.__sync_interval
+        ):
+            self.__sync()
+        elif self.__sync_timer is None:
+            self.__sync_timer = Timer(self.__sync_interval, self.__timed_sync)
+            self.__sync_timer.daemon = True
+            self.__sync_timer.start()
+
+    def __timed_sync(self) -> None:
+        """Sync journal from timer."""
+        with self.mutex:
+            self.__sync_timer = None  # type: ignore
+            self.__sync()
+
+    def __sync(self) -> None:
+        """Write new and acknowledged entries to journal in one transaction."""
+        self.__last_sync = time.monotonic()
+        if not self.__unsynced and not self.__acknowledged:
+            return
+        try:
+            with self.__connection:
+                self.__connection.executemany(
+                    "INSERT INTO events (id, src_path) VALUES (?, ?)",
+                    self.__unsynced.items(),
+                )
+                self.__connection.executemany(
+                    "DELETE FROM events WHERE id = ?",
+                    ((sequence,) for sequence in self.__acknowledged),
+                )
+        except sqlite3.Error as error:
+            raise JournalError(error) from error
+        self.__unsynced.clear()
+        self.__acknowledged.clear()
+
+    def acknowledge(self, event: FileEvent) -> None:
+        """Acknowledge an event has been handled so it is removed from journal.
+
+        Args:
+            event (FileEvent): Handled file event.
+        """
+        with self.mutex:
+            if self.__unsynced.pop(event.sequence, None) is None:
+                self.__acknowledged.append(event.sequence)
+            self.__sync_when_due()
+
+    def replay(self) -> int:
+        """Re-queue every unacknowledged journal entry (discarding the in-memory window).
+
+        Entries are paged back in from the journal as the window empties, so none
+        are read here.
+
+        Raises:
+            JournalError: Closed journal could not be reopened or read.
+
+        Returns:
+            int: Number of entries re-queued.
+        """
+        with self.mutex:
+            if self.__connection is None:
+                self.__open()
+            self.__sync()
+            self.__window.clear()
+            self.__sentinels = 0
+            self.__loaded_upto = 0
+            self.__spilled = self.__journal_count()
+            if self.__spilled:
+                self.not_empty.notify_all()
+            return self.__spilled
+
+    def contains(self, src_path: str) -> bool:
+        """Is there an unacknowledged journal entry for a path ?
+
+        Args:
+            src_path (str): File path.
+
+        Raises:
+            JournalError: Journal could not be read.
+
+        Returns:
+            bool: true if path is journaled.
+        """
+        with self.mutex:
+            if src_path in self.__unsynced.values():
+                return True
+            try:
+                return (
+                    self.__connection.execute(
+                        "SELECT 1 FROM events WHERE src_path = ? LIMIT 1", (src_path,)
+                    ).fetchone()
+                    is not None
+                )
+            except sqlite3.Error as error:
+                raise JournalError(error) from error
+
+    def sync(self) -> None:
+        """Sync any outstanding changes to journal."""
+        with self.mutex:
+            self.__sync()
+
+    def close(self) -> None:
+        """Sync and close journal."""
+        with self.mutex:
+            if self.__connection is None:
+                return
+            if self.__sync_timer is not None:
+                self.__sync_timer.cancel()
+                self.__sync_timer = None  # type: ignore
+            self.__sync()
+            self.__connection.close()
+            self.__connection = None  # type: ignore
+
+    @property
+    def closed(self) -> bool:
+        """Is journal closed ?"""
+        return self.__connection is None
+
+    @property
+    def journaled(self) -> int:
+        """Number of unacknowledged entries (including those not yet synced).
+
+        Returns:
+            int: Unacknowledged entry count.
+        """
+        with self.mutex:
+            return self.__journal_count() + len(self.__unsynced) - len(
+                self.__acknowledged
+            )
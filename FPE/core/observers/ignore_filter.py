@@ -0,0 +1,61 @@
+"""FPE observer ignore filter.
+
+File names matching any of a watcher's ignore patterns (fnmatch style, e.g.
+"*.tmp") are not queued by its observer. A writer that creates a temporary
+file and then renames it into place is therefore only seen at the rename.
+The patterns are compiled into a single regular expression that is matched
+against the file name. No files are ignored unless patterns are configured
+and each file that is ignored is logged.
+
+"""
+
+import os
+import re
+import logging
+import fnmatch
+from typing import Iterable
+
+# Common temporary file name patterns (not ignored unless configured)
+
+IGNORE_PATTERNS: tuple[str, ...] = (
+    "*.tmp",
+    "*.part",
+    "*.partial",
+    "*.crdownload",
+    ".*.swp",
+    "*~",
+)
+
+
+class IgnoreFilter:
+    """Match file names against ignore patterns."""
+
+    def __init__(self, patterns: Iterable[str] = ()) -> None:
+        """Initialise ignore filter.
+
+        Args:
+            patterns (Iterable[str], optional): fnmatch style file name patterns. Defaults to ().
+        """
+        self.patterns: tuple[str, ...] = tuple(patterns)
+        self.__pattern: re.Pattern | None = (
+            re.compile("|".join(fnmatch.translate(pattern) for pattern in self.patterns))
+            if self.patterns
+            else None
+        )
+
+    def ignored(self, path: str) -> bool:
+        """Is a file to be ignored ?
+
+        Args:
+            path (str): File path.
+
+        Returns:
+            bool: true if file name matches an ignore pattern.
+        """
+        if (
+            self.__pattern is None
+            or self.__pattern.match(os.path.basename(path)) is None
+        ):
+            return False
+        logging.info("Ignoring file %s.", path)
+        return True
@@ -0,0 +1,632 @@
+"""FPE native inotify observer (Linux).
+
+Every inotify observer registers its watcher source on one shared inotify
+instance that is served by a single epoll thread, rather than each watcher
+running its own watchdog emitter and dispatcher threads. Only IN_CLOSE_WRITE
+and IN_MOVED_TO are reported for files, so a file is queued once its writer
+has closed it or it has been renamed into place. Each watch keeps just its
+directory path (bytes) and owning observers, and the raw event name is
+joined on to that path when a file is queued.
+
+A file moved into place is queued as complete (skipping completion polling)
+and files matching the watcher ignore patterns are not queued.
+
+Recursive sources are watched a directory at a time as directories appear.
+A new directory is listed after its watch has been added, so files written
+into it before the watch existed are still queued (files still open for
+writing are left to their IN_CLOSE_WRITE). The files queued by a listing are
+only remembered until the events already queued by then have been read, so
+that a close reported late is not queued twice. Once the watches held near
+the fs.inotify.max_user_watches limit (or the kernel refuses a watch with
+ENOSPC) further sub-trees are not watched but polled instead. Directories
+are listed without holding the dispatcher lock, so registering a large source
+does not hold up events for other watchers. Should the kernel event queue
+overflow, the watches of every observer are renewed and its source rescanned
+for files whose events were lost; only files changed (by ctime, which a write
+or rename updates) since the last complete read of events are queued again.
+
+"""
+
+import os
+import time
+import errno
+import select
+import logging
+from queue import Queue
+from threading import Lock, RLock, Thread
+
+from core.interface.ihandler import IHandler
+from core.interface.iobserver import IObserver
+from core.coalescer import EventCoalescer
+from core.event import FileEvent
+from core.observers.polling_observer import PollingObserver, POLLING_INTERVAL
+from core.observers.ignore_filter import IgnoreFilter
+from core.backlog import BacklogScanner
+from core.error import FPEError
+from core import inotify
+from core.inotify import (
+    Inotify,
+    InotifyError,
+    InotifyEvent,
+    IN_CLOSE_WRITE,
+    IN_MOVED_TO,
+    IN_CREATE,
+    IN_DELETE_SELF,
+    IN_MOVE_SELF,
+    IN_IGNORED,
+    IN_Q_OVERFLOW,
+    IN_ISDIR,
+    IN_ONLYDIR,
+    IN_EXCL_UNLINK,
+)
+
+# Events watched on each directory (IN_CREATE is only acted on for directories)
+
+INOTIFY_WATCH_MASK: int = (
+    IN_CLOSE_WRITE
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+    | IN_EXCL_UNLINK
+)
+
+# Fraction of max_user_watches that may be held before sub-trees are polled
+
+INOTIFY_WATCH_HEADROOM: float = 0.9
+
+# Seconds before the last complete read of events that an overflow rescan goes back
+
+INOTIFY_RESCAN_MARGIN: float = 1.0
+
+
+class InotifyObserverError(FPEError):
+    """An error occurred in the inotify observer."""
+
+    def __str__(self) -> str:
+        """Return string for exception.
+
+        Returns:
+            str: Exception string.
+        """
+
+        return FPEError.error_prefix("InotifyObserver") + str(self.error)
+
+
+class _Watch:
+    """Watched directory, the observers that own it and files queued by listing it
+    (moved is set when the directory is renamed within a watched tree)."""
+
+    __slots__ = ("path", "owners", "listed", "moved")
+
+    def __init__(self, path: bytes) -> None:
+        self.path: bytes = path
+        self.owners: list["InotifyObserver"] = []
+        self.listed: dict[bytes, tuple[int, int]] = {}
+        self.moved: bool = False
+
+
+def _being_written(path: bytes) -> bool:
+    """Is a file open for writing (so its IN_CLOSE_WRITE is still to come) ?
+
+    A read lease cannot be taken on a file that is open for writing. Where
+    leases are not allowed (another owner, network filesystem) the file is
+    taken to be closed.
+
+    Args:
+        path (bytes): File path.
+
+    Returns:
+        bool: true if file is open for writing.
+    """
+    import fcntl  # pylint: disable=import-outside-toplevel
+
+    try:
+        fd: int = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+    except OSError:
+        return False
+    try:
+        fcntl.fcntl(fd, fcntl.F_SETLEASE, fcntl.F_RDLCK)
+        fcntl.fcntl(fd, fcntl.F_SETLEASE, fcntl.F_UNLCK)
+        return False
+    except OSError as error:
+        return error.errno == errno.EAGAIN
+    finally:
+        os.close(fd)
+
+
+class InotifyDispatcher:
+    """One inotify instance and epoll thread shared by all inotify observers."""
+
+    __shared: "InotifyDispatcher" = None  # type: ignore
+    __shared_lock: Lock = Lock()
+
+    @staticmethod
+    def shared() -> "InotifyDispatcher":
+        """Return dispatcher shared by every observer in the process.
+
+        Returns:
+            InotifyDispatcher: Shared dispatcher.
+        """
+        with InotifyDispatcher.__shared_lock:
+            if InotifyDispatcher.__shared is None:
+                InotifyDispatcher.__shared = InotifyDispatcher()
+            return InotifyDispatcher.__shared
+
+    def __init__(self, watch_limit: int | None = None) -> None:
+        """Initialise dispatcher; inotify and the thread start with the first registration.
+
+        Args:
+            watch_limit (int | None, optional): Watches held before sub-trees are polled
+                (0 for no limit). Defaults to INOTIFY_WATCH_HEADROOM of max_user_watches.
+
+        Raises:
+            InotifyObserverError: inotify is not available.
+        """
+        if not inotify.available():
+            raise InotifyObserverError("inotify is only available on Linux.")
+        if watch_limit is None:
+            watch_limit = int(inotify.max_user_watches() * INOTIFY_WATCH_HEADROOM)
+        self.__watch_limit: int = watch_limit
+        self.__limit_warned: bool = False
+        self.__overflowed: bool = False
+        self.__lock: RLock = RLock()
+        self.__inotify: Inotify = None  # type: ignore
+        self.__watches: dict[int, _Watch] = {}
+        self.__owned: dict["InotifyObserver", set[int]] = {}
+        self.__listed: list[_Watch] = []
+        self.__thread: Thread = None  # type: ignore
+        self.__wake_fds: tuple[int, int] = (-1, -1)
+
+    @property
+    def watches(self) -> int:
+        """Number of inotify watches held."""
+        return len(self.__watches)
+
+    @property
+    def listed(self) -> int:
+        """Number of files remembered from listing new directories."""
+        with self.__lock:
+            return sum(len(watch.listed) for watch in self.__watches.values())
+
+    @property
+    def is_running(self) -> bool:
+        """Is dispatcher thread running ?"""
+        return self.__thread is not None
+
+    def __start(self) -> None:
+        """Create inotify instance and start the epoll thread (lock held)."""
+        self.__inotify = Inotify()
+        self.__wake_fds = os.pipe()
+        self.__thread = Thread(
+            target=self.__run,
+            args=(self.__inotify, self.__wake_fds[0]),
+            name="FPE inotify",
+            daemon=True,
+        )
+        self.__thread.start()
+
+    def __stop(self) -> None:
+        """Stop the epoll thread and close inotify instance (lock held)."""
+        thread: Thread = self.__thread
+        inotify_instance: Inotify = self.__inotify
+        wake_fds: tuple[int, int] = self.__wake_fds
+        self.__thread = None  # type: ignore
+        self.__inotify = None  # type: ignore
+        self.__watches.clear()
+        self.__listed.clear()
+        os.write(wake_fds[1], b"\0")
+        # The thread needs the lock to see the wake up
+        self.__lock.release()
+        try:
+            thread.join()
+        finally:
+            self.__lock.acquire()
+        for fd in wake_fds:
+            os.close(fd)
+        inotify_instance.close()
+
+    def __add_watch(self, path: bytes, owner: "InotifyObserver") -> tuple[_Watch, bool]:
+        """Watch a directory for an observer (lock held).
+
+        A directory renamed within a watched tree keeps its watch descriptor,
+        so the paths of its watch and those below it are updated instead.
+
+        Args:
+            path (bytes): Directory path.
+            owner (InotifyObserver): Observer owning the watch.
+
+        Returns:
+            tuple[_Watch, bool]: Watch record and true if it is a renamed directory.
+        """
+        wd: int = self.__inotify.add_watch(path, INOTIFY_WATCH_MASK)  # type: ignore
+        watch: _Watch | None = self.__watches.get(wd)
+        renamed: bool = False
+        if watch is None:
+            watch = self.__watches[wd] = _Watch(path)
+        elif watch.path != path:
+            self.__rename_tree(watch.path, path)
+            watch.moved = renamed = True
+        if owner not in watch.owners:
+            watch.owners.append(owner)
+        self.__owned[owner].add(wd)
+        return watch, renamed
+
+    def __tree_watches(self, path: bytes) -> list[int]:
+        """Return descriptors of the watches on a directory and those below it (lock held).
+
+        Args:
+            path (bytes): Directory path.
+
+        Returns:
+            list[int]: Watch descriptors.
+        """
+        below: bytes = path + b"/"
+        return [
+            wd
+            for wd, watch in self.__watches.items()
+            if watch.path == path or watch.path.startswith(below)
+        ]
+
+    def __rename_tree(self, old_path: bytes, new_path: bytes) -> None:
+        """Update paths of the watches on a renamed directory and below it (lock held).
+
+        Args:
+            old_path (bytes): Directory path before rename.
+            new_path (bytes): Directory path after rename.
+        """
+        for wd in self.__tree_watches(old_path):
+            watch: _Watch = self.__watches[wd]
+            watch.path = new_path + watch.path[len(old_path) :]
+
+    def __remove_tree(self, path: bytes) -> None:
+        """Remove the watches on a directory and below it (lock held).
+
+        Args:
+            path (bytes): Directory path.
+        """
+        for wd in self.__tree_watches(path):
+            watch: _Watch = self.__watches.pop(wd)
+            for owner in watch.owners:
+                self.__owned.get(owner, set()).discard(wd)
+            self.__inotify.rm_watch(wd)
+
+    def __watch_or_poll(
+        self, directory: bytes, owner: "InotifyObserver", root: bool
+    ) -> tuple[_Watch | None, bool]:
+        """Watch a directory unless watches are near exhaustion.
+
+        Args:
+            directory (bytes): Directory path.
+            owner (InotifyObserver): Observer owning the watch.
+            root (bool): Directory is the root of the tree being added.
+
+        Raises:
+            InotifyError: Root directory could not be watched.
+
+        Returns:
+            tuple[_Watch | None, bool]: Watch record (None if not watched) and
+                true if it is a renamed directory or is to be polled.
+        """
+        with self.__lock:
+            if self.__inotify is None or owner not in self.__owned:
+                return None, False
+            if not 0 < self.__watch_limit <= len(self.__watches):
+                try:
+                    return self.__add_watch(directory, owner)
+                except InotifyError as error:
+                    if getattr(error.error, "errno", None) != errno.ENOSPC:
+                        if root:
+                            raise
+                        logging.debug("Could not watch %s: %s", directory, error)
+                        return None, False
+            if not self.__limit_warned:
+                logging.warning(
+                    "inotify watches near exhaustion (%d held); polling sub-trees from %s.",
+                    len(self.__watches),
+                    os.fsdecode(directory),
+                )
+                self.__limit_warned = True
+            return None, True
+
+    def __add_tree(self, path: bytes, owner: "InotifyObserver", new: bool = False) -> None:
+        """Watch a directory and (for a recursive observer) every directory below it.
+
+        Each directory is listed after its watch is added; so that when it has
+        just appeared any files created before the watch existed are queued.
+        The lock is only taken to add each watch.
+
+        Args:
+            path (bytes): Directory path.
+            owner (InotifyObserver): Observer owning the watches.
+            new (bool, optional): Directory has just appeared. Defaults to False.
+        """
+        directories: list[bytes] = [path]
+        while directories:
+            directory: bytes = directories.pop()
+            watch, skip = self.__watch_or_poll(directory, owner, directory == path)
+            if watch is None:
+                if skip:
+                    owner.poll_subtree(os.fsdecode(directory), new)
+                continue
+            renamed: bool = skip
+            # A renamed directory's tree is already watched and its files queued
+            if renamed or not (owner.recursive or new):
+                continue
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if owner.recursive:
+                                directories.append(entry.path)
+                        elif (
+                            new
+                            and entry.is_file(follow_symlinks=False)
+                            and not _being_written(entry.path)
+                        ):
+                            stat: os.stat_result = entry.stat(follow_symlinks=False)
+                            watch.listed[entry.name] = (stat.st_size, stat.st_mtime_ns)
+                            owner.queue_file(os.fsdecode(entry.path))
+            except OSError as error:
+                if directory == path and not new:
+                    raise
+                logging.debug("Could not list %s: %s", directory, error)
+            if watch.listed:
+                with self.__lock:
+                    self.__listed.append(watch)
+
+    def register(self, owner: "InotifyObserver") -> None:
+        """Start watching an observer's source.
+
+        Args:
+            owner (InotifyObserver): Observer.
+
+        Raises:
+            InotifyObserverError: Source could not be watched.
+        """
+        with self.__lock:
+            if self.__thread is None:
+                self.__start()
+            self.__owned[owner] = set()
+        try:
+            self.__add_tree(os.fsencode(owner.source), owner)
+        except (InotifyError, OSError) as error:
+            with self.__lock:
+                self.__release(owner)
+            raise InotifyObserverError(error) from error
+
+    def __rescan(self, owner: "InotifyObserver", since: int) -> None:
+        """Renew an observer's watches and queue the files in its source changed since a time.
+
+        Args:
+            owner (InotifyObserver): Observer.
+            since (int): Time (ns) files must have changed after to be queued.
+        """
+        try:
+            self.__add_tree(os.fsencode(owner.source), owner)
+            owner.rescan(since)
+        except (InotifyError, OSError) as error:
+            logging.warning("Could not rescan %s: %s", owner.source, error)
+
+    def __release(self, owner: "InotifyObserver") -> None:
+        """Remove an observer's watches; stopping the thread if it was the last (lock held).
+
+        Args:
+            owner (InotifyObserver): Observer.
+        """
+        for wd in self.__owned.pop(owner, set()):
+            watch: _Watch | None = self.__watches.get(wd)
+            if watch is None:
+                continue
+            if owner in watch.owners:
+                watch.owners.remove(owner)
+            if not watch.owners:
+                del self.__watches[wd]
+                self.__inotify.rm_watch(wd)
+        if not self.__owned and self.__thread is not None:
+            self.__stop()
+
+    def unregister(self, owner: "InotifyObserver") -> None:
+        """Stop watching an observer's source.
+
+        Args:
+            owner (InotifyObserver): Observer.
+        """
+        with self.__lock:
+            self.__release(owner)
+
+    def __dispatch(self, event: InotifyEvent) -> None:
+        """Route an inotify event to the observers owning its watch (lock held).
+
+        Args:
+            event (InotifyEvent): inotify event.
+        """
+        if event.mask & IN_Q_OVERFLOW:
+            logging.warning("inotify event queue overflowed; rescanning sources.")
+            self.__overflowed = True
+            return
+        watch: _Watch | None = self.__watches.get(event.wd)
+        if watch is None:
+            return
+        if event.mask & IN_IGNORED:
+            del self.__watches[event.wd]
+            for owner in watch.owners:
+                self.__owned.get(owner, set()).discard(event.wd)
+            return
+        if event.mask & IN_MOVE_SELF:
+            # IN_MOVED_TO for a rename within a watched tree arrives first
+            if watch.moved:
+                watch.moved = False
+            else:
+                self.__remove_tree(watch.path)
+            return
+        if event.mask & IN_ISDIR:
+            if event.mask & (IN_CREATE | IN_MOVED_TO):
+                directory: bytes = watch.path + b"/" + event.name
+                for owner in list(watch.owners):
+                    if owner.recursive:
+                        try:
+                            self.__add_tree(directory, owner, True)
+                        except (InotifyError, OSError) as error:
+                            # Directory removed again before it could be watched
+                            logging.debug("Could not watch %s: %s", directory, error)
+            return
+        if event.mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+            path: str = os.fsdecode(watch.path + b"/" + event.name)
+            listed: tuple[int, int] | None = watch.listed.pop(event.name, None)
+            if listed is not None and event.mask & IN_CLOSE_WRITE:
+                # Writer finished a file already queued when its directory was listed
+                try:
+                    stat: os.stat_result = os.stat(path)
+                    if (stat.st_size, stat.st_mtime_ns) == listed:
+                        return
+                except OSError:
+                    return
+            for owner in watch.owners:
+                owner.queue_file(path, bool(event.mask & IN_MOVED_TO))
+
+    def __run(self, inotify_instance: Inotify, wake_fd: int) -> None:
+        """Wait on inotify and dispatch its events until woken to stop.
+
+        Args:
+            inotify_instance (Inotify): inotify instance served.
+            wake_fd (int): Pipe read end written to stop the thread.
+        """
+        # Every event from before the last read that drained the queue has been seen
+        last_read: int = time.time_ns()
+        with select.epoll() as epoll:
+            epoll.register(inotify_instance.fileno(), select.EPOLLIN)
+            epoll.register(wake_fd, select.EPOLLIN)
+            while True:
+                # Read again at once after a listing so its files are soon forgotten
+                ready: list[tuple[int, int]] = epoll.poll(0 if self.__listed else -1)
+                overflowed: list[InotifyObserver] = []
+                with self.__lock:
+                    if any(fd == wake_fd for fd, _ in ready):
+                        return
+                    listed: list[_Watch] = self.__listed
+                    self.__listed = []
+                    since: int = last_read - int(INOTIFY_RESCAN_MARGIN * 1_000_000_000)
+                    last_read = time.time_ns()
+                    try:
+                        events: list[InotifyEvent] = inotify_instance.read_events()
+                    except OSError as error:
+                        logging.error("Could not read inotify events: %s", error)
+                        events = []
+                    for event in events:
+                        # One bad event must not stop the thread every watcher shares
+                        try:
+                            self.__dispatch(event)
+                        except Exception:  # pylint: disable=broad-exception-caught
+                            logging.exception("inotify event %s not dispatched.", event)
+                    # Events queued before these directories were listed have been read
+                    for watch in listed:
+                        watch.listed.clear()
+                    if self.__overflowed:
+                        self.__overflowed = False
+                        overflowed = list(self.__owned)
+                for owner in overflowed:
+                    self.__rescan(owner, since)
+
+
+class InotifyObserver(IObserver):
+    """Watcher observer that uses the shared native inotify dispatcher."""
+
+    def __init__(
+        self,
+        file_queue: Queue,
+        watcher_handler: IHandler,
+        coalescer: EventCoalescer = None,  # type: ignore
+        dispatcher: InotifyDispatcher = None,  # type: ignore
+        poll_interval: float = POLLING_INTERVAL,
+        ignore: IgnoreFilter = None,  # type: ignore
+    ) -> None:
+        """Initialise inotify observer.
+
+        Args:
+            file_queue (Queue): File queue.
+            watcher_handler (IHandler): Watcher handler.
+            coalescer (EventCoalescer, optional): Watcher event coalescer. Defaults to None.
+            dispatcher (InotifyDispatcher, optional): Dispatcher. Defaults to the shared dispatcher.
+            poll_interval (float, optional): Seconds between polls of unwatched sub-trees. Defaults to POLLING_INTERVAL.
+            ignore (IgnoreFilter, optional): Files not to queue. Defaults to None.
+
+        Raises:
+            InotifyObserverError: inotify is not available.
+        """
+        self.source: str = watcher_handler.source
+        self.recursive: bool = watcher_handler.recursive
+        self.__watcher_handler: IHandler = watcher_handler
+        self.__file_queue: Queue = file_queue
+        self.__coalescer: EventCoalescer = coalescer
+        self.__poll_interval: float = poll_interval
+        self.__ignore: IgnoreFilter = ignore
+        self.__poller: PollingObserver = None  # type: ignore
+        self.__dispatcher: InotifyDispatcher = (
+            dispatcher if dispatcher is not None else InotifyDispatcher.shared()
+        )
+
+    def queue_file(self, path: str, complete: bool = False) -> None:
+        """Queue a file that has been closed after writing or moved into the source.
+
+        Args:
+            path (str): File path.
+            complete (bool, optional): File was moved into place. Defaults to False.
+        """
+        logging.debug("inotify %s.", path)
+        if self.__ignore is not None and self.__ignore.ignored(path):
+            return
+        if self.__coalescer is None or self.__coalescer.offer(path):
+            self.__file_queue.put(
+                FileEvent(path, enqueued=time.monotonic(), complete=complete)
+            )
+
+    def rescan(self, since: int = 0) -> None:
+        """Queue the files in the source changed since a time (after inotify events have been lost).
+
+        Args:
+            since (int, optional): Time (ns) files must have changed after. Defaults to 0.
+        """
+        BacklogScanner(
+            self.__file_queue,
+            self.__watcher_handler,
+            self.__coalescer,
+            ignore=self.__ignore,
+            changed_since=since,
+        ).scan()
+
+    def poll_subtree(self, path: str, new: bool = False) -> None:
+        """Poll a sub-tree of the source that is not watched.
+
+        Args:
+            path (str): Directory path.
+            new (bool, optional): Directory has just appeared (so queue files already in it). Defaults to False.
+        """
+        if self.__poller is None:
+            self.__poller = PollingObserver(
+                self.__file_queue,
+                self.__watcher_handler,
+                self.__coalescer,
+                self.__poll_interval,
+                roots=[],
+                ignore=self.__ignore,
+            )
+            self.__poller.start()
+        self.__poller.add_root(path, new)
+
+    @property
+    def polled(self) -> list[str]:
+        """Sub-trees of the source polled rather than watched."""
+        return self.__poller.roots if self.__poller is not None else []
+
+    def start(self) -> None:
+        """Start watching source."""
+        self.__dispatcher.register(self)
+
+    def stop(self) -> None:
+        """Stop watching source."""
+        self.__dispatcher.unregister(self)
+        if self.__poller is not None:
+            self.__poller.stop()
+            self.__poller = None  # type: ignore
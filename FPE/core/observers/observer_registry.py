@@ -0,0 +1,121 @@
+"""FPE shared watchdog observer registry.
+
+Engine level owner of a single watchdog Observer on which the source of
+every watchdog observer watcher is scheduled, so watchers no longer each
+start their own Observer dispatcher thread. Watches may be added and removed
+while the Observer is running. Events are routed by watchdog to the event
+handlers registered against each watch handle, and watchers watching the
+same path share its watch (and its emitter).
+
+"""
+
+import errno
+import logging
+from threading import Lock
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+from watchdog.observers.api import ObservedWatch
+
+from core.error import FPEError
+
+
+class ObserverRegistryError(FPEError):
+    """An error occurred in the observer registry."""
+
+    def __str__(self) -> str:
+        """Return string for exception.
+
+        Returns:
+            str: Exception string.
+        """
+
+        return FPEError.error_prefix("ObserverRegistry") + str(self.error)
+
+
+class ObserverRegistry:
+    """Single watchdog Observer shared by watchers; watches added and removed at runtime."""
+
+    def __init__(self) -> None:
+        """Initialise registry; the Observer is started with the first watch added."""
+        self.__lock: Lock = Lock()
+        self.__observer: Observer = None  # type: ignore
+        self.__handlers: dict[ObservedWatch, set[FileSystemEventHandler]] = {}
+
+    @property
+    def watches(self) -> int:
+        """Number of watches scheduled."""
+        return len(self.__handlers)
+
+    @property
+    def is_running(self) -> bool:
+        """Is shared Observer running ?"""
+        return self.__observer is not None
+
+    def add(
+        self, event_handler: FileSystemEventHandler, path: str, recursive: bool
+    ) -> ObservedWatch:
+        """Schedule a path on the shared Observer for an event handler.
+
+        Args:
+            event_handler (FileSystemEventHandler): Handler events on the path are routed to.
+            path (str): Directory path.
+            recursive (bool): Watch directories below path.
+
+        Raises:
+            ObserverRegistryError: Path could not be watched.
+
+        Returns:
+            ObservedWatch: Watch handle (passed to remove).
+        """
+        with self.__lock:
+            if self.__observer is None:
+                self.__observer = Observer()
+                self.__observer.daemon = True
+                self.__observer.start()
+            try:
+                watch: ObservedWatch = self.__observer.schedule(
+                    event_handler, path, recursive=recursive
+                )
+            except OSError as error:
+                # watchdog leaves the handler registered against the failed watch
+                self.__observer.remove_handler_for_watch(
+                    event_handler, ObservedWatch(path, recursive=recursive)
+                )
+                if error.errno == errno.EMFILE:
+                    raise ObserverRegistryError(
+                        f"{error} (watchdog uses an inotify instance per watch; "
+                        "raise fs.inotify.max_user_instances or use observer inotify)."
+                    ) from error
+                raise ObserverRegistryError(error) from error
+            self.__handlers.setdefault(watch, set()).add(event_handler)
+            logging.debug("Observer registry watching %s.", path)
+            return watch
+
+    def remove(self, event_handler: FileSystemEventHandler, watch: ObservedWatch) -> None:
+        """Stop routing a watch's events to an event handler; unscheduling it when unused.
+
+        Args:
+            event_handler (FileSystemEventHandler): Handler passed to add.
+            watch (ObservedWatch): Watch handle returned by add.
+        """
+        with self.__lock:
+            handlers: set[FileSystemEventHandler] | None = self.__handlers.get(watch)
+            if handlers is None or event_handler not in handlers:
+                return
+            handlers.discard(event_handler)
+            if handlers:
+                self.__observer.remove_handler_for_watch(event_handler, watch)
+            else:
+                del self.__handlers[watch]
+                self.__observer.unschedule(watch)
+
+    def shutdown(self) -> None:
+        """Stop the shared Observer and forget all watches."""
+        with self.__lock:
+            observer: Observer = self.__observer
+            self.__observer = None  # type: ignore
+            self.__handlers.clear()
+        if observer is not None:
+            observer.stop()
+            observer.join()
@@ -0,0 +1,270 @@
+"""FPE polling observer.
+
+For sources on network filesystems (NFS/SMB) where inotify events are never
+delivered. The source is walked with os.scandir every interval and an in
+memory index of (inode, size, mtime) for each file is diffed against what is
+found, queueing files that are new or whose state has changed; the coalescer
+drops a change to a file that is still pending. Any change counts as an
+arrival because a file deleted and recreated between scans may reuse its
+inode. The index
+also holds each directory's mtime, and only directories whose mtime has
+changed (an entry was added, removed or renamed) are listed again; the rest
+of the tree costs one stat per directory. A directory modified within
+POLLING_RACY_WINDOW of being listed is listed again on the next pass too, as a
+file created in the same timestamp tick would not change its mtime.
+
+Files matching the watcher ignore patterns are indexed but not queued.
+
+Besides a watcher source the observer may poll a set of roots; the native
+inotify observer uses this for sub-trees it cannot afford watches for.
+
+"""
+
+import os
+import time
+import logging
+from queue import Queue
+from threading import Event, Lock, Thread
+
+from core.interface.ihandler import IHandler
+from core.interface.iobserver import IObserver
+from core.coalescer import EventCoalescer
+from core.event import FileEvent
+from core.observers.ignore_filter import IgnoreFilter
+from core.error import FPEError
+
+# Default seconds between scans of the source
+
+POLLING_INTERVAL: float = 5.0
+
+# Seconds after a directory is modified that it is still listed on every pass
+
+POLLING_RACY_WINDOW: float = 2.0
+
+
+class PollingObserverError(FPEError):
+    """An error occurred in the polling observer."""
+
+    def __str__(self) -> str:
+        """Return string for exception.
+
+        Returns:
+            str: Exception string.
+        """
+
+        return FPEError.error_prefix("PollingObserver") + str(self.error)
+
+
+class _Directory:
+    """Index of a directory: its mtime, files (inode, size, mtime) and sub-directories."""
+
+    __slots__ = ("mtime", "files", "directories")
+
+    def __init__(self) -> None:
+        self.mtime: int = -1
+        self.files: dict[str, tuple[int, int, int]] = {}
+        self.directories: set[str] = set()
+
+
+class PollingObserver(IObserver):
+    """Watcher observer that polls its source for new files."""
+
+    def __init__(
+        self,
+        file_queue: Queue,
+        watcher_handler: IHandler,
+        coalescer: EventCoalescer = None,  # type: ignore
+        interval: float = POLLING_INTERVAL,
+        roots: list[str] | None = None,
+        ignore: IgnoreFilter = None,  # type: ignore
+    ) -> None:
+        """Initialise polling observer.
+
+        Args:
+            file_queue (Queue): File queue.
+            watcher_handler (IHandler): Watcher handler.
+            coalescer (EventCoalescer, optional): Watcher event coalescer. Defaults to None.
+            interval (float, optional): Seconds between scans. Defaults to POLLING_INTERVAL.
+            roots (list[str] | None, optional): Directories polled. Defaults to the handler source.
+            ignore (IgnoreFilter, optional): Files not to queue. Defaults to None.
+
+        Raises:
+            PollingObserverError: Invalid polling interval.
+        """
+
+        if interval <= 0:
+            raise PollingObserverError("Polling interval must be greater than zero.")
+
+        self.__file_queue: Queue = file_queue
+        self.__roots: list[str] = (
+            list(roots) if roots is not None else [watcher_handler.source]
+        )
+        self.__recursive: bool = watcher_handler.recursive
+        self.__coalescer: EventCoalescer = coalescer
+        self.__interval: float = interval
+        self.__ignore: IgnoreFilter = ignore
+        self.__index: dict[str, _Directory] = {}
+        self.__lock: Lock = Lock()
+        self.__stop_event: Event = Event()
+        self.__thread: Thread = None  # type: ignore
+        self.__listed: int = 0
+
+    @property
+    def files(self) -> int:
+        """Number of files in the index."""
+        return sum(len(directory.files) for directory in self.__index.values())
+
+    @property
+    def listed(self) -> int:
+        """Number of directory listings made by scans."""
+        return self.__listed
+
+    def __queue_file(self, path: str) -> None:
+        """Queue a new file.
+
+        Args:
+            path (str): File path.
+        """
+        logging.debug("poll %s.", path)
+        if self.__ignore is not None and self.__ignore.ignored(path):
+            return
+        if self.__coalescer is None or self.__coalescer.offer(path):
+            self.__file_queue.put(FileEvent(path, enqueued=time.monotonic()))
+
+    def __forget(self, path: str) -> None:
+        """Remove a directory and those below it from the index.
+
+        Args:
+            path (str): Directory path.
+        """
+        directory: _Directory | None = self.__index.pop(path, None)
+        if directory is not None:
+            for name in directory.directories:
+                self.__forget(os.path.join(path, name))
+
+    def __list(self, path: str, directory: _Directory, emit: bool) -> None:
+        """List a directory diffing its entries against the index.
+
+        Args:
+            path (str): Directory path.
+            directory (_Directory): Index of directory.
+            emit (bool): Queue files not in the index or changed.
+        """
+        self.__listed += 1
+        files: dict[str, tuple[int, int, int]] = {}
+        directories: set[str] = set()
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if self.__recursive:
+                            directories.add(entry.name)
+                        continue
+                    if not entry.is_file():
+                        continue
+                    stat: os.stat_result = entry.stat()
+                except OSError:
+                    continue
+                state: tuple[int, int, int] = (
+                    stat.st_ino,
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                )
+                files[entry.name] = state
+                previous: tuple[int, int, int] | None = directory.files.get(entry.name)
+                if previous == state:
+                    continue
+                if emit:
+                    self.__queue_file(entry.path)
+                elif previous is not None and self.__coalescer is not None:
+                    self.__coalescer.refresh(entry.path)
+        for name in directory.directories - directories:
+            self.__forget(os.path.join(path, name))
+        directory.files = files
+        directory.directories = directories
+
+    def __scan(self, roots: list[str], emit: bool = True) -> None:
+        """Scan roots listing only directories that have changed.
+
+        Args:
+            roots (list[str]): Root directories.
+            emit (bool, optional): Queue files not in the index. Defaults to True.
+        """
+        now: int = time.time_ns()
+        racy: int = int(POLLING_RACY_WINDOW * 1_000_000_000)
+        paths: list[str] = list(roots)
+        while paths:
+            path: str = paths.pop()
+            try:
+                mtime: int = os.stat(path).st_mtime_ns
+            except OSError:
+                self.__forget(path)
+                continue
+            directory: _Directory | None = self.__index.get(path)
+            if directory is None:
+                directory = self.__index[path] = _Directory()
+            if mtime != directory.mtime or now - mtime < racy:
+                try:
+                    self.__list(path, directory, emit)
+                except OSError as error:
+                    logging.debug("Could not list %s: %s", path, error)
+                    self.__forget(path)
+                    continue
+                directory.mtime = mtime
+            paths.extend(os.path.join(path, name) for name in directory.directories)
+
+    def __run(self) -> None:
+        """Scan source every interval until stopped."""
+        while not self.__stop_event.wait(self.__interval):
+            try:
+                self.poll()
+            except OSError as error:
+                logging.warning("Polling of %s failed: %s", self.__roots, error)
+
+    @property
+    def roots(self) -> list[str]:
+        """Directories polled."""
+        return list(self.__roots)
+
+    def add_root(self, path: str, emit: bool = False) -> None:
+        """Start polling another directory (and those below it if recursive).
+
+        Args:
+            path (str): Directory path.
+            emit (bool, optional): Queue files already in it. Defaults to False.
+        """
+        with self.__lock:
+            if path in self.__roots:
+                return
+            self.__roots.append(path)
+            self.__scan([path], emit)
+
+    def poll(self) -> None:
+        """Scan roots now, queueing any new files."""
+        with self.__lock:
+            self.__scan(self.__roots)
+
+    def start(self) -> None:
+        """Index roots then start polling them.
+
+        Raises:
+            PollingObserverError: A root could not be read.
+        """
+        if self.__thread is not None:
+            return
+        for root in self.__roots:
+            if not os.path.isdir(root):
+                raise PollingObserverError(f"Source {root} is not a directory.")
+        with self.__lock:
+            self.__index.clear()
+            self.__scan(self.__roots, emit=False)
+        self.__stop_event.clear()
+        self.__thread = Thread(target=self.__run, name="FPE polling", daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """Stop polling source."""
+        if self.__thread is not None:
+            self.__stop_event.set()
+            self.__thread.join()
+            self.__thread = None  # type: ignore
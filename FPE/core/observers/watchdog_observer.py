@@ -1,20 +1,28 @@
 """FPE directory/file watcher observer.
 
 Use watchdog package to monitor directories and add any created files to the file queue 
-that is to processed by a consumer thread.Note: At present the monitoring is not recursive 
-for reasons of performance; a watcher thread can accumalate to many polling calls for added
-directories.
+that is to processed by a consumer thread. Note: recursive watchdog monitoring adds a watch
+for every directory of the tree up front; the native inotify observer (observer inotify)
+watches directories as they appear and polls sub-trees once watches run short. The source
+is scheduled on an observer registry; an engine passes its shared registry so that all
+watchers use one watchdog Observer.
 
 """
 
+import os
+import time
 import logging
 
 from queue import Queue
 from watchdog.events import FileSystemEventHandler
-from watchdog.observers import Observer
+from watchdog.observers.api import ObservedWatch
 
 from core.interface.ihandler import IHandler
 from core.interface.iobserver import IObserver
+from core.coalescer import EventCoalescer
+from core.observers.observer_registry import ObserverRegistry, ObserverRegistryError
+from core.observers.ignore_filter import IgnoreFilter
+from core.event import FileEvent
 from core.error import FPEError
 
 
@@ -34,23 +42,35 @@ class WatchdogObserverError(FPEError):
 class WatchdogObserver(FileSystemEventHandler, IObserver):
     """Watcher handler adapter for watchdog."""
 
-    def __init__(self, file_queue: Queue, watcher_handler: IHandler) -> None:
+    def __init__(
+        self,
+        file_queue: Queue,
+        watcher_handler: IHandler,
+        coalescer: EventCoalescer = None,  # type: ignore
+        registry: ObserverRegistry = None,  # type: ignore
+        ignore: IgnoreFilter = None,  # type: ignore
+    ) -> None:
         """Initialise watcher handler adapter.
 
         Args:
+            file_queue (Queue): File queue.
             watcher_handler (IHandler): Watcher handler.
+            coalescer (EventCoalescer, optional): Watcher event coalescer. Defaults to None.
+            registry (ObserverRegistry, optional): Shared observer registry. Defaults to one owned by this observer.
+            ignore (IgnoreFilter, optional): Files not to queue. Defaults to None.
         """
 
         super().__init__()
 
         self.__watcher_handler: IHandler = watcher_handler
         self.__file_queue: Queue = file_queue
-        self.__watchdog_observer: Observer = Observer()
-        self.__watchdog_observer.schedule(
-            event_handler=self,
-            path=self.__watcher_handler.source,
-            recursive=self.__watcher_handler.recursive,
+        self.__coalescer: EventCoalescer = coalescer
+        self.__ignore: IgnoreFilter = ignore
+        self.__owns_registry: bool = registry is None
+        self.__registry: ObserverRegistry = (
+            registry if registry is not None else ObserverRegistry()
         )
+        self.__watch: ObservedWatch = None  # type: ignore
 
     def on_created(self, event) -> None:
         """On file created event.
@@ -60,13 +80,68 @@ class WatchdogObserver(FileSystemEventHandler, IObserver):
         """
 
         logging.debug("on_created %s.", event.src_path)
-        self.__file_queue.put(event)
+        if event.is_directory:
+            return
+        self.__queue_file(os.fsdecode(event.src_path))
+
+    def on_moved(self, event) -> None:
+        """On file moved event; a file renamed into the source is complete so is
+        queued without waiting for its copy to complete.
+
+        Args:
+            event (Any): Watchdog file moved event.
+        """
+
+        logging.debug("on_moved %s to %s.", event.src_path, event.dest_path)
+        if event.is_directory:
+            return
+        dest_path: str = os.fsdecode(event.dest_path)
+        if dest_path.startswith(os.path.join(self.__watcher_handler.source, "")):
+            self.__queue_file(dest_path, True)
+
+    def __queue_file(self, src_path: str, complete: bool = False) -> None:
+        """Queue a file unless it is ignored or already pending.
+
+        Args:
+            src_path (str): File path.
+            complete (bool, optional): File is known to be complete. Defaults to False.
+        """
+        if self.__ignore is not None and self.__ignore.ignored(src_path):
+            return
+        if self.__coalescer is None or self.__coalescer.offer(src_path):
+            self.__file_queue.put(
+                FileEvent(src_path, enqueued=time.monotonic(), complete=complete)
+            )
+
+    def on_modified(self, event) -> None:
+        """On file modified event (restarts debounce of a pending file).
+
+        Args:
+            event (Any): Watchdog file modified event.
+        """
+
+        if self.__coalescer is not None and not event.is_directory:
+            self.__coalescer.refresh(os.fsdecode(event.src_path))
 
     def start(self) -> None:
-        """Start watchdog observer watching."""
-        self.__watchdog_observer.start()
+        """Start watchdog observer watching.
+
+        Raises:
+            WatchdogObserverError: Source could not be watched.
+        """
+        if self.__watch is not None:
+            return
+        try:
+            self.__watch = self.__registry.add(
+                self, self.__watcher_handler.source, self.__watcher_handler.recursive
+            )
+        except ObserverRegistryError as error:
+            raise WatchdogObserverError(error) from error
 
     def stop(self) -> None:
         """Stop watchdog observer from watching."""
-        self.__watchdog_observer.stop()
-        self.__watchdog_observer.join()
+        if self.__watch is not None:
+            self.__registry.remove(self, self.__watch)
+            self.__watch = None  # type: ignore
+        if self.__owns_registry:
+            self.__registry.shutdown()
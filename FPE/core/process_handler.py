@@ -0,0 +1,183 @@
+"""FPE process pool handler.
+
+Handler adapter that runs a watcher's file handler inside a pool of worker
+processes so that CPU bound handlers are not limited by the GIL. Only the
+workers build a handler from the watcher config (the parent takes the watcher
+attributes straight from the config so no connections are opened there) and
+only file paths (plus the processing result) are passed between processes.
+
+"""
+
+import pathlib
+import logging
+import multiprocessing
+from threading import Lock
+from typing import Callable, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from core.constants import CONFIG_TYPE
+from core.interface.ihandler import IHandler
+from core.config import ConfigDict
+from core.factory import Factory
+from core.handler import Handler
+from core.error import FPEError
+
+# Handler built in each worker process by the pool initialiser
+
+_worker_handler: IHandler = None  # type: ignore
+
+
+class ProcessPoolHandlerError(FPEError):
+    """An error occurred in the process pool handler."""
+
+    def __str__(self) -> str:
+        """Return string for exception.
+
+        Returns:
+            str: Exception string.
+        """
+
+        return FPEError.error_prefix("ProcessPoolHandler") + str(self.error)
+
+
+def _initialise_worker(
+    handler_functions: dict[str, Callable[..., IHandler]], handler_config: ConfigDict
+) -> None:
+    """Register handler types and create the handler for a worker process.
+
+    Args:
+        handler_functions (dict[str, Callable[..., IHandler]]): Registered handler types.
+        handler_config (ConfigDict): Watcher handler config.
+    """
+    global _worker_handler  # pylint: disable=global-statement
+    for handler_type, handler_fn in handler_functions.items():
+        Factory.register(handler_type, handler_fn)
+    _worker_handler = Factory.create(handler_config)
+
+
+def _process_file(source_file: str) -> Tuple[bool, int, dict[str, int]]:
+    """Process a file with the worker process handler.
+
+    Args:
+        source_file (str): Source file path.
+
+    Returns:
+        Tuple[bool, int, dict[str, int]]: Processing result, number of errors and
+            handler operations it generated.
+    """
+    errors: int = _worker_handler.errors
+    operations: dict[str, int] = _worker_handler.operations
+    success: bool = _worker_handler.process(pathlib.Path(source_file))
+    return (
+        success,
+        _worker_handler.errors - errors,
+        {
+            operation: count - operations.get(operation, 0)
+            for operation, count in _worker_handler.operations.items()
+            if count != operations.get(operation, 0)
+        },
+    )
+
+
+class ProcessPoolHandler(IHandler):
+    """Run watcher handler processing in a pool of worker processes.
+
+    The watcher attributes and status are kept in the parent while file
+    processing (and handler creation) is passed off to the worker processes.
+    """
+
+    def __init__(self, handler_config: ConfigDict, workers: int) -> None:
+        """Initialise process pool handler.
+
+        Args:
+            handler_config (ConfigDict): Handler configuration.
+            workers (int): Number of worker processes.
+
+        Raises:
+            ProcessPoolHandlerError: None passed as config, unknown handler type or
+                invalid worker count.
+        """
+
+        if handler_config is None:
+            raise ProcessPoolHandlerError("None passed as handler config.")
+
+        if workers < 1:
+            raise ProcessPoolHandlerError("Process pool must have at least one worker.")
+
+        if handler_config[CONFIG_TYPE] not in Factory.handler_function_list():
+            raise ProcessPoolHandlerError(
+                f"Unknown handler type '{handler_config[CONFIG_TYPE]}'."
+            )
+
+        Handler.set_mandatory_config(self, handler_config)
+
+        self.__handler_config: ConfigDict = handler_config.copy()
+        self.__workers: int = workers
+        self.__process_pool: ProcessPoolExecutor = None  # type: ignore
+        self.__process_pool_lock: Lock = Lock()
+
+    def __get_process_pool(self) -> ProcessPoolExecutor:
+        """Return worker process pool; creating it on first use.
+
+        Workers are spawned rather than forked as the parent is multi-threaded.
+
+        Returns:
+            ProcessPoolExecutor: Worker process pool.
+        """
+        with self.__process_pool_lock:
+            if self.__process_pool is None:
+                self.__process_pool = ProcessPoolExecutor(
+                    max_workers=self.__workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_initialise_worker,
+                    initargs=(Factory.handler_functions(), self.__handler_config),
+                )
+            return self.__process_pool
+
+    def process(self, source_path: pathlib.Path) -> bool:
+        """Process file in a worker process.
+
+        Args:
+            source_path (pathlib.Path): Source file path.
+
+        Returns:
+            bool: true if file processed successfully.
+        """
+
+        process_pool: ProcessPoolExecutor = self.__get_process_pool()
+
+        try:
+            success, errors, operations = process_pool.submit(
+                _process_file, str(source_path)
+            ).result()
+        except (BrokenProcessPool, RuntimeError) as error:
+            with self.__process_pool_lock:
+                if self.__process_pool is process_pool:
+                    self.__process_pool = None  # type: ignore
+            success, errors, operations = False, 1, {}
+            logging.info(ProcessPoolHandlerError(error))
+
+        for _ in range(errors):
+            Handler.increment_errors(self)
+        for operation, count in operations.items():
+            for _ in range(count):
+                Handler.increment_operation(self, operation)
+
+        return success
+
+    def close(self) -> None:
+        """Shutdown worker process pool."""
+        with self.__process_pool_lock:
+            if self.__process_pool is not None:
+                self.__process_pool.shutdown()
+                self.__process_pool = None  # type: ignore
+
+    def status(self) -> str:
+        """Return current handler status string
+
+        Returns:
+            str: Handler status string.
+        """
+
+        return Handler.status(self)
@@ -0,0 +1,382 @@
+"""FPE shared worker scheduler.
+
+Engine level pool of worker threads that processes the file queues of all
+watchers registered with it, so that a watcher only occupies a thread while
+one of its files is being processed. The next queue to take a file from is
+chosen by priority (a higher priority watcher with files queued is always
+served first) and then by weight using stride scheduling, so that between
+watchers of equal priority each is given a share of the workers proportional
+to its weight. A queue that has been idle re-joins at the current virtual
+time rather than with the pass value it left with, so it cannot monopolise
+the workers to make up for time it had nothing queued. Workers are woken by
+the listener of each registered file queue.
+
+"""
+
+import logging
+from typing import Callable
+from threading import Thread, Condition, current_thread
+from queue import Empty
+
+from core.interface.ihandler import IHandler
+from core.interface.iconsumer import IConsumer
+from core.interface.icompletion import ICompletionDetector
+from core.coalescer import EventCoalescer
+from core.journal import JournalQueue
+from core.metrics import WatcherMetrics
+from core.event import FileEvent
+from core.file_queue import FileQueue
+from core.consumer import Consumer, ConsumerError, FailureCallBackFunction
+from core.error import FPEError
+
+HandleEventFunction = Callable[[FileEvent], bool]
+
+# Default number of shared worker threads
+
+SCHEDULER_WORKERS: int = 4
+
+
+class WorkerSchedulerError(FPEError):
+    """An error occurred in shared worker scheduler."""
+
+    def __str__(self) -> str:
+        """Return string for exception.
+
+        Returns:
+            str: Exception string.
+        """
+
+        return FPEError.error_prefix("WorkerScheduler") + str(self.error)
+
+
+class ScheduledQueue:
+    """Scheduling state of a watcher file queue."""
+
+    def __init__(
+        self,
+        file_queue: FileQueue,
+        handle_fn: HandleEventFunction,
+        weight: int,
+        priority: int,
+        concurrency: int,
+        start_pass: float,
+    ) -> None:
+        """Initialise scheduled queue.
+
+        Args:
+            file_queue (FileQueue): Watcher file queue.
+            handle_fn (HandleEventFunction): Handle a queued file event.
+            weight (int): Share of workers relative to watchers of equal priority.
+            priority (int): Watchers with a higher priority are served first.
+            concurrency (int): Maximum files of this queue processed at once.
+            start_pass (float): Initial stride scheduling pass value.
+        """
+        self.file_queue: FileQueue = file_queue
+        self.handle_fn: HandleEventFunction = handle_fn
+        self.stride: float = 1.0 / weight
+        self.priority: int = priority
+        self.concurrency: int = concurrency
+        self.pass_value: float = start_pass
+        self.in_flight: int = 0
+        self.active: bool = True
+        self.idle: bool = True
+
+    def is_ready(self) -> bool:
+        """Has the queue files waiting and a free processing slot ?
+
+        Returns:
+            bool: true if a file can be taken from the queue.
+        """
+        return (
+            self.active
+            and self.in_flight < self.concurrency
+            and not self.file_queue.empty()
+        )
+
+
+class WorkerScheduler:
+    """Pool of worker threads shared between watcher file queues."""
+
+    def __init__(self, workers: int = SCHEDULER_WORKERS) -> None:
+        """Initialise shared worker scheduler.
+
+        Args:
+            workers (int, optional): Number of worker threads. Defaults to SCHEDULER_WORKERS.
+
+        Raises:
+            WorkerSchedulerError: Invalid number of workers.
+        """
+
+        if workers < 1:
+            raise WorkerSchedulerError("Scheduler must have at least one worker.")
+
+        self.__workers: int = workers
+        self.__queues: dict[str, ScheduledQueue] = {}
+        self.__ready: Condition = Condition()
+        self.__threads: list[Thread] = []
+        self.__virtual_time: float = 0.0
+        self.__running: bool = False
+
+    def __signal(self) -> None:
+        """Wake a worker as a file has been queued."""
+        with self.__ready:
+            self.__ready.notify()
+
+    def __next_event(self) -> tuple[ScheduledQueue | None, FileEvent | None]:
+        """Take the next file event from the highest priority, least served queue.
+
+        Returns:
+            tuple[ScheduledQueue | None, FileEvent | None]: Queue and event; (None, None) if no work.
+        """
+        while True:
+            selected: ScheduledQueue | None = None
+            for scheduled in self.__queues.values():
+                if not scheduled.is_ready():
+                    continue
+                if scheduled.idle:
+                    # Re-join at virtual time; no credit for time spent empty
+                    scheduled.pass_value = max(scheduled.pass_value, self.__virtual_time)
+                    scheduled.idle = False
+                if (
+                    selected is None
+                    or scheduled.priority > selected.priority
+                    or (
+                        scheduled.priority == selected.priority
+                        and scheduled.pass_value < selected.pass_value
+                    )
+                ):
+                    selected = scheduled
+            if selected is None:
+                return None, None
+            try:
+                event: FileEvent | None = selected.file_queue.get_nowait()
+            except Empty:
+                selected.idle = True
+                continue
+            if selected.file_queue.empty():
+                selected.idle = True
+            if event is None:
+                # Stop sentinels are not used by the shared pool
+                continue
+            self.__virtual_time = selected.pass_value
+            selected.pass_value += selected.stride
+            return selected, event
+
+    def __process_queues(self) -> None:
+        """Worker thread; process file events as they are scheduled."""
+        while True:
+            with self.__ready:
+                scheduled, event = None, None
+                while scheduled is None:
+                    if not self.__running:
+                        return
+                    scheduled, event = self.__next_event()
+                    if scheduled is None:
+                        self.__ready.wait()
+                scheduled.in_flight += 1
+            success: bool = True
+            try:
+                success = scheduled.handle_fn(event)  # type: ignore
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                # Keep the shared worker alive whatever a handler raises
+                logging.error(WorkerSchedulerError(error))
+            finally:
+                with self.__ready:
+                    scheduled.in_flight -= 1
+                    if not success:
+                        scheduled.active = False
+                    self.__ready.notify_all()
+
+    def __start(self) -> None:
+        """Start worker threads if not already running."""
+        if self.__running:
+            return
+        self.__running = True
+        self.__threads = [
+            Thread(target=self.__process_queues, name=f"FPE worker {worker}")
+            for worker in range(self.__workers)
+        ]
+        for thread in self.__threads:
+            thread.daemon = True
+            thread.start()
+
+    def register(
+        self,
+        name: str,
+        file_queue: FileQueue,
+        handle_fn: HandleEventFunction,
+        weight: int = 1,
+        priority: int = 0,
+        concurrency: int = 1,
+    ) -> None:
+        """Register watcher file queue to be processed by the shared workers.
+
+        Args:
+            name (str): Watcher name.
+            file_queue (FileQueue): Watcher file queue.
+            handle_fn (HandleEventFunction): Handle a queued file event.
+            weight (int, optional): Share of workers between equal priorities. Defaults to 1.
+            priority (int, optional): Higher priority queues are served first. Defaults to 0.
+            concurrency (int, optional): Maximum files processed at once. Defaults to 1.
+
+        Raises:
+            WorkerSchedulerError: Invalid registration.
+        """
+
+        if weight < 1 or concurrency < 1:
+            raise WorkerSchedulerError("Weight and concurrency must be at least one.")
+
+        if not isinstance(file_queue, FileQueue):
+            raise WorkerSchedulerError("File queue must be a FileQueue.")
+
+        with self.__ready:
+            if name in self.__queues:
+                raise WorkerSchedulerError(f"Watcher '{name}' already registered.")
+            self.__queues[name] = ScheduledQueue(
+                file_queue, handle_fn, weight, priority, concurrency, self.__virtual_time
+            )
+            # Wake a worker whenever a producer queues a file
+            file_queue.listener = self.__signal
+            self.__start()
+            self.__ready.notify_all()
+
+    def unregister(self, name: str) -> None:
+        """Stop processing a watcher file queue and wait for its in-flight files.
+
+        Args:
+            name (str): Watcher name.
+        """
+        with self.__ready:
+            scheduled: ScheduledQueue | None = self.__queues.pop(name, None)
+            if scheduled is None:
+                return
+            scheduled.active = False
+            scheduled.file_queue.listener = None
+            # A worker can unregister the watcher it is processing (exit on failure)
+            if current_thread() not in self.__threads:
+                while scheduled.in_flight > 0:
+                    self.__ready.wait()
+
+    def shutdown(self) -> None:
+        """Stop worker threads once they finish their current files."""
+        with self.__ready:
+            if not self.__running:
+                return
+            self.__running = False
+            self.__ready.notify_all()
+        for thread in self.__threads:
+            if thread is not current_thread():
+                thread.join()
+        self.__threads = []
+
+    @property
+    def workers(self) -> int:
+        """Number of shared worker threads.
+
+        Returns:
+            int: Worker thread count.
+        """
+        return self.__workers
+
+    @property
+    def watchers(self) -> list[str]:
+        """Names of watchers registered with the scheduler.
+
+        Returns:
+            list[str]: Registered watcher names.
+        """
+        with self.__ready:
+            return list(self.__queues.keys())
+
+
+class SchedulerConsumer(IConsumer):
+    """Consumer that has its watcher file queue processed by a shared worker scheduler."""
+
+    def __init__(
+        self,
+        file_queue: FileQueue,
+        watcher_handler: IHandler,
+        failure_callback_fn: FailureCallBackFunction,
+        scheduler: WorkerScheduler,
+        weight: int = 1,
+        priority: int = 0,
+        concurrency: int = 1,
+        coalescer: EventCoalescer = None,  # type: ignore
+        completion: ICompletionDetector = None,  # type: ignore
+        journal: JournalQueue = None,  # type: ignore
+        metrics: WatcherMetrics = None,  # type: ignore
+    ) -> None:
+        """Initialise scheduler consumer.
+
+        Args:
+            file_queue (FileQueue): File queue.
+            watcher_handler (IHandler): Watcher handler.
+            failure_callback_fn (FailureCallBackFunction): Watcher handler failure callback.
+            scheduler (WorkerScheduler): Shared worker scheduler.
+            weight (int, optional): Share of workers between equal priorities. Defaults to 1.
+            priority (int, optional): Higher priority watchers are served first. Defaults to 0.
+            concurrency (int, optional): Maximum files processed at once. Defaults to 1.
+            coalescer (EventCoalescer, optional): Watcher event coalescer. Defaults to None.
+            completion (ICompletionDetector, optional): Copy completion detector. Defaults to None.
+            journal (JournalQueue, optional): Journal to acknowledge handled events. Defaults to None.
+            metrics (WatcherMetrics, optional): Watcher metrics. Defaults to None.
+
+        Raises:
+            ConsumerError: An invalid consumer parameter was passed.
+        """
+
+        if scheduler is None:
+            raise ConsumerError("Scheduler cannot be None.")
+
+        self.__consumer: Consumer = Consumer(
+            file_queue,
+            watcher_handler,
+            failure_callback_fn,
+            1,
+            coalescer,
+            completion,
+            journal,
+            metrics,
+        )
+        self.__file_queue: FileQueue = file_queue
+        self.__name: str = watcher_handler.name
+        self.__scheduler: WorkerScheduler = scheduler
+        self.__weight: int = weight
+        self.__priority: int = priority
+        self.__concurrency: int = concurrency
+        self.__running: bool = False
+
+    def start(self) -> None:
+        """Register watcher file queue with the scheduler."""
+        if self.__running:
+            return
+        try:
+            self.__scheduler.register(
+                self.__name,
+                self.__file_queue,
+                self.__consumer.handle,
+                self.__weight,
+                self.__priority,
+                self.__concurrency,
+            )
+        except WorkerSchedulerError as error:
+            raise ConsumerError(error) from error
+        self.__running = True
+
+    def stop(self) -> None:
+        """Unregister watcher file queue and discard any queued events."""
+        if self.__running is False:
+            return
+        self.__running = False
+        self.__scheduler.unregister(self.__name)
+        while not self.__file_queue.empty():
+            _ = self.__file_queue.get()
+
+    @property
+    def is_running(self) -> bool:
+        """Is the consumer registered with the scheduler ?
+
+        Returns:
+            bool: == true then consumer registered
+        """
+        return self.__running
@@ -5,24 +5,69 @@ file creation events; the default abstraction using the watchdog library.
 
 """
 
+import os
 import logging
-from queue import Queue
-
 
 from core.observers.watchdog_observer import WatchdogObserver
+from core.observers.observer_registry import ObserverRegistry
+from core.observers.inotify_observer import InotifyObserver, InotifyObserverError
+from core.observers.polling_observer import (
+    PollingObserver,
+    PollingObserverError,
+    POLLING_INTERVAL,
+)
+from core.observers.ignore_filter import IgnoreFilter
 from core.constants import (
     CONFIG_NAME,
     CONFIG_TYPE,
     CONFIG_EXITONFAILURE,
     CONFIG_DELETESOURCE,
     CONFIG_RECURSIVE,
+    CONFIG_WORKERS,
+    CONFIG_CONNECTIONS,
+    CONFIG_OBSERVER,
+    OBSERVER_WATCHDOG,
+    OBSERVER_INOTIFY,
+    OBSERVER_POLLING,
+    CONFIG_POLLINTERVAL,
+    CONFIG_IGNOREPATTERNS,
+    CONFIG_ORDERED,
+    CONFIG_EXECUTOR,
+    EXECUTOR_THREAD,
+    EXECUTOR_PROCESS,
+    EXECUTOR_ASYNC,
+    CONFIG_CONCURRENCY,
+    CONFIG_DEBOUNCE,
+    CONFIG_COMPLETION,
+    CONFIG_SETTLE,
+    CONFIG_MARKERSUFFIX,
+    COMPLETION_QUIESCENCE,
+    COMPLETION_INOTIFY,
+    COMPLETION_MARKER,
+    CONFIG_JOURNAL,
+    CONFIG_JOURNALWINDOW,
+    CONFIG_BACKLOG,
+    CONFIG_WEIGHT,
+    CONFIG_PRIORITY,
 )
 from core.interface.ihandler import IHandler
 from core.interface.iobserver import IObserver
 from core.interface.iconsumer import IConsumer
+from core.interface.icompletion import ICompletionDetector
+from core.completion.quiescence import QuiescenceCompletion, QUIESCENCE_SETTLE
+from core.completion.inotify import InotifyCompletion
+from core.completion.marker import MarkerCompletion, MARKER_SUFFIX
 from core.config import ConfigDict
-from core.consumer import Consumer, FailureCallBackFunction
+from core.consumer import ConsumerPool, FailureCallBackFunction
+from core.async_consumer import AsyncConsumer, ASYNC_CONCURRENCY
+from core.coalescer import EventCoalescer
+from core.journal import JournalQueue, JOURNAL_WINDOW
+from core.file_queue import FileQueue
+from core.backlog import BacklogScanner
+from core.scheduler import WorkerScheduler, SchedulerConsumer
+from core.metrics import WatcherMetrics, MetricsSnapshot
 from core.factory import Factory
+from core.process_handler import ProcessPoolHandler
 from core.error import FPEError
 
 
@@ -71,11 +116,16 @@ class Watcher:
         self,
         watcher_config: ConfigDict,
         failure_callback_fn: FailureCallBackFunction = None,
+        scheduler: WorkerScheduler = None,  # type: ignore
+        observer_registry: ObserverRegistry = None,  # type: ignore
     ) -> None:
         """Initialise directory/file watcher.
 
         Args:
             watcher_config (ConfigDict): Watcher config
+            failure_callback_fn (FailureCallBackFunction, optional): Watcher handler failure callback. Defaults to None.
+            scheduler (WorkerScheduler, optional): Engine shared worker scheduler. Defaults to None.
+            observer_registry (ObserverRegistry, optional): Engine shared watchdog observer registry. Defaults to None.
 
         Raises:
             WatcherError: A watcher error has occurred.
@@ -95,22 +145,102 @@ class Watcher:
                 watcher_config[CONFIG_EXITONFAILURE] = False
             if CONFIG_RECURSIVE not in watcher_config:
                 watcher_config[CONFIG_RECURSIVE] = False
+            if CONFIG_EXECUTOR not in watcher_config:
+                watcher_config[CONFIG_EXECUTOR] = EXECUTOR_THREAD
+            if CONFIG_WORKERS not in watcher_config:
+                # A process pool defaults to using every core
+                if watcher_config[CONFIG_EXECUTOR] == EXECUTOR_PROCESS:
+                    watcher_config[CONFIG_WORKERS] = os.cpu_count() or 1
+                else:
+                    # One worker per upload connection when a handler has several
+                    watcher_config[CONFIG_WORKERS] = int(
+                        watcher_config.get(CONFIG_CONNECTIONS, 1)
+                    )
+            if CONFIG_ORDERED not in watcher_config:
+                watcher_config[CONFIG_ORDERED] = False
+            if CONFIG_CONCURRENCY not in watcher_config:
+                watcher_config[CONFIG_CONCURRENCY] = ASYNC_CONCURRENCY
+            if CONFIG_DEBOUNCE not in watcher_config:
+                watcher_config[CONFIG_DEBOUNCE] = 0.0
+            if CONFIG_COMPLETION not in watcher_config:
+                watcher_config[CONFIG_COMPLETION] = COMPLETION_QUIESCENCE
+            if CONFIG_SETTLE not in watcher_config:
+                watcher_config[CONFIG_SETTLE] = QUIESCENCE_SETTLE
+            if CONFIG_MARKERSUFFIX not in watcher_config:
+                watcher_config[CONFIG_MARKERSUFFIX] = MARKER_SUFFIX
+            if CONFIG_JOURNAL not in watcher_config:
+                watcher_config[CONFIG_JOURNAL] = ""
+            if CONFIG_JOURNALWINDOW not in watcher_config:
+                watcher_config[CONFIG_JOURNALWINDOW] = JOURNAL_WINDOW
+            if CONFIG_BACKLOG not in watcher_config:
+                watcher_config[CONFIG_BACKLOG] = False
+            if CONFIG_WEIGHT not in watcher_config:
+                watcher_config[CONFIG_WEIGHT] = 1
+            if CONFIG_PRIORITY not in watcher_config:
+                watcher_config[CONFIG_PRIORITY] = 0
+            if CONFIG_OBSERVER not in watcher_config:
+                watcher_config[CONFIG_OBSERVER] = OBSERVER_WATCHDOG
+            if CONFIG_POLLINTERVAL not in watcher_config:
+                watcher_config[CONFIG_POLLINTERVAL] = POLLING_INTERVAL
+            if CONFIG_IGNOREPATTERNS not in watcher_config:
+                watcher_config[CONFIG_IGNOREPATTERNS] = []
+
+            self.__executor: str = watcher_config[CONFIG_EXECUTOR]
+            self.__workers: int = int(watcher_config[CONFIG_WORKERS])
+            self.__ordered: bool = bool(watcher_config[CONFIG_ORDERED])
+            self.__concurrency: int = int(watcher_config[CONFIG_CONCURRENCY])
+            self.__backlog: bool = bool(watcher_config[CONFIG_BACKLOG])
+            self.__weight: int = int(watcher_config[CONFIG_WEIGHT])
+            self.__priority: int = int(watcher_config[CONFIG_PRIORITY])
+            self.__scheduler: WorkerScheduler = scheduler
+            self.__observer_registry: ObserverRegistry = observer_registry
+            self.__observer_type: str = watcher_config[CONFIG_OBSERVER]
+            self.__poll_interval: float = float(watcher_config[CONFIG_POLLINTERVAL])
+            self.__ignore: IgnoreFilter = IgnoreFilter(
+                watcher_config[CONFIG_IGNOREPATTERNS]
+            )
+            if self.__observer_type not in (
+                OBSERVER_WATCHDOG,
+                OBSERVER_INOTIFY,
+                OBSERVER_POLLING,
+            ):
+                raise WatcherError(f"Unknown watcher observer '{self.__observer_type}'.")
+            self.__coalescer: EventCoalescer = EventCoalescer(
+                float(watcher_config[CONFIG_DEBOUNCE])
+            )
+            self.__completion: ICompletionDetector = (
+                Watcher.__create_completion_detector(watcher_config)
+            )
 
-            self.__handler: IHandler = Factory.create(watcher_config)
+            if watcher_config[CONFIG_EXECUTOR] in (EXECUTOR_THREAD, EXECUTOR_ASYNC):
+                self.__handler: IHandler = Factory.create(watcher_config)
+            elif watcher_config[CONFIG_EXECUTOR] == EXECUTOR_PROCESS:
+                self.__handler = ProcessPoolHandler(watcher_config, self.__workers)
+            else:
+                raise WatcherError(
+                    f"Unknown watcher executor '{watcher_config[CONFIG_EXECUTOR]}'."
+                )
 
             self.__watcher_failure_callback: FailureCallBackFunction = (
                 failure_callback_fn
             )
             if self.__handler is not None:
-                self.__file_queue: Queue = Queue()
-                self.__observer: IObserver = WatchdogObserver(
-                    self.__file_queue, self.__handler
-                )
-                self.__consumer: IConsumer = Consumer(
-                    self.__file_queue,
-                    self.__handler,
-                    self.__watcher_failure_callback,
+                self.__journal: JournalQueue = None  # type: ignore
+                if watcher_config[CONFIG_JOURNAL] != "":
+                    self.__journal = JournalQueue(
+                        watcher_config[CONFIG_JOURNAL],
+                        int(watcher_config[CONFIG_JOURNALWINDOW]),
+                    )
+                    self.__file_queue: FileQueue = self.__journal
+                else:
+                    self.__file_queue = FileQueue()
+                self.__metrics: WatcherMetrics = WatcherMetrics(
+                    self.__file_queue.qsize,
+                    lambda: self.__handler.operations,
+                    lambda: self.__coalescer.duplicates,
                 )
+                self.__observer: IObserver = self.__create_observer()
+                self.__consumer: IConsumer = self.__create_consumer()
                 Watcher._display_details(watcher_config)
 
             else:
@@ -121,6 +251,120 @@ class Watcher:
         except (KeyError, ValueError) as error:
             raise WatcherError(error) from error
 
+    @staticmethod
+    def __create_completion_detector(watcher_config: ConfigDict) -> ICompletionDetector:
+        """Create file copy completion detector selected in watcher config.
+
+        Args:
+            watcher_config (ConfigDict): Watcher config.
+
+        Raises:
+            WatcherError: Unknown completion detector.
+
+        Returns:
+            ICompletionDetector: Completion detector.
+        """
+        completion: str = watcher_config[CONFIG_COMPLETION]
+        if completion == COMPLETION_QUIESCENCE:
+            return QuiescenceCompletion(float(watcher_config[CONFIG_SETTLE]))
+        if completion == COMPLETION_INOTIFY:
+            return InotifyCompletion(float(watcher_config[CONFIG_SETTLE]))
+        if completion == COMPLETION_MARKER:
+            return MarkerCompletion(watcher_config[CONFIG_MARKERSUFFIX])
+        raise WatcherError(f"Unknown watcher completion detector '{completion}'.")
+
+    def __create_observer(self) -> IObserver:
+        """Create observer that queues files created in the watcher source.
+
+        Returns:
+            IObserver: Watcher observer.
+        """
+        if self.__observer_type == OBSERVER_INOTIFY:
+            try:
+                return InotifyObserver(
+                    self.__file_queue,
+                    self.__handler,
+                    self.__coalescer,
+                    poll_interval=self.__poll_interval,
+                    ignore=self.__ignore,
+                )
+            except InotifyObserverError as error:
+                raise WatcherError(error) from error
+        if self.__observer_type == OBSERVER_POLLING:
+            try:
+                return PollingObserver(
+                    self.__file_queue,
+                    self.__handler,
+                    self.__coalescer,
+                    self.__poll_interval,
+                    ignore=self.__ignore,
+                )
+            except PollingObserverError as error:
+                raise WatcherError(error) from error
+        return WatchdogObserver(
+            self.__file_queue,
+            self.__handler,
+            self.__coalescer,
+            self.__observer_registry,
+            self.__ignore,
+        )
+
+    def __create_consumer(self) -> IConsumer:
+        """Create consumer that processes the watcher file queue.
+
+        Returns:
+            IConsumer: Watcher consumer.
+        """
+        if self.__executor == EXECUTOR_ASYNC:
+            return AsyncConsumer(
+                self.__file_queue,
+                self.__handler,
+                self.__watcher_failure_callback,
+                self.__concurrency,
+                self.__coalescer,
+                self.__completion,
+                self.__journal,
+                self.__metrics,
+            )
+        if self.__scheduler is not None:
+            return SchedulerConsumer(
+                self.__file_queue,
+                self.__handler,
+                self.__watcher_failure_callback,
+                self.__scheduler,
+                self.__weight,
+                self.__priority,
+                self.__workers,
+                self.__coalescer,
+                self.__completion,
+                self.__journal,
+                self.__metrics,
+            )
+        return ConsumerPool(
+            self.__file_queue,
+            self.__handler,
+            self.__watcher_failure_callback,
+            self.__workers,
+            self.__ordered,
+            self.__coalescer,
+            self.__completion,
+            self.__journal,
+            self.__metrics,
+        )
+
+    def __scan_backlog(self) -> None:
+        """Queue files already in the watcher source (observer is running so none are missed)."""
+        if not self.__backlog:
+            return
+        queued: int = BacklogScanner(
+            self.__file_queue,
+            self.__handler,
+            self.__coalescer,
+            ignore=self.__ignore,
+            journal=self.__journal,
+        ).scan()
+        logging.info("%s backlog of %d files queued.", self.__handler.name, queued)
+
     @property
     def is_running(self) -> bool:
         """Is watcher currently running ?
@@ -138,17 +382,24 @@ class Watcher:
             return
 
         if self.__observer is None:
-            self.__observer = WatchdogObserver(self.__file_queue, self.__handler)
-            self.__consumer = Consumer(
-                self.__file_queue,
-                self.__handler,
-                self.__watcher_failure_callback,
-            )
+            self.__observer = self.__create_observer()
+            self.__consumer = self.__create_consumer()
 
         if self.__observer is not None:
+            if self.__journal is not None:
+                self.__journal.replay()
             self.__observer.start()
-            self.__consumer.start()
-            self.__running = True
+            if self.__journal is not None:
+                # The journal holds the queue on disk, so the whole backlog is queued
+                # (skipping replayed files) before any file is processed
+                self.__scan_backlog()
+                self.__consumer.start()
+                self.__running = True
+            else:
+                # An in-memory queue is processed as the backlog is scanned
+                self.__consumer.start()
+                self.__running = True
+                self.__scan_backlog()
         else:
             raise WatcherError("Could not create observer.")
 
@@ -160,6 +411,10 @@ class Watcher:
             self.__observer = None  # type: ignore
             self.__consumer.stop()
             self.__consumer = None  # type: ignore
+            if self.__journal is not None:
+                self.__journal.close()
+            self.__coalescer.clear()
+            self.__handler.close()
             self.__running = False
 
     @property
@@ -175,3 +430,21 @@ class Watcher:
             int: Number of files processed by handler.
         """
         return self.__handler.files_processed
+
+    @property
+    def metrics(self) -> MetricsSnapshot:
+        """Return watcher metrics.
+
+        Returns:
+            MetricsSnapshot: Current watcher metric values.
+        """
+        return self.__metrics.snapshot()
+
+    @property
+    def duplicates_dropped(self) -> int:
+        """Return the number of duplicate file events dropped.
+
+        Returns:
+            int: Number of coalesced duplicate events.
+        """
+        return self.__coalescer.duplicates
@@ -34,7 +34,7 @@ class FileAnnouncerHandler(IHandler):
 
         except OSError as error:
             logging.info(FileAnnouncerHandlerError(error))
-            self.errors += 1
+            Handler.increment_errors(self)
             return False
 
         return True
@@ -5,6 +5,7 @@ import pathlib
 import os
 import tempfile
 import shutil
+import pytest
 
 from core.constants import (
     CONFIG_TYPE,
@@ -17,6 +18,13 @@ from core.constants import (
 )
 from core.handler import Handler
 from core.config import ConfigDict
+from core.interface.ihandler import IHandler
+
+# Benchmarks compare timings, which vary on a loaded machine, so only run on request
+
+benchmark = pytest.mark.skipif(
+    not os.environ.get("FPE_BENCHMARK"), reason="benchmark (set FPE_BENCHMARK to run)"
+)
 
 
 def json_file_source(source_file: str) -> str:
@@ -40,10 +48,11 @@ def create_test_file(source_path: pathlib.Path, read_only: bool = False) -> None
     """
     if not source_path.parent.exists():
         Handler.create_path(source_path.parent)
-    with open(source_path, "wb") as test_file:
+    file_mode: int = 0o444 if read_only else 0o666
+    with open(
+        os.open(source_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, file_mode), "wb"
+    ) as test_file:
         test_file.write(os.urandom(1024 * 1024))
-    if read_only:
-        source_path.chmod(0o444)
 
 
 def create_copyfile_config() -> ConfigDict:
@@ -81,3 +90,36 @@ def remove_source_destination(watcher_config: ConfigDict) -> None:
         and pathlib.Path(watcher_config[CONFIG_DESTINATION]).exists()
     ):
         shutil.rmtree(watcher_config[CONFIG_DESTINATION])
+
+
+class StubHandler(IHandler):
+    """Handler that only supplies a source for observer tests."""
+
+    def __init__(self, source: str, recursive: bool = False) -> None:
+        """Initialise handler.
+
+        Args:
+            source (str): Watched directory.
+            recursive (bool, optional): Watch sub-directories. Defaults to False.
+        """
+        self.source = source
+        self.recursive = recursive
+
+    def process(self, source_path: pathlib.Path) -> bool:
+        """Do nothing.
+
+        Args:
+            source_path (pathlib.Path): Source file path.
+
+        Returns:
+            bool: Always true.
+        """
+        return True
+
+    def status(self) -> str:
+        """Return empty status.
+
+        Returns:
+            str: Empty status string.
+        """
+        return ""
@@ -0,0 +1,92 @@
+"""TEST"""
+# pylint: disable=missing-function-docstring, missing-class-docstring, unused-argument
+
+import os
+import errno
+import hashlib
+import pytest
+
+from builtin.common import checksum_copy as checksum
+from builtin.common.checksum_copy import checksum_copy, ChecksumCopyError
+
+
+def create_file(path, data: bytes = b"") -> bytes:
+    data = data or os.urandom(3 * checksum.CHECKSUM_BLOCK_SIZE + 5)
+    path.write_bytes(data)
+    return data
+
+
+class TestBuiltinCommonChecksumCopy:
+    def test_checksum_copy_unsupported_algorithm(self, tmp_path) -> None:
+        create_file(tmp_path / "source")
+        with pytest.raises(ChecksumCopyError):
+            checksum_copy(tmp_path / "source", tmp_path / "destination", "md5")
+
+    @pytest.mark.parametrize("algorithm", checksum.CHECKSUM_ALGORITHMS)
+    def test_checksum_copy_digest_and_sidecar(self, tmp_path, algorithm) -> None:
+        data = create_file(tmp_path / "source")
+        strategy, digest = checksum_copy(
+            tmp_path / "source", tmp_path / "destination", algorithm
+        )
+        assert strategy == checksum.STRATEGY_HASHED_COPY
+        assert digest == hashlib.new(algorithm, data).hexdigest()
+        assert (tmp_path / "destination").read_bytes() == data
+        assert (tmp_path / f"destination.{algorithm}").read_text(
+            encoding="utf-8"
+        ) == f"{digest}  destination\n"
+
+    def test_checksum_copy_move_hashes_once(self, tmp_path) -> None:
+        data = create_file(tmp_path / "source")
+        strategy, digest = checksum_copy(
+            tmp_path / "source", tmp_path / "destination", "sha256", move=True
+        )
+        assert strategy == "rename"
+        assert not (tmp_path / "source").exists()
+        assert digest == hashlib.sha256(data).hexdigest()
+
+    def test_checksum_copy_content_addressed_deduplicates(self, tmp_path) -> None:
+        data = create_file(tmp_path / "source", b"same payload")
+        store = tmp_path / "store"
+        first, digest = checksum_copy(
+            tmp_path / "source", tmp_path / "one", "blake2b", content_store=store
+        )
+        second, _ = checksum_copy(
+            tmp_path / "source", tmp_path / "two", "blake2b", content_store=store
+        )
+        assert (first, second) == (
+            checksum.STRATEGY_HASHED_COPY,
+            checksum.STRATEGY_DEDUPLICATED,
+        )
+        object_path = store / digest[:2] / digest
+        assert object_path.read_bytes() == data
+        assert (tmp_path / "one").stat().st_ino == object_path.stat().st_ino
+        assert (tmp_path / "two").stat().st_ino == object_path.stat().st_ino
+        # No staging files left behind
+        assert sorted(path.name for path in store.iterdir()) == [digest[:2]]
+
+    def test_checksum_copy_object_out_of_links_is_replaced(
+        self, tmp_path, monkeypatch
+    ) -> None:
+        data = create_file(tmp_path / "source")
+        store = tmp_path / checksum.CONTENT_STORE
+        _, digest = checksum_copy(
+            tmp_path / "source", tmp_path / "one", "sha256", content_store=store
+        )
+        object_path = store / digest[:2] / digest
+        old_inode = object_path.stat().st_ino
+        link = os.link
+
+        def link_limit(source, destination) -> None:
+            if os.stat(source).st_nlink >= 2:
+                raise OSError(errno.EMLINK, os.strerror(errno.EMLINK))
+            link(source, destination)
+
+        monkeypatch.setattr(os, "link", link_limit)
+        strategy, _ = checksum_copy(
+            tmp_path / "source", tmp_path / "two", "sha256", content_store=store
+        )
+        assert strategy == checksum.STRATEGY_DEDUPLICATED
+        assert (tmp_path / "two").read_bytes() == data
+        assert (tmp_path / "one").stat().st_ino == old_inode
+        assert (tmp_path / "two").stat().st_ino == object_path.stat().st_ino != old_inode
+        assert sorted(path.name for path in store.iterdir()) == [digest[:2]]
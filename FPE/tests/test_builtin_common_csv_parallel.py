@@ -0,0 +1,146 @@
+"""TEST"""
+# pylint: disable=missing-function-docstring, missing-class-docstring
+
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+
+from builtin.common import csv_parallel
+
+
+def create_csv_file(csv_file, rows: int) -> None:
+    with open(csv_file, "w", encoding="utf-8") as file_handle:
+        file_handle.write("id,name\n")
+        for row in range(rows):
+            file_handle.write(f"{row},name{row}\n")
+
+
+class RecordingCursor:
+    def __init__(self, statements: list[str]) -> None:
+        self.statements = statements
+
+    def execute(self, statement: str) -> None:
+        self.statements.append(statement)
+
+    def close(self) -> None:
+        pass
+
+
+class RecordingDatabase:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    def cursor(self) -> RecordingCursor:
+        return RecordingCursor(self.statements)
+
+    def commit(self) -> None:
+        self.statements.append("COMMIT")
+
+    def rollback(self) -> None:
+        self.statements.append("ROLLBACK")
+
+
+class TestBuiltinCommonCSVParallel:
+    def test_csv_parallel_split_ranges_are_line_aligned(self, tmp_path) -> None:
+        create_csv_file(tmp_path / "test.csv", 1000)
+        fieldnames, byte_ranges = csv_parallel.split_ranges(str(tmp_path / "test.csv"), 4)
+        assert fieldnames == ("id", "name")
+        assert len(byte_ranges) == 4
+        lines = [
+            line
+            for byte_range in byte_ranges
+            for line in csv_parallel.read_lines(str(tmp_path / "test.csv"), byte_range)
+        ]
+        assert lines == [f"{row},name{row}\n" for row in range(1000)]
+
+    def test_csv_parallel_split_ranges_more_chunks_than_lines(self, tmp_path) -> None:
+        create_csv_file(tmp_path / "test.csv", 2)
+        _, byte_ranges = csv_parallel.split_ranges(str(tmp_path / "test.csv"), 16)
+        assert len(byte_ranges) == 2
+
+    def test_csv_parallel_split_ranges_header_only(self, tmp_path) -> None:
+        create_csv_file(tmp_path / "test.csv", 0)
+        fieldnames, byte_ranges = csv_parallel.split_ranges(str(tmp_path / "test.csv"), 4)
+        assert fieldnames == ("id", "name")
+        assert not byte_ranges
+
+    def test_csv_parallel_import_sqlite(self, tmp_path) -> None:
+        database_file = str(tmp_path / "test.sqlite")
+        database = sqlite3.connect(database_file)
+        database.execute("CREATE TABLE details (id INTEGER PRIMARY KEY, name TEXT)")
+        create_csv_file(tmp_path / "test.csv", 5000)
+        assert (
+            csv_parallel.import_sqlite(
+                database, database_file, str(tmp_path / "test.csv"), "details", "id", 3
+            )
+            == 5000
+        )
+        assert database.execute("SELECT COUNT(*) FROM details").fetchone()[0] == 5000
+        # Staging databases removed
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            "test.csv",
+            "test.sqlite",
+        ]
+        database.close()
+
+    def test_csv_parallel_import_sqlite_failed_merge_rolls_back(self, tmp_path) -> None:
+        database_file = str(tmp_path / "test.sqlite")
+        database = sqlite3.connect(database_file)
+        database.execute("CREATE TABLE details (id INTEGER PRIMARY KEY, name TEXT)")
+        create_csv_file(tmp_path / "first.csv", 1000)
+        with open(tmp_path / "first.csv", "r", encoding="utf-8") as file_handle:
+            lines = file_handle.readlines()
+        # Key 0 inserted again by the last range
+        with open(tmp_path / "test.csv", "w", encoding="utf-8") as file_handle:
+            file_handle.writelines(lines + ["0,again\n"])
+        with pytest.raises(sqlite3.IntegrityError):
+            csv_parallel.import_sqlite(
+                database, database_file, str(tmp_path / "test.csv"), "details", "", 3
+            )
+        assert database.execute("SELECT COUNT(*) FROM details").fetchone()[0] == 0
+        database.close()
+
+    def test_csv_parallel_check_boundaries(self) -> None:
+        csv_parallel.check_boundaries([2, 4, 1])
+        with pytest.raises(csv_parallel.CSVParallelSplitError):
+            csv_parallel.check_boundaries([2, 1, 1])
+
+    def test_csv_parallel_import_sqlite_quoted_field_across_ranges(
+        self, tmp_path
+    ) -> None:
+        database_file = str(tmp_path / "test.sqlite")
+        database = sqlite3.connect(database_file)
+        database.execute("CREATE TABLE details (id INTEGER PRIMARY KEY, name TEXT)")
+        lines = "\n".join(f"line{number}" for number in range(1000))
+        with open(tmp_path / "test.csv", "w", encoding="utf-8") as file_handle:
+            file_handle.write(f'id,name\n0,"{lines}"\n1,name1\n')
+        with pytest.raises(csv_parallel.CSVParallelSplitError):
+            csv_parallel.import_sqlite(
+                database, database_file, str(tmp_path / "test.csv"), "details", "", 2
+            )
+        assert database.execute("SELECT COUNT(*) FROM details").fetchone()[0] == 0
+        database.close()
+
+    def test_csv_parallel_import_mysql_commits_before_drop(
+        self, tmp_path, monkeypatch
+    ) -> None:
+        monkeypatch.setattr(
+            csv_parallel, "_process_pool", lambda workers: ThreadPoolExecutor(workers)
+        )
+        monkeypatch.setattr(csv_parallel, "_stage_mysql", lambda *args: (10, 0))
+        create_csv_file(tmp_path / "test.csv", 1000)
+        database = RecordingDatabase()
+        assert (
+            csv_parallel.import_mysql(
+                database, {}, str(tmp_path / "test.csv"), "details", "id", 2
+            )
+            == 20
+        )
+        commit = database.statements.index("COMMIT")
+        drops = [
+            index
+            for index, statement in enumerate(database.statements)
+            if statement.startswith("DROP TABLE")
+        ]
+        assert len(drops) == 2
+        assert commit < min(drops)
@@ -0,0 +1,119 @@
+"""TEST"""
+# pylint: disable=missing-function-docstring, missing-class-docstring
+
+import io
+import csv
+import time
+import logging
+import resource
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+
+from tests.common import benchmark
+from builtin.common.csv_reader import CSVBatchReader, CSVBatchReaderError
+
+# Benchmark file size and rows per batch
+
+BENCHMARK_ROWS: int = 100000
+BENCHMARK_COLUMNS: int = 20
+BENCHMARK_BATCH: int = 10000
+
+
+def create_csv_file(csv_file, rows: int, columns: int) -> None:
+    with open(csv_file, "w", encoding="utf-8", newline="") as file_handle:
+        csv_writer = csv.writer(file_handle)
+        csv_writer.writerow([f"column{column}" for column in range(columns)])
+        for row in range(rows):
+            csv_writer.writerow([f"{row}.{column}" for column in range(columns)])
+
+
+def dict_reader_path(csv_file: str) -> tuple[float, int]:
+    started = time.perf_counter()
+    rows = 0
+    with open(csv_file, "r", encoding="utf-8") as file_handle:
+        csv_reader = csv.DictReader(file_handle)
+        while batch := list(itertools.islice(csv_reader, BENCHMARK_BATCH)):
+            rows += len(batch)
+    rate = rows / (time.perf_counter() - started)
+    return rate, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def tuple_reader_path(csv_file: str) -> tuple[float, int]:
+    started = time.perf_counter()
+    rows = 0
+    with open(csv_file, "r", encoding="utf-8") as file_handle:
+        for batch in CSVBatchReader(file_handle, BENCHMARK_BATCH):
+            rows += len(batch)
+    rate = rows / (time.perf_counter() - started)
+    return rate, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_in_new_process(path_fn, csv_file: str) -> tuple[float, int]:
+    # A fresh process per reader so peak RSS belongs to that reader alone
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(path_fn, csv_file).result()
+
+
+class TestBuiltinCommonCSVReader:
+    def test_csv_reader_batches_of_tuples(self) -> None:
+        file_handle = io.StringIO("id,name\n" + "".join(f"{row},n{row}\n" for row in range(7)))
+        csv_reader = CSVBatchReader(file_handle, 3)
+        assert csv_reader.fieldnames == ("id", "name")
+        batches = list(csv_reader)
+        assert [len(batch) for batch in batches] == [3, 3, 1]
+        assert batches[0][1] == ("1", "n1")
+
+    def test_csv_reader_empty_file(self) -> None:
+        csv_reader = CSVBatchReader(io.StringIO(""))
+        assert csv_reader.fieldnames == ()
+        assert list(csv_reader) == []
+
+    def test_csv_reader_converters(self) -> None:
+        file_handle = io.StringIO("id,price,name\n1,2.5,a\n,,b\n")
+        csv_reader = CSVBatchReader(
+            file_handle, converters={"id": "int", "price": float, "missing": "int"}
+        )
+        assert list(csv_reader) == [[(1, 2.5, "a"), (None, None, "b")]]
+
+    def test_csv_reader_unknown_converter(self) -> None:
+        with pytest.raises(CSVBatchReaderError):
+            _ = CSVBatchReader(io.StringIO("id\n1\n"), converters={"id": "decimal"})
+
+    def test_csv_reader_invalid_value(self) -> None:
+        csv_reader = CSVBatchReader(io.StringIO("id\nx\n"), converters={"id": "int"})
+        with pytest.raises(ValueError):
+            _ = list(csv_reader)
+
+    def test_csv_reader_skips_blank_lines(self) -> None:
+        csv_reader = CSVBatchReader(io.StringIO("id,name\n1,a\n\n2,b\n\n"))
+        assert list(csv_reader) == [[("1", "a"), ("2", "b")]]
+
+    def test_csv_reader_pads_short_rows(self) -> None:
+        csv_reader = CSVBatchReader(
+            io.StringIO("id,name,price\n1\n2,b\n"), converters={"price": "float"}
+        )
+        assert list(csv_reader) == [[("1", None, None), ("2", "b", None)]]
+
+    def test_csv_reader_long_row(self) -> None:
+        csv_reader = CSVBatchReader(io.StringIO("id,name\n1,a,extra\n"))
+        with pytest.raises(ValueError):
+            _ = list(csv_reader)
+
+    @benchmark
+    def test_csv_reader_benchmark_against_dict_reader(self, tmp_path) -> None:
+        csv_file = str(tmp_path / "benchmark.csv")
+        create_csv_file(csv_file, BENCHMARK_ROWS, BENCHMARK_COLUMNS)
+        dict_rate, dict_rss = run_in_new_process(dict_reader_path, csv_file)
+        tuple_rate, tuple_rss = run_in_new_process(tuple_reader_path, csv_file)
+        logging.info(
+            "DictReader %.0f rows/sec peak RSS %d KB;"
+            " CSVBatchReader %.0f rows/sec peak RSS %d KB",
+            dict_rate,
+            dict_rss,
+            tuple_rate,
+            tuple_rss,
+        )
+        assert tuple_rate > dict_rate
+        assert tuple_rss <= dict_rss
@@ -0,0 +1,54 @@
+"""TEST"""
+# pylint: disable=missing-function-docstring, missing-class-docstring, unused-argument
+
+import os
+
+from builtin.common import directory_cache
+from builtin.common.directory_cache import DirectoryCache
+
+
+class TestBuiltinCommonDirectoryCache:
+    def test_directory_cache_creates_directory(self, tmp_path) -> None:
+        cache = DirectoryCache()
+        device = cache.ensure(tmp_path / "a" / "b")
+        assert (tmp_path / "a" / "b").is_dir()
+        assert device == os.stat(tmp_path).st_dev
+
+    def test_directory_cache_hit_makes_no_calls(self, tmp_path, monkeypatch) -> None:
+        calls = []
+        monkeypatch.setattr(
+            directory_cache.os, "makedirs", lambda *args, **kwargs: calls.append(args)
+        )
+        (tmp_path / "a").mkdir()
+        cache = DirectoryCache()
+        for _ in range(10):
+            cache.ensure(tmp_path / "a")
+        assert len(calls) == 1
+        assert (cache.hits, cache.misses) == (9, 1)
+
+    def test_directory_cache_evicts_least_recently_used(self, tmp_path) -> None:
+        cache = DirectoryCache(2)
+        cache.ensure(tmp_path / "a")
+        cache.ensure(tmp_path / "b")
+        cache.ensure(tmp_path / "a")
+        cache.ensure(tmp_path / "c")
+        assert len(cache) == 2
+        cache.ensure(tmp_path / "a")
+        assert cache.hits == 2
+        cache.ensure(tmp_path / "b")
+        assert cache.misses == 4
+
+    def test_directory_cache_disabled(self, tmp_path) -> None:
+        cache = DirectoryCache(0)
+        cache.ensure(tmp_path / "a")
+        cache.ensure(tmp_path / "a")
+        assert len(cache) == 0
+        assert cache.misses == 2
+
+    def test_directory_cache_invalidate(self, tmp_path) -> None:
+        cache = DirectoryCache()
+        cache.ensure(tmp_path / "a")
+        os.rmdir(tmp_path / "a")
+        cache.invalidate()
+        cache.ensure(tmp_path / "a")
+        assert (tmp_path / "a").is_dir()
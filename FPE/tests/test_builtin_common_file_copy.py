@@ -0,0 +1,129 @@
+"""TEST"""
+# pylint: disable=missing-function-docstring, missing-class-docstring, unused-argument
+
+import os
+import pytest
+
+from builtin.common import file_copy
+from builtin.common.file_copy import copy_file, FileCopyError
+
+
+def create_file(path, size: int = 65536) -> None:
+    path.write_bytes(os.urandom(size))
+
+
+class TestBuiltinCommonFileCopy:
+    def test_file_copy_unknown_mode(self, tmp_path) -> None:
+        create_file(tmp_path / "source")
+        with pytest.raises(FileCopyError):
+            copy_file(tmp_path / "source", tmp_path / "destination", mode="teleport")
+
+    def test_file_copy_move_on_same_device_renames(self, tmp_path) -> None:
+        create_file(tmp_path / "source")
+        data = (tmp_path / "source").read_bytes()
+        strategy = copy_file(tmp_path / "source", tmp_path / "destination", move=True)
+        assert strategy == file_copy.STRATEGY_RENAME
+        assert not (tmp_path / "source").exists()
+        assert (tmp_path / "destination").read_bytes() == data
+
+    def test_file_copy_hardlink(self, tmp_path) -> None:
+        create_file(tmp_path / "source")
+        strategy = copy_file(
+            tmp_path / "source", tmp_path / "destination", mode=file_copy.STRATEGY_HARDLINK
+        )
+        assert strategy == file_copy.STRATEGY_HARDLINK
+        assert (tmp_path / "source").stat().st_ino == (tmp_path / "destination").stat().st_ino
+
+    def test_file_copy_does_not_write_through_hardlink(self, tmp_path) -> None:
+        create_file(tmp_path / "source")
+        copy_file(
+            tmp_path / "source", tmp_path / "destination", mode=file_copy.STRATEGY_HARDLINK
+        )
+        data = (tmp_path / "source").read_bytes()
+        create_file(tmp_path / "other")
+        copy_file(tmp_path / "other", tmp_path / "destination")
+        assert (tmp_path / "source").read_bytes() == data
+        assert (tmp_path / "destination").read_bytes() == (tmp_path / "other").read_bytes()
+
+    def test_file_copy_forced_copy(self, tmp_path) -> None:
+        create_file(tmp_path / "source")
+        strategy = copy_file(
+            tmp_path / "source", tmp_path / "destination", True, file_copy.STRATEGY_COPY
+        )
+        assert strategy == file_copy.STRATEGY_COPY
+        assert (tmp_path / "source").exists()
+
+    def test_file_copy_data_and_mode_preserved(self, tmp_path) -> None:
+        create_file(tmp_path / "source", 3 * 1024 * 1024 + 17)
+        (tmp_path / "source").chmod(0o640)
+        strategy = copy_file(tmp_path / "source", tmp_path / "destination")
+        assert strategy in (
+            file_copy.STRATEGY_REFLINK,
+            file_copy.STRATEGY_COPY_FILE_RANGE,
+            file_copy.STRATEGY_SENDFILE,
+            file_copy.STRATEGY_COPY,
+        )
+        assert (tmp_path / "destination").read_bytes() == (tmp_path / "source").read_bytes()
+        assert (tmp_path / "destination").stat().st_mode & 0o777 == 0o640
+        assert (tmp_path / "destination").stat().st_mtime == pytest.approx(
+            (tmp_path / "source").stat().st_mtime
+        )
+
+    def test_file_copy_empty_file(self, tmp_path) -> None:
+        (tmp_path / "source").touch()
+        copy_file(tmp_path / "source", tmp_path / "destination")
+        assert (tmp_path / "destination").stat().st_size == 0
+
+    def test_file_copy_preserves_sparse_file(self, tmp_path) -> None:
+        size = 64 * 1024 * 1024
+        with open(tmp_path / "source", "wb") as file:
+            file.truncate(size)
+            file.seek(size // 2)
+            file.write(b"data")
+        if (tmp_path / "source").stat().st_blocks * 512 >= size:
+            pytest.skip("Filesystem does not support sparse files.")
+        strategy = copy_file(tmp_path / "source", tmp_path / "destination")
+        assert strategy in (file_copy.STRATEGY_REFLINK, file_copy.STRATEGY_SPARSE)
+        destination = (tmp_path / "destination").stat()
+        assert destination.st_size == size
+        assert destination.st_blocks * 512 < size
+        with open(tmp_path / "destination", "rb") as file:
+            file.seek(size // 2)
+            assert file.read(4) == b"data"
+
+    def test_file_copy_short_copy_file_range_uses_sendfile(
+        self, tmp_path, monkeypatch
+    ) -> None:
+        if not hasattr(os, "copy_file_range") or not hasattr(os, "sendfile"):
+            pytest.skip("copy_file_range and sendfile not available.")
+        create_file(tmp_path / "source")
+        data = (tmp_path / "source").read_bytes()
+        monkeypatch.setattr(file_copy, "_reflink", lambda *_: False)
+        copy_file_range = os.copy_file_range
+        # Copies the first 4KiB then nothing more
+        monkeypatch.setattr(
+            os,
+            "copy_file_range",
+            lambda src, dst, count, offset_src, offset_dst: (
+                copy_file_range(src, dst, 4096, offset_src, offset_dst)
+                if offset_src == 0
+                else 0
+            ),
+        )
+        strategy = copy_file(tmp_path / "source", tmp_path / "destination")
+        assert strategy == file_copy.STRATEGY_SENDFILE
+        assert (tmp_path / "destination").read_bytes() == data
+
+    def test_file_copy_short_kernel_copy_falls_back_to_copy(
+        self, tmp_path, monkeypatch
+    ) -> None:
+        if not hasattr(os, "copy_file_range") or not hasattr(os, "sendfile"):
+            pytest.skip("copy_file_range and sendfile not available.")
+        create_file(tmp_path / "source")
+        data = (tmp_path / "source").read_bytes()
+        monkeypatch.setattr(file_copy, "_reflink", lambda *_: False)
+        monkeypatch.setattr(os, "copy_file_range", lambda *_: 0)
+        monkeypatch.setattr(os, "sendfile", lambda *_: 0)
+        strategy = copy_file(tmp_path / "source", tmp_path / "destination")
+        assert strategy == file_copy.STRATEGY_COPY
+        assert (tmp_path / "destination").read_bytes() == data
@@ -0,0 +1,91 @@
+"""TEST"""
+# pylint: disable=missing-function-docstring, missing-class-docstring
+
+import sqlite3
+
+from builtin.common import sql
+
+
+class TestBuiltinCommonSQL:
+    def test_sql_generate_upsert_insert_only(self) -> None:
+        assert (
+            sql.generate_upsert(sql.DIALECT_SQLITE, "details", "", ("id", "name"), 2)
+            == "INSERT INTO `details` (id,name) VALUES (?,?),(?,?)"
+        )
+
+    def test_sql_generate_upsert_sqlite(self) -> None:
+        assert sql.generate_upsert(
+            sql.DIALECT_SQLITE, "details", "id", ("id", "name")
+        ) == (
+            "INSERT INTO `details` (id,name) VALUES (?,?)"
+            " ON CONFLICT(id) DO UPDATE SET name=excluded.name"
+        )
+
+    def test_sql_generate_upsert_mysql(self) -> None:
+        assert sql.generate_upsert(
+            sql.DIALECT_MYSQL, "details", "id", ("id", "name"), 2
+        ) == (
+            "INSERT INTO `details` (id,name) VALUES (%s,%s),(%s,%s)"
+            " ON DUPLICATE KEY UPDATE name=VALUES(name)"
+        )
+
+    def test_sql_generate_upsert_key_only(self) -> None:
+        assert sql.generate_upsert(sql.DIALECT_SQLITE, "details", "id", ("id",)).endswith(
+            "ON CONFLICT(id) DO NOTHING"
+        )
+
+    def test_sql_generate_upsert_invalid(self) -> None:
+        assert sql.generate_upsert("oracle", "details", "", ("id",)) == ""
+        assert sql.generate_upsert(sql.DIALECT_SQLITE, "details", "", ()) == ""
+
+    def test_sql_generate_upsert_is_cached(self) -> None:
+        sql.generate_upsert.cache_clear()
+        sql.generate_upsert(sql.DIALECT_MYSQL, "details", "id", ("id", "name"))
+        sql.generate_upsert(sql.DIALECT_MYSQL, "details", "id", ("id", "name"))
+        assert sql.generate_upsert.cache_info().hits == 1
+
+    def test_sql_generate_merge_sqlite(self) -> None:
+        assert sql.generate_merge(
+            sql.DIALECT_SQLITE, "details", "id", ("id", "name"), "staging.stage"
+        ) == (
+            "INSERT INTO `details` (id,name) SELECT id,name FROM staging.stage WHERE true"
+            " ON CONFLICT(id) DO UPDATE SET name=excluded.name"
+        )
+
+    def test_sql_generate_merge_mysql(self) -> None:
+        assert sql.generate_merge(
+            sql.DIALECT_MYSQL, "details", "id", ("id", "name"), "`stage`"
+        ) == (
+            "INSERT INTO `details` (id,name) SELECT id,name FROM `stage`"
+            " ON DUPLICATE KEY UPDATE name=VALUES(name)"
+        )
+
+    def test_sql_sqlite_max_parameters_by_version(self) -> None:
+        assert sql.sqlite_max_parameters((3, 31, 1)) == 999
+        assert sql.sqlite_max_parameters((3, 32, 0)) == 32766
+        assert sql.DIALECT_MAX_PARAMETERS[sql.DIALECT_SQLITE] == (
+            sql.sqlite_max_parameters(sqlite3.sqlite_version_info)
+        )
+
+    def test_sql_statement_rows_within_parameter_limit(self) -> None:
+        assert sql.statement_rows(sql.DIALECT_SQLITE, 2, 100) == 100
+        assert (
+            sql.statement_rows(sql.DIALECT_SQLITE, 1000, 100)
+            == sql.DIALECT_MAX_PARAMETERS[sql.DIALECT_SQLITE] // 1000
+        )
+        assert sql.statement_rows(sql.DIALECT_SQLITE, 40000, 100) == 1
+
+    def test_sql_write_rows_upserts_batch(self) -> None:
+        database = sqlite3.connect(":memory:")
+        database.execute("CREATE TABLE details (id INTEGER PRIMARY KEY, name TEXT)")
+        batch = [(str(row), f"name{row}") for row in range(25)]
+        assert (
+            sql.write_rows(database, sql.DIALECT_SQLITE, "details", "id", ("id", "name"), batch, 10)
+            == 25
+        )
+        batch = [(str(row), f"updated{row}") for row in range(20, 30)]
+        sql.write_rows(database, sql.DIALECT_SQLITE, "details", "id", ("id", "name"), batch, 4)
+        rows = database.execute("SELECT id, name FROM details ORDER BY id").fetchall()
+        assert len(rows) == 30
+        assert rows[19] == (19, "name19")
+        assert rows[29] == (29, "updated29")
@@ -1,7 +1,9 @@
 """TEST"""
 # pylint: disable=missing-function-docstring, missing-class-docstring, unused-argument
 
+import hashlib
 import pathlib
+import shutil
 import pytest
 
 from tests.common import (
@@ -9,7 +11,15 @@ from tests.common import (
     create_copyfile_config,
     remove_source_destination,
 )
-from core.constants import CONFIG_SOURCE, CONFIG_DESTINATION
+from core.constants import (
+    CONFIG_SOURCE,
+    CONFIG_DESTINATION,
+    CONFIG_DELETESOURCE,
+    CONFIG_COPYSTRATEGY,
+    CONFIG_CHECKSUM,
+    CONFIG_CONTENTADDRESSED,
+)
+from core.handler import Handler
 from core.interface.ihandler import IHandler
 from core.config import ConfigDict
 from core.error import FPEError
@@ -51,6 +61,8 @@ class TestBuiltinCopyFileHandler:
     def test_builtin_handler_copy_a_single_source_to_destination(
         self, generate_copyfile_config: ConfigDict
     ) -> None:
+        # A source that is to be deleted is moved rather than copied
+        generate_copyfile_config[CONFIG_DELETESOURCE] = False
         pathlib.Path(generate_copyfile_config[CONFIG_SOURCE]).mkdir(
             parents=True, exist_ok=True
         )
@@ -63,3 +75,96 @@ class TestBuiltinCopyFileHandler:
         handler.process(source_path)
         assert destination_path.exists()
         assert source_path.exists()
+
+    def test_builtin_copyfile_handler_unknown_copy_strategy(
+        self, generate_copyfile_config: ConfigDict
+    ) -> None:
+        generate_copyfile_config[CONFIG_COPYSTRATEGY] = "teleport"
+        with pytest.raises(FPEError):
+            _ = CopyFileHandler(generate_copyfile_config)
+
+    def test_builtin_copyfile_handler_moves_when_deleting_source(
+        self, generate_copyfile_config: ConfigDict
+    ) -> None:
+        generate_copyfile_config[CONFIG_DELETESOURCE] = True
+        handler = CopyFileHandler(generate_copyfile_config)
+        source_root = pathlib.Path(generate_copyfile_config[CONFIG_SOURCE])
+        source_path = source_root / "sub" / "test.txt"
+        create_test_file(source_path)
+        assert handler.process(source_path) is True
+        assert handler.operations == {"copy_rename": 1}
+        assert (
+            pathlib.Path(generate_copyfile_config[CONFIG_DESTINATION]) / "sub" / "test.txt"
+        ).exists()
+        # Consumer removal still prunes the emptied source directory
+        Handler.remove_source(source_root, source_path)
+        assert not (source_root / "sub").exists()
+
+    def test_builtin_copyfile_handler_copies_when_keeping_source(
+        self, generate_copyfile_config: ConfigDict
+    ) -> None:
+        generate_copyfile_config[CONFIG_DELETESOURCE] = False
+        handler = CopyFileHandler(generate_copyfile_config)
+        source_path = pathlib.Path(generate_copyfile_config[CONFIG_SOURCE]) / "test.txt"
+        create_test_file(source_path)
+        assert handler.process(source_path) is True
+        assert source_path.exists()
+        assert "copy_rename" not in handler.operations
+        assert sum(handler.operations.values()) == 1
+
+    def test_builtin_copyfile_handler_recreates_removed_directory(
+        self, generate_copyfile_config: ConfigDict
+    ) -> None:
+        generate_copyfile_config[CONFIG_DELETESOURCE] = False
+        handler = CopyFileHandler(generate_copyfile_config)
+        source_path = pathlib.Path(generate_copyfile_config[CONFIG_SOURCE]) / "sub" / "test.txt"
+        destination_directory = pathlib.Path(generate_copyfile_config[CONFIG_DESTINATION]) / "sub"
+        create_test_file(source_path)
+        assert handler.process(source_path) is True
+        shutil.rmtree(destination_directory)
+        # Cached directory is gone so the copy fails and the cache is invalidated
+        assert handler.process(source_path) is False
+        assert handler.process(source_path) is True
+        assert (destination_directory / "test.txt").exists()
+
+    def test_builtin_copyfile_handler_unknown_checksum(
+        self, generate_copyfile_config: ConfigDict
+    ) -> None:
+        generate_copyfile_config[CONFIG_CHECKSUM] = "crc32"
+        with pytest.raises(FPEError):
+            _ = CopyFileHandler(generate_copyfile_config)
+
+    def test_builtin_copyfile_handler_checksum_sidecar(
+        self, generate_copyfile_config: ConfigDict
+    ) -> None:
+        generate_copyfile_config[CONFIG_DELETESOURCE] = False
+        generate_copyfile_config[CONFIG_CHECKSUM] = "sha256"
+        handler = CopyFileHandler(generate_copyfile_config)
+        source_path = pathlib.Path(generate_copyfile_config[CONFIG_SOURCE]) / "test.txt"
+        create_test_file(source_path)
+        assert handler.process(source_path) is True
+        sidecar = (
+            pathlib.Path(generate_copyfile_config[CONFIG_DESTINATION]) / "test.txt.sha256"
+        ).read_text(encoding="utf-8")
+        assert sidecar == (
+            hashlib.sha256(source_path.read_bytes()).hexdigest() + "  test.txt\n"
+        )
+        assert handler.operations == {"copy_hashed_copy": 1}
+
+    def test_builtin_copyfile_handler_content_addressed(
+        self, generate_copyfile_config: ConfigDict
+    ) -> None:
+        generate_copyfile_config[CONFIG_DELETESOURCE] = False
+        generate_copyfile_config[CONFIG_CONTENTADDRESSED] = True
+        handler = CopyFileHandler(generate_copyfile_config)
+        assert handler.checksum == "sha256"
+        source_root = pathlib.Path(generate_copyfile_config[CONFIG_SOURCE])
+        create_test_file(source_root / "one.txt")
+        shutil.copy(source_root / "one.txt", source_root / "two.txt")
+        assert handler.process(source_root / "one.txt") is True
+        assert handler.process(source_root / "two.txt") is True
+        destination_root = pathlib.Path(generate_copyfile_config[CONFIG_DESTINATION])
+        assert (destination_root / "one.txt").stat().st_ino == (
+            destination_root / "two.txt"
+        ).stat().st_ino
+        assert handler.operations == {"copy_hashed_copy": 1, "copy_deduplicated": 1}
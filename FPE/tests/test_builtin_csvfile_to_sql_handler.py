@@ -1,12 +1,169 @@
 """TEST"""
 # pylint: disable=missing-function-docstring, missing-class-docstring, unused-argument
 
+import os
+import csv
+import time
+import socket
+import logging
 import pytest
+import mysql.connector
 
-"""TEST"""
-# pylint: disable=missing-function-docstring, missing-class-docstring, unused-argument
+from core.constants import (
+    CONFIG_NAME,
+    CONFIG_SOURCE,
+    CONFIG_DELETESOURCE,
+    CONFIG_EXITONFAILURE,
+    CONFIG_RECURSIVE,
+    CONFIG_POOLSIZE,
+)
+from core.config import ConfigDict
+from tests.common import benchmark
+from builtin.csvfile_to_sql_handler import (
+    CSVFileToSQLHandler,
+    CSVFileToSQLHandlerError,
+)
+
+# Benchmark runs against the MySQL/MariaDB server given by these environment variables
+
+BENCHMARK_ROWS: int = 20000
+
+
+def unused_port() -> int:
+    with socket.socket() as unused:
+        unused.bind(("127.0.0.1", 0))
+        return unused.getsockname()[1]
+
+
+@pytest.fixture(name="generate_config")
+def fixture_generate_config(tmp_path, monkeypatch) -> ConfigDict:
+    # An empty config value is read from the environment instead
+    monkeypatch.setenv("Test key", "")
+    return {
+        CONFIG_NAME: "Test",
+        CONFIG_SOURCE: str(tmp_path / "source"),
+        CONFIG_DELETESOURCE: False,
+        CONFIG_EXITONFAILURE: False,
+        CONFIG_RECURSIVE: False,
+        "server": os.environ.get("FPE_TEST_MYSQL_SERVER", "127.0.0.1"),
+        "port": os.environ.get("FPE_TEST_MYSQL_PORT", str(unused_port())),
+        "user": os.environ.get("FPE_TEST_MYSQL_USER", "fpe"),
+        "password": os.environ.get("FPE_TEST_MYSQL_PASSWORD", "fpe"),
+        "database": os.environ.get("FPE_TEST_MYSQL_DATABASE", "fpe"),
+        "table": "details",
+        "key": "",
+    }
+
+
+def create_csv_file(csv_file, rows: int) -> None:
+    with open(csv_file, "w", encoding="utf-8") as file_handle:
+        file_handle.write("id,name\n")
+        for row in range(rows):
+            file_handle.write(f"{row},name{row}\n")
+
+
+def connect_or_skip(generate_config: ConfigDict):
+    try:
+        return mysql.connector.connect(
+            host=generate_config["server"],
+            port=generate_config["port"],
+            user=generate_config["user"],
+            passwd=generate_config["password"],
+            database=generate_config["database"],
+            connection_timeout=2,
+        )
+    except mysql.connector.Error:
+        pytest.skip("No MySQL/MariaDB server available.")
 
-import pytest
 
 class TestBuiltinCSVFileToSQLHandler:
-    pass
+    def test_csvfile_to_sql_handler_with_none_config(self) -> None:
+        with pytest.raises(CSVFileToSQLHandlerError):
+            _ = CSVFileToSQLHandler(None)  # type: ignore
+
+    def test_csvfile_to_sql_handler_pool_size_limited(
+        self, generate_config: ConfigDict
+    ) -> None:
+        generate_config[CONFIG_POOLSIZE] = 1000
+        assert CSVFileToSQLHandler(generate_config).pool_size == 32
+
+    def test_csvfile_to_sql_handler_no_server(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        if "FPE_TEST_MYSQL_SERVER" in os.environ:
+            pytest.skip("MySQL server configured.")
+        handler = CSVFileToSQLHandler(generate_config)
+        create_csv_file(tmp_path / "test.csv", 1)
+        assert handler.process(tmp_path / "test.csv") is False
+        assert handler.errors == 1
+
+    def test_csvfile_to_sql_handler_skips_blank_lines(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        database = connect_or_skip(generate_config)
+        cursor = database.cursor()
+        cursor.execute("DROP TABLE IF EXISTS details")
+        cursor.execute("CREATE TABLE details (id INT PRIMARY KEY, name VARCHAR(32))")
+        with open(tmp_path / "test.csv", "w", encoding="utf-8") as file_handle:
+            file_handle.write("id,name\n1,name1\n\n2,name2\n\n")
+        handler = CSVFileToSQLHandler(generate_config)
+        assert handler.process(tmp_path / "test.csv") is True
+        database.commit()
+        cursor.execute("SELECT id, name FROM details ORDER BY id")
+        assert cursor.fetchall() == [(1, "name1"), (2, "name2")]
+        cursor.execute("DROP TABLE details")
+        database.close()
+
+    def test_csvfile_to_sql_handler_short_row_inserts_null(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        database = connect_or_skip(generate_config)
+        cursor = database.cursor()
+        cursor.execute("DROP TABLE IF EXISTS details")
+        cursor.execute("CREATE TABLE details (id INT PRIMARY KEY, name VARCHAR(32))")
+        with open(tmp_path / "test.csv", "w", encoding="utf-8") as file_handle:
+            file_handle.write("id,name\n1,name1\n2\n")
+        handler = CSVFileToSQLHandler(generate_config)
+        assert handler.process(tmp_path / "test.csv") is True
+        database.commit()
+        cursor.execute("SELECT id, name FROM details ORDER BY id")
+        assert cursor.fetchall() == [(1, "name1"), (2, None)]
+        cursor.execute("DROP TABLE details")
+        database.close()
+
+    @benchmark
+    def test_csvfile_to_sql_handler_benchmark(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        database = connect_or_skip(generate_config)
+        cursor = database.cursor()
+        cursor.execute("DROP TABLE IF EXISTS details")
+        cursor.execute("CREATE TABLE details (id INT PRIMARY KEY, name VARCHAR(32))")
+        create_csv_file(tmp_path / "test.csv", BENCHMARK_ROWS)
+
+        # Previous path; row at a time inserts over a new connection
+
+        started = time.perf_counter()
+        with open(tmp_path / "test.csv", "r", encoding="utf-8") as file_handle:
+            for row in csv.DictReader(file_handle):
+                cursor.execute(
+                    "INSERT INTO `details` (id,name) VALUES (%(id)s,%(name)s)", row
+                )
+        database.commit()
+        row_rate = BENCHMARK_ROWS / (time.perf_counter() - started)
+        cursor.execute("DELETE FROM details")
+        database.commit()
+
+        handler = CSVFileToSQLHandler(generate_config)
+        started = time.perf_counter()
+        assert handler.process(tmp_path / "test.csv") is True
+        batch_rate = BENCHMARK_ROWS / (time.perf_counter() - started)
+        cursor.execute("SELECT COUNT(*) FROM details")
+        assert cursor.fetchone()[0] == BENCHMARK_ROWS
+        cursor.execute("DROP TABLE details")
+        database.close()
+
+        logging.info(
+            "Row at a time %.0f rows/sec; batched %.0f rows/sec", row_rate, batch_rate
+        )
+        assert batch_rate > row_rate
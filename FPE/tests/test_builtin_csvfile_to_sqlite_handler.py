@@ -1,8 +1,241 @@
 """TEST"""
 # pylint: disable=missing-function-docstring, missing-class-docstring
 
+import sqlite3
 import pytest
 
+from core.constants import (
+    CONFIG_NAME,
+    CONFIG_SOURCE,
+    CONFIG_DELETESOURCE,
+    CONFIG_EXITONFAILURE,
+    CONFIG_RECURSIVE,
+    CONFIG_BATCHSIZE,
+    CONFIG_COMMITROWS,
+    CONFIG_PRAGMAS,
+    CONFIG_CONVERTERS,
+    CONFIG_PARALLELSIZE,
+    CONFIG_IMPORTWORKERS,
+)
+from core.config import ConfigDict
+from builtin.csvfile_to_sqlite_handler import (
+    CSVFileToSQLiteHandler,
+    CSVFileToSQLiteHandlerError,
+)
+
+
+@pytest.fixture(name="generate_config")
+def fixture_generate_config(tmp_path) -> ConfigDict:
+    database_file = tmp_path / "test.sqlite"
+    with sqlite3.connect(database_file) as database:
+        database.execute("CREATE TABLE details (id INTEGER PRIMARY KEY, name TEXT)")
+    return {
+        CONFIG_NAME: "Test",
+        CONFIG_SOURCE: str(tmp_path / "source"),
+        CONFIG_DELETESOURCE: False,
+        CONFIG_EXITONFAILURE: False,
+        CONFIG_RECURSIVE: False,
+        "databasefile": str(database_file),
+        "table": "details",
+        "key": "",
+    }
+
+
+def create_csv_file(csv_file, rows: int, name: str = "name") -> None:
+    with open(csv_file, "w", encoding="utf-8") as file_handle:
+        file_handle.write("id,name\n")
+        for row in range(rows):
+            file_handle.write(f"{row},{name}{row}\n")
+
+
+def table_rows(watcher_config: ConfigDict) -> list:
+    with sqlite3.connect(watcher_config["databasefile"]) as database:
+        return database.execute("SELECT id, name FROM details ORDER BY id").fetchall()
+
 
 class TestBuiltinCSVFileToSQLiteHandler:
-    pass
+    def test_csvfile_to_sqlite_handler_with_none_config(self) -> None:
+        with pytest.raises(CSVFileToSQLiteHandlerError):
+            _ = CSVFileToSQLiteHandler(None)  # type: ignore
+
+    def test_csvfile_to_sqlite_handler_with_invalid_pragma(
+        self, generate_config: ConfigDict
+    ) -> None:
+        generate_config[CONFIG_PRAGMAS] = {"synchronous": "OFF; DROP TABLE details"}
+        with pytest.raises(CSVFileToSQLiteHandlerError):
+            _ = CSVFileToSQLiteHandler(generate_config)
+
+    def test_csvfile_to_sqlite_handler_with_unknown_converter(
+        self, generate_config: ConfigDict
+    ) -> None:
+        generate_config[CONFIG_CONVERTERS] = {"id": "decimal"}
+        with pytest.raises(CSVFileToSQLiteHandlerError):
+            _ = CSVFileToSQLiteHandler(generate_config)
+
+    def test_csvfile_to_sqlite_handler_with_converters(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        generate_config[CONFIG_CONVERTERS] = {"id": "int"}
+        handler = CSVFileToSQLiteHandler(generate_config)
+        create_csv_file(tmp_path / "test.csv", 3)
+        assert handler.process(tmp_path / "test.csv") is True
+        with sqlite3.connect(generate_config["databasefile"]) as database:
+            assert database.execute("SELECT typeof(id) FROM details").fetchone()[0] == "integer"
+
+    def test_csvfile_to_sqlite_handler_insert_in_batches(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        generate_config[CONFIG_BATCHSIZE] = 7
+        generate_config[CONFIG_COMMITROWS] = 20
+        handler = CSVFileToSQLiteHandler(generate_config)
+        create_csv_file(tmp_path / "test.csv", 100)
+        assert handler.process(tmp_path / "test.csv") is True
+        rows = table_rows(generate_config)
+        assert len(rows) == 100
+        assert rows[99] == (99, "name99")
+        assert handler.rows_per_second > 0
+        assert "Rows/sec = " in handler.status()
+
+    def test_csvfile_to_sqlite_handler_update_with_key(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        handler = CSVFileToSQLiteHandler(generate_config)
+        create_csv_file(tmp_path / "insert.csv", 10)
+        assert handler.process(tmp_path / "insert.csv") is True
+        generate_config["key"] = "id"
+        handler = CSVFileToSQLiteHandler(generate_config)
+        create_csv_file(tmp_path / "update.csv", 10, "updated")
+        assert handler.process(tmp_path / "update.csv") is True
+        assert table_rows(generate_config)[5] == (5, "updated5")
+
+    def test_csvfile_to_sqlite_handler_upsert_inserts_new_keys(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        handler = CSVFileToSQLiteHandler(generate_config)
+        create_csv_file(tmp_path / "insert.csv", 5)
+        assert handler.process(tmp_path / "insert.csv") is True
+        generate_config["key"] = "id"
+        handler = CSVFileToSQLiteHandler(generate_config)
+        create_csv_file(tmp_path / "upsert.csv", 10, "updated")
+        assert handler.process(tmp_path / "upsert.csv") is True
+        rows = table_rows(generate_config)
+        assert len(rows) == 10
+        assert rows[2] == (2, "updated2")
+        assert rows[9] == (9, "updated9")
+
+    def test_csvfile_to_sqlite_handler_journal_mode_unchanged_by_default(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        handler = CSVFileToSQLiteHandler(generate_config)
+        create_csv_file(tmp_path / "test.csv", 1)
+        assert handler.process(tmp_path / "test.csv") is True
+        handler.close()
+        with sqlite3.connect(generate_config["databasefile"]) as database:
+            assert database.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+
+    def test_csvfile_to_sqlite_handler_pragmas_applied(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        generate_config[CONFIG_PRAGMAS] = {"journal_mode": "WAL"}
+        handler = CSVFileToSQLiteHandler(generate_config)
+        create_csv_file(tmp_path / "test.csv", 1)
+        assert handler.process(tmp_path / "test.csv") is True
+        handler.close()
+        with sqlite3.connect(generate_config["databasefile"]) as database:
+            assert database.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_csvfile_to_sqlite_handler_close_then_process(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        handler = CSVFileToSQLiteHandler(generate_config)
+        create_csv_file(tmp_path / "test.csv", 10)
+        assert handler.process(tmp_path / "test.csv") is True
+        handler.close()
+        handler.close()
+        with open(tmp_path / "more.csv", "w", encoding="utf-8") as file_handle:
+            file_handle.write("id,name\n10,name10\n")
+        assert handler.process(tmp_path / "more.csv") is True
+        assert len(table_rows(generate_config)) == 11
+
+    def test_csvfile_to_sqlite_handler_missing_database(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        generate_config["databasefile"] = str(tmp_path / "missing.sqlite")
+        handler = CSVFileToSQLiteHandler(generate_config)
+        create_csv_file(tmp_path / "test.csv", 1)
+        assert handler.process(tmp_path / "test.csv") is False
+        assert handler.errors == 1
+
+    def test_csvfile_to_sqlite_handler_recovers_after_error(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        handler = CSVFileToSQLiteHandler(generate_config)
+        create_csv_file(tmp_path / "test.csv", 10)
+        assert handler.process(tmp_path / "test.csv") is True
+        assert handler.process(tmp_path / "test.csv") is False
+        create_csv_file(tmp_path / "more.csv", 20)
+        with open(tmp_path / "more.csv", "r", encoding="utf-8") as file_handle:
+            lines = file_handle.readlines()
+        with open(tmp_path / "more.csv", "w", encoding="utf-8") as file_handle:
+            file_handle.writelines(lines[:1] + lines[11:])
+        assert handler.process(tmp_path / "more.csv") is True
+        assert len(table_rows(generate_config)) == 20
+
+    def test_csvfile_to_sqlite_handler_skips_blank_lines(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        handler = CSVFileToSQLiteHandler(generate_config)
+        with open(tmp_path / "test.csv", "w", encoding="utf-8") as file_handle:
+            file_handle.write("id,name\n1,name1\n\n2,name2\n\n")
+        assert handler.process(tmp_path / "test.csv") is True
+        assert table_rows(generate_config) == [(1, "name1"), (2, "name2")]
+
+    def test_csvfile_to_sqlite_handler_short_row_inserts_null(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        generate_config[CONFIG_CONVERTERS] = {"id": "int"}
+        handler = CSVFileToSQLiteHandler(generate_config)
+        with open(tmp_path / "test.csv", "w", encoding="utf-8") as file_handle:
+            file_handle.write("id,name\n1,name1\n2\n")
+        assert handler.process(tmp_path / "test.csv") is True
+        assert table_rows(generate_config) == [(1, "name1"), (2, None)]
+
+    def test_csvfile_to_sqlite_handler_parallel_import(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        generate_config[CONFIG_PARALLELSIZE] = 1
+        generate_config[CONFIG_IMPORTWORKERS] = 2
+        handler = CSVFileToSQLiteHandler(generate_config)
+        create_csv_file(tmp_path / "test.csv", 1000)
+        assert handler.process(tmp_path / "test.csv") is True
+        assert len(table_rows(generate_config)) == 1000
+
+    def test_csvfile_to_sqlite_handler_parallel_upsert_keeps_last_row(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        generate_config["key"] = "id"
+        generate_config[CONFIG_PARALLELSIZE] = 1
+        generate_config[CONFIG_IMPORTWORKERS] = 2
+        handler = CSVFileToSQLiteHandler(generate_config)
+        create_csv_file(tmp_path / "first.csv", 100)
+        with open(tmp_path / "first.csv", "r", encoding="utf-8") as file_handle:
+            lines = file_handle.readlines()
+        # Key 0 repeated at the end of the file so it lands in the last chunk
+        with open(tmp_path / "test.csv", "w", encoding="utf-8") as file_handle:
+            file_handle.writelines(lines + ["0,last\n"])
+        assert handler.process(tmp_path / "test.csv") is True
+        rows = table_rows(generate_config)
+        assert len(rows) == 100
+        assert rows[0] == (0, "last")
+
+    def test_csvfile_to_sqlite_handler_parallel_quoted_newlines_imported_serially(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        generate_config[CONFIG_PARALLELSIZE] = 1
+        generate_config[CONFIG_IMPORTWORKERS] = 2
+        handler = CSVFileToSQLiteHandler(generate_config)
+        lines = "\n".join(f"line{number}" for number in range(1000))
+        with open(tmp_path / "test.csv", "w", encoding="utf-8") as file_handle:
+            file_handle.write(f'id,name\n0,"{lines}"\n1,name1\n')
+        assert handler.process(tmp_path / "test.csv") is True
+        assert table_rows(generate_config) == [(0, lines), (1, "name1")]
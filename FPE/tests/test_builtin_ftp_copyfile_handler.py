@@ -1,8 +1,354 @@
 """TEST"""
 # pylint: disable=missing-function-docstring, missing-class-docstring, unused-argument
 
+import hashlib
+import posixpath
+import threading
+from ftplib import error_perm, error_temp
+
 import pytest
 
+from core.constants import (
+    CONFIG_NAME,
+    CONFIG_SOURCE,
+    CONFIG_DESTINATION,
+    CONFIG_DELETESOURCE,
+    CONFIG_EXITONFAILURE,
+    CONFIG_RECURSIVE,
+    CONFIG_SERVER,
+    CONFIG_USER,
+    CONFIG_PASSWORD,
+    CONFIG_PORT,
+    CONFIG_KEEPALIVE,
+    CONFIG_CONNECTIONS,
+    CONFIG_BLOCKSIZE,
+)
+from core.config import ConfigDict
+from builtin.common import ftp_pool
+from builtin.common.ftp_pool import FTPSessionPool, FTPSessionPoolError
+from builtin.ftp_copyfile_handler import FTPCopyFileHandler, FTPCopyFileHandlerError
+
+
+class FakeFTP:
+    """In memory FTP connection recording the commands sent."""
+
+    directories: set = {"/"}
+    files: dict = {}
+    commands: list = []
+    features: str = " REST STREAM"
+    drop_noop: bool = False
+    fail_stor: bool = False
+    fail_after: int = 0
+    created_elsewhere: set = set()
+
+    def __init__(self, timeout=None) -> None:
+        self.cwd_path = "/"
+
+    def connect(self, host, port) -> None:
+        FakeFTP.commands.append("CONNECT")
+
+    def login(self, user, passwd) -> None:
+        pass
+
+    def pwd(self) -> str:
+        return "/"
+
+    def sendcmd(self, command) -> str:
+        if command.startswith("HASH "):
+            FakeFTP.commands.append(command)
+            data = FakeFTP.files[posixpath.join(self.cwd_path, command[5:])]
+            digest = hashlib.sha256(data).hexdigest()
+            return f"213 SHA-256 0-{len(data) - 1} {digest} {command[5:]}"
+        if command.startswith("OPTS "):
+            return "200 OK"
+        return f"211-Features:\n{FakeFTP.features}\n211 End"
+
+    def cwd(self, path) -> None:
+        FakeFTP.commands.append(f"CWD {path}")
+        if path not in FakeFTP.directories:
+            if path in FakeFTP.created_elsewhere:
+                # Another client creates the directory just after this CWD fails
+                FakeFTP.directories.add(path)
+            raise error_perm("550 No such directory.")
+        self.cwd_path = path
+
+    def mkd(self, path) -> None:
+        FakeFTP.commands.append(f"MKD {path}")
+        if path in FakeFTP.directories:
+            raise error_perm("550 Directory exists.")
+        FakeFTP.directories.add(path)
+
+    def voidcmd(self, command) -> None:
+        FakeFTP.commands.append(command)
+        if command == "NOOP" and FakeFTP.drop_noop:
+            raise error_temp("421 Timeout.")
+
+    def size(self, name) -> int:
+        path = posixpath.join(self.cwd_path, name)
+        if path not in FakeFTP.files:
+            raise error_perm("550 No such file.")
+        return len(FakeFTP.files[path])
+
+    def storbinary(self, command, file, blocksize=8192, rest=None) -> None:
+        FakeFTP.commands.append(command if rest is None else f"REST {rest} {command}")
+        if FakeFTP.fail_stor:
+            raise error_temp("426 Connection closed; transfer aborted.")
+        verb, name = command.split(" ", 1)
+        path = posixpath.join(self.cwd_path, name)
+        data = file.read()
+        if verb == "APPE" or rest is not None:
+            data = FakeFTP.files.get(path, b"")[: rest] + data
+        if FakeFTP.fail_after:
+            FakeFTP.files[path] = data[: FakeFTP.fail_after]
+            FakeFTP.fail_after = 0
+            raise error_temp("426 Connection closed; transfer aborted.")
+        FakeFTP.files[path] = data
+
+    def quit(self) -> None:
+        FakeFTP.commands.append("QUIT")
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture(name="fake_ftp")
+def fixture_fake_ftp(monkeypatch) -> type[FakeFTP]:
+    FakeFTP.directories = {"/"}
+    FakeFTP.files = {}
+    FakeFTP.commands = []
+    FakeFTP.features = " REST STREAM"
+    FakeFTP.fail_after = 0
+    FakeFTP.drop_noop = False
+    FakeFTP.fail_stor = False
+    FakeFTP.created_elsewhere = set()
+    monkeypatch.setattr(ftp_pool, "FTP", FakeFTP)
+    return FakeFTP
+
+
+@pytest.fixture(name="generate_config")
+def fixture_generate_config(tmp_path) -> ConfigDict:
+    (tmp_path / "source").mkdir()
+    return {
+        CONFIG_NAME: "Test",
+        CONFIG_SOURCE: str(tmp_path / "source"),
+        CONFIG_DESTINATION: "upload/files",
+        CONFIG_DELETESOURCE: False,
+        CONFIG_EXITONFAILURE: False,
+        CONFIG_RECURSIVE: False,
+        CONFIG_SERVER: "localhost",
+        CONFIG_USER: "user",
+        CONFIG_PASSWORD: "password",
+    }
+
+
+def create_files(directory, count: int) -> list:
+    files = []
+    for index in range(count):
+        files.append(directory / f"file{index}.txt")
+        files[-1].write_text(f"file {index}")
+    return files
+
 
 class TestBuiltinFTPCopyFileHandler:
-    pass
+    def test_ftp_copyfile_handler_with_none_config(self) -> None:
+        with pytest.raises(FTPCopyFileHandlerError):
+            _ = FTPCopyFileHandler(None)  # type: ignore
+
+    def test_ftp_session_pool_invalid_size(self) -> None:
+        with pytest.raises(FTPSessionPoolError):
+            _ = FTPSessionPool("localhost", "user", "password", 0)
+
+    def test_ftp_copyfile_handler_reuses_session(
+        self, fake_ftp, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        handler = FTPCopyFileHandler(generate_config)
+        for source_file in create_files(tmp_path / "source", 5):
+            assert handler.process(source_file) is True
+        assert handler.pool.connects == 1
+        assert fake_ftp.commands.count("MKD /upload") == 1
+        assert fake_ftp.commands.count("MKD /upload/files") == 1
+        # Steady state is one STOR per file
+        assert fake_ftp.commands[-4:] == [
+            "STOR file1.txt",
+            "STOR file2.txt",
+            "STOR file3.txt",
+            "STOR file4.txt",
+        ]
+
+    def test_ftp_copyfile_handler_keepalive_noop(
+        self, fake_ftp, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        generate_config[CONFIG_KEEPALIVE] = 0
+        handler = FTPCopyFileHandler(generate_config)
+        for source_file in create_files(tmp_path / "source", 2):
+            assert handler.process(source_file) is True
+        assert fake_ftp.commands.count("NOOP") == 1
+        assert handler.pool.connects == 1
+
+    def test_ftp_copyfile_handler_reconnects_dropped_session(
+        self, fake_ftp, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        generate_config[CONFIG_KEEPALIVE] = 0
+        handler = FTPCopyFileHandler(generate_config)
+        fake_ftp.drop_noop = True
+        for source_file in create_files(tmp_path / "source", 3):
+            assert handler.process(source_file) is True
+        assert handler.pool.connects == 3
+
+    def test_ftp_copyfile_handler_error_invalidates_directories(
+        self, fake_ftp, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        handler = FTPCopyFileHandler(generate_config)
+        source_files = create_files(tmp_path / "source", 2)
+        assert handler.process(source_files[0]) is True
+        fake_ftp.fail_stor = True
+        assert handler.process(source_files[1]) is False
+        assert handler.errors == 1
+        assert fake_ftp.commands.count("STOR file1.txt") == ftp_pool.FTP_UPLOAD_ATTEMPTS
+        fake_ftp.fail_stor = False
+        fake_ftp.commands.clear()
+        assert handler.process(source_files[1]) is True
+        # Failed sessions are discarded rather than reused
+        assert handler.pool.connects == 1 + ftp_pool.FTP_UPLOAD_ATTEMPTS
+        assert "CWD /upload" in fake_ftp.commands
+
+    def test_ftp_copyfile_handler_pool_is_bounded(
+        self, fake_ftp, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        handler = FTPCopyFileHandler(generate_config)
+        source_files = create_files(tmp_path / "source", 20)
+        threads = [
+            threading.Thread(target=handler.process, args=(source_file,))
+            for source_file in source_files
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert handler.pool.connects <= handler.pool_size
+        assert sum(command.startswith("STOR") for command in fake_ftp.commands) == 20
+
+    def test_ftp_copyfile_handler_keeps_sub_directories(
+        self, fake_ftp, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        generate_config[CONFIG_RECURSIVE] = True
+        handler = FTPCopyFileHandler(generate_config)
+        (tmp_path / "source" / "sub" / "dir").mkdir(parents=True)
+        source_files = create_files(tmp_path / "source" / "sub" / "dir", 1)
+        assert handler.process(source_files[0]) is True
+        assert fake_ftp.files["/upload/files/sub/dir/file0.txt"] == b"file 0"
+
+    def test_ftp_copyfile_handler_directory_created_by_another_client(
+        self, fake_ftp, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        fake_ftp.created_elsewhere = {"/upload"}
+        handler = FTPCopyFileHandler(generate_config)
+        source_files = create_files(tmp_path / "source", 1)
+        assert handler.process(source_files[0]) is True
+        assert fake_ftp.commands.count("CWD /upload") == 2
+        assert fake_ftp.files["/upload/files/file0.txt"] == b"file 0"
+
+    def test_ftp_copyfile_handler_directory_cannot_be_created(
+        self, fake_ftp, generate_config: ConfigDict, tmp_path, monkeypatch
+    ) -> None:
+        def refuse_mkd(self, path) -> None:
+            raise error_perm("550 Permission denied.")
+
+        monkeypatch.setattr(FakeFTP, "mkd", refuse_mkd)
+        handler = FTPCopyFileHandler(generate_config)
+        source_files = create_files(tmp_path / "source", 1)
+        assert handler.process(source_files[0]) is False
+        assert handler.errors == 1
+
+    def test_ftp_copyfile_handler_resumes_with_rest(
+        self, fake_ftp, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        handler = FTPCopyFileHandler(generate_config)
+        source_file = tmp_path / "source" / "large.bin"
+        source_file.write_bytes(bytes(range(256)) * 64)
+        fake_ftp.fail_after = 1000
+        assert handler.process(source_file) is True
+        assert "REST 1000 STOR large.bin" in fake_ftp.commands
+        assert fake_ftp.files["/upload/files/large.bin"] == source_file.read_bytes()
+
+    def test_ftp_copyfile_handler_resumes_with_appe(
+        self, fake_ftp, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        fake_ftp.features = " SIZE"
+        handler = FTPCopyFileHandler(generate_config)
+        source_file = tmp_path / "source" / "large.bin"
+        source_file.write_bytes(bytes(range(256)) * 64)
+        fake_ftp.fail_after = 1000
+        assert handler.process(source_file) is True
+        assert "APPE large.bin" in fake_ftp.commands
+        assert fake_ftp.files["/upload/files/large.bin"] == source_file.read_bytes()
+
+    def test_ftp_copyfile_handler_resend_full_size_file_without_hash(
+        self, fake_ftp, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        handler = FTPCopyFileHandler(generate_config)
+        source_file = tmp_path / "source" / "large.bin"
+        source_file.write_bytes(bytes(range(256)) * 64)
+        fake_ftp.fail_after = len(source_file.read_bytes())
+        assert handler.process(source_file) is True
+        # Same size on the server is not proof the upload completed
+        assert fake_ftp.commands.count("STOR large.bin") == 2
+        assert fake_ftp.files["/upload/files/large.bin"] == source_file.read_bytes()
+
+    def test_ftp_copyfile_handler_skip_full_size_file_with_matching_hash(
+        self, fake_ftp, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        fake_ftp.features = " REST STREAM\n HASH SHA-256*;MD5"
+        handler = FTPCopyFileHandler(generate_config)
+        source_file = tmp_path / "source" / "large.bin"
+        source_file.write_bytes(bytes(range(256)) * 64)
+        fake_ftp.fail_after = len(source_file.read_bytes())
+        assert handler.process(source_file) is True
+        assert "HASH large.bin" in fake_ftp.commands
+        assert fake_ftp.commands.count("STOR large.bin") == 1
+
+    def test_ftp_copyfile_handler_close_quits_sessions(
+        self, fake_ftp, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        handler = FTPCopyFileHandler(generate_config)
+        source_files = create_files(tmp_path / "source", 2)
+        assert handler.process(source_files[0]) is True
+        handler.close()
+        assert fake_ftp.commands.count("QUIT") == 1
+        # Processing after a restart logs in again
+        assert handler.process(source_files[1]) is True
+        assert handler.pool.connects == 2
+
+    def test_ftp_copyfile_handler_connections_and_block_size(
+        self, fake_ftp, generate_config: ConfigDict
+    ) -> None:
+        generate_config[CONFIG_CONNECTIONS] = 4
+        generate_config[CONFIG_BLOCKSIZE] = 65536
+        handler = FTPCopyFileHandler(generate_config)
+        assert handler.pool_size == 4
+        assert handler.block_size == 65536
+
+    def test_ftp_copyfile_handler_pyftpdlib_server(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        authorizers = pytest.importorskip("pyftpdlib.authorizers")
+        handlers = pytest.importorskip("pyftpdlib.handlers")
+        servers = pytest.importorskip("pyftpdlib.servers")
+        (tmp_path / "remote").mkdir()
+        authorizer = authorizers.DummyAuthorizer()
+        authorizer.add_user("user", "password", str(tmp_path / "remote"), perm="elradfmw")
+        ftp_handler = handlers.FTPHandler
+        ftp_handler.authorizer = authorizer
+        server = servers.ThreadedFTPServer(("127.0.0.1", 0), ftp_handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            generate_config[CONFIG_PORT] = server.address[1]
+            handler = FTPCopyFileHandler(generate_config)
+            for source_file in create_files(tmp_path / "source", 10):
+                assert handler.process(source_file) is True
+            handler.pool.close()
+            assert handler.pool.connects == 1
+            assert len(list((tmp_path / "remote" / "upload" / "files").iterdir())) == 10
+        finally:
+            server.close_all()
@@ -0,0 +1,135 @@
+"""TEST"""
+# pylint: disable=missing-function-docstring, missing-class-docstring, unused-argument, global-statement
+
+import asyncio
+import pathlib
+from queue import Queue
+import time
+import threading
+import pytest
+
+from core.async_consumer import AsyncConsumer
+from core.consumer import ConsumerError
+from core.interface.ihandler import IHandler
+from core.interface.iasynchandler import IAsyncHandler
+
+
+failure_called: bool = False
+
+
+def failure_callback(watcher_name: str) -> None:
+    global failure_called
+    failure_called = True
+
+
+class Event:
+    def __init__(self, src_path: str) -> None:
+        self.src_path = src_path
+        self.complete = False
+
+
+class SleepingAsyncHandler(IAsyncHandler):
+    def __init__(self) -> None:
+        self.exit_on_failure = True
+        self.delete_source = False
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def process(self, source_path: pathlib.Path) -> bool:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.1)
+        self.in_flight -= 1
+        return source_path.name != "fail.txt"
+
+    def status(self) -> str:
+        return ""
+
+
+class SleepingHandler(IHandler):
+    def __init__(self) -> None:
+        self.exit_on_failure = False
+        self.delete_source = False
+
+    def process(self, source_path: pathlib.Path) -> bool:
+        time.sleep(0.1)
+        return True
+
+    def status(self) -> str:
+        return ""
+
+
+def wait_for_processed_files(handler, count: int) -> None:
+    while handler.files_processed < count:
+        time.sleep(0.01)
+
+
+class TestCoreAsyncConsumer:
+    def test_async_consumer_with_invalid_queue(self) -> None:
+        with pytest.raises(ConsumerError):
+            _ = AsyncConsumer(None, SleepingAsyncHandler(), failure_callback)  # type: ignore
+
+    def test_async_consumer_with_invalid_concurrency(self) -> None:
+        with pytest.raises(ConsumerError):
+            _ = AsyncConsumer(Queue(), SleepingAsyncHandler(), failure_callback, 0)
+
+    def test_async_consumer_start_then_stop(self) -> None:
+        consumer = AsyncConsumer(Queue(), SleepingAsyncHandler(), failure_callback)
+        consumer.start()
+        assert consumer.is_running is True
+        consumer.stop()
+        assert consumer.is_running is False
+
+    def test_async_consumer_runs_coroutines_concurrently(self, tmp_path) -> None:
+        queue: Queue = Queue()
+        handler = SleepingAsyncHandler()
+        consumer = AsyncConsumer(queue, handler, failure_callback, 10)
+        consumer.start()
+        start_time = time.perf_counter()
+        for file_number in range(20):
+            (tmp_path / f"test{file_number}.txt").touch()
+            queue.put(Event(str(tmp_path / f"test{file_number}.txt")))
+        wait_for_processed_files(handler, 20)
+        elapsed = time.perf_counter() - start_time
+        consumer.stop()
+        assert handler.max_in_flight == 10
+        assert elapsed < 1.0
+
+    def test_async_consumer_offloads_sync_handler(self, tmp_path) -> None:
+        queue: Queue = Queue()
+        handler = SleepingHandler()
+        consumer = AsyncConsumer(queue, handler, failure_callback, 10)
+        consumer.start()
+        start_time = time.perf_counter()
+        for file_number in range(10):
+            (tmp_path / f"test{file_number}.txt").touch()
+            queue.put(Event(str(tmp_path / f"test{file_number}.txt")))
+        wait_for_processed_files(handler, 10)
+        elapsed = time.perf_counter() - start_time
+        consumer.stop()
+        assert elapsed < 0.5
+
+    def test_async_consumer_when_a_processing_error_occurs(self, tmp_path) -> None:
+        queue: Queue = Queue()
+        consumer = AsyncConsumer(queue, SleepingAsyncHandler(), failure_callback)
+        consumer.start()
+        (tmp_path / "fail.txt").touch()
+        queue.put(Event(str(tmp_path / "fail.txt")))
+        while consumer.is_running:
+            time.sleep(0.01)
+        assert failure_called
+
+    def test_async_consumer_stop_after_failure_cleans_up(self, tmp_path) -> None:
+        threads = set(threading.enumerate())
+        queue: Queue = Queue()
+        consumer = AsyncConsumer(queue, SleepingAsyncHandler(), failure_callback)
+        consumer.start()
+        (tmp_path / "fail.txt").touch()
+        queue.put(Event(str(tmp_path / "fail.txt")))
+        while consumer.is_running:
+            time.sleep(0.01)
+        queue.put(Event(str(tmp_path / "test.txt")))
+        consumer.stop()
+        assert queue.empty()
+        # Threads left by earlier tests may exit meanwhile, so only new ones count
+        assert set(threading.enumerate()) <= threads
@@ -0,0 +1,109 @@
+"""TEST"""
+# pylint: disable=missing-function-docstring, missing-class-docstring, unused-argument
+
+import os
+import time
+import pathlib
+from queue import Queue
+import pytest
+
+from tests.common import StubHandler
+from core.backlog import BacklogScanner, BacklogScannerError
+from core.coalescer import EventCoalescer
+from core.event import FileEvent
+from core.journal import JournalQueue
+
+
+def create_files(directory: pathlib.Path, count: int) -> list[str]:
+    directory.mkdir(parents=True, exist_ok=True)
+    paths: list[str] = []
+    for file_number in range(count):
+        file_path = directory / f"test{file_number}.txt"
+        file_path.write_text("test")
+        # Newest first on disk so oldest first queue order is not name order
+        os.utime(file_path, ns=(0, (count - file_number) * 1_000_000_000))
+        paths.append(str(file_path))
+    return paths
+
+
+def drain(file_queue: Queue) -> list[str]:
+    events: list[str] = []
+    while not file_queue.empty():
+        events.append(file_queue.get().src_path)
+    return events
+
+
+class TestCoreBacklog:
+    def test_backlog_with_none_queue(self, tmp_path) -> None:
+        with pytest.raises(BacklogScannerError):
+            _ = BacklogScanner(None, StubHandler(str(tmp_path)))  # type: ignore
+
+    def test_backlog_with_invalid_window(self, tmp_path) -> None:
+        with pytest.raises(BacklogScannerError):
+            _ = BacklogScanner(Queue(), StubHandler(str(tmp_path)), window=0)
+
+    def test_backlog_empty_source(self, tmp_path) -> None:
+        file_queue: Queue = Queue()
+        assert BacklogScanner(file_queue, StubHandler(str(tmp_path))).scan() == 0
+        assert file_queue.empty()
+
+    def test_backlog_queues_files_oldest_first(self, tmp_path) -> None:
+        paths = create_files(tmp_path, 50)
+        file_queue: Queue = Queue()
+        assert BacklogScanner(file_queue, StubHandler(str(tmp_path))).scan() == 50
+        assert drain(file_queue) == list(reversed(paths))
+
+    def test_backlog_small_window_and_batch_queue_every_file(self, tmp_path) -> None:
+        paths = create_files(tmp_path, 100)
+        file_queue: Queue = Queue()
+        scanner = BacklogScanner(
+            file_queue, StubHandler(str(tmp_path)), window=8, batch_size=3
+        )
+        assert scanner.scan() == 100
+        assert sorted(drain(file_queue)) == sorted(paths)
+
+    def test_backlog_not_recursive_skips_subdirectories(self, tmp_path) -> None:
+        create_files(tmp_path, 5)
+        create_files(tmp_path / "subdir", 5)
+        file_queue: Queue = Queue()
+        assert BacklogScanner(file_queue, StubHandler(str(tmp_path))).scan() == 5
+
+    def test_backlog_recursive_includes_subdirectories(self, tmp_path) -> None:
+        create_files(tmp_path, 5)
+        create_files(tmp_path / "subdir" / "subsubdir", 5)
+        file_queue: Queue = Queue()
+        scanner = BacklogScanner(file_queue, StubHandler(str(tmp_path), True))
+        assert scanner.scan() == 10
+
+    def test_backlog_skips_files_already_pending(self, tmp_path) -> None:
+        paths = create_files(tmp_path, 10)
+        coalescer = EventCoalescer()
+        coalescer.offer(paths[3])
+        file_queue: Queue = Queue()
+        scanner = BacklogScanner(file_queue, StubHandler(str(tmp_path)), coalescer)
+        assert scanner.scan() == 9
+        assert paths[3] not in drain(file_queue)
+        assert coalescer.duplicates == 1
+
+    def test_backlog_skips_files_already_journaled(self, tmp_path) -> None:
+        paths = create_files(tmp_path / "source", 10)
+        journal = JournalQueue(str(tmp_path / "journal.db"))
+        journal.put(FileEvent(paths[3]))
+        scanner = BacklogScanner(
+            journal, StubHandler(str(tmp_path / "source")), journal=journal
+        )
+        assert scanner.scan() == 9
+        assert drain(journal).count(paths[3]) == 1
+        journal.close()
+
+    def test_backlog_only_queues_files_changed_since(self, tmp_path) -> None:
+        create_files(tmp_path, 5)
+        since = time.time_ns()
+        time.sleep(0.05)
+        (tmp_path / "new.txt").write_text("test")
+        file_queue: Queue = Queue()
+        scanner = BacklogScanner(
+            file_queue, StubHandler(str(tmp_path)), changed_since=since
+        )
+        assert scanner.scan() == 1
+        assert drain(file_queue) == [str(tmp_path / "new.txt")]
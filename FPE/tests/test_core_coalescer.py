@@ -0,0 +1,73 @@
+"""TEST"""
+# pylint: disable=missing-function-docstring, missing-class-docstring, unused-argument
+
+from queue import Queue
+import time
+
+from tests.common import StubHandler
+from core.coalescer import EventCoalescer
+from core.observers.watchdog_observer import WatchdogObserver
+
+
+class Event:
+    def __init__(self, src_path: str, is_directory: bool = False) -> None:
+        self.src_path = src_path
+        self.is_directory = is_directory
+
+
+class TestCoreCoalescer:
+    def test_coalescer_first_offer_is_queued(self) -> None:
+        coalescer = EventCoalescer()
+        assert coalescer.offer("/source/test.txt") is True
+        assert coalescer.pending == 1
+        assert coalescer.duplicates == 0
+
+    def test_coalescer_repeat_offer_is_dropped_and_counted(self) -> None:
+        coalescer = EventCoalescer()
+        coalescer.offer("/source/test.txt")
+        assert coalescer.offer("/source/test.txt") is False
+        assert coalescer.offer("/source/test.txt") is False
+        assert coalescer.pending == 1
+        assert coalescer.duplicates == 2
+
+    def test_coalescer_settle_releases_path(self) -> None:
+        coalescer = EventCoalescer()
+        coalescer.offer("/source/test.txt")
+        coalescer.settle("/source/test.txt")
+        assert coalescer.pending == 0
+        assert coalescer.offer("/source/test.txt") is True
+
+    def test_coalescer_settle_waits_for_debounce_window(self) -> None:
+        coalescer = EventCoalescer(0.2)
+        coalescer.offer("/source/test.txt")
+        start_time = time.monotonic()
+        coalescer.settle("/source/test.txt")
+        assert time.monotonic() - start_time >= 0.19
+
+    def test_coalescer_refresh_restarts_debounce_window(self) -> None:
+        coalescer = EventCoalescer(0.2)
+        coalescer.offer("/source/test.txt")
+        time.sleep(0.1)
+        coalescer.refresh("/source/test.txt")
+        start_time = time.monotonic()
+        coalescer.settle("/source/test.txt")
+        assert time.monotonic() - start_time >= 0.19
+        assert coalescer.duplicates == 1
+
+    def test_coalescer_refresh_of_non_pending_path_ignored(self) -> None:
+        coalescer = EventCoalescer()
+        coalescer.refresh("/source/test.txt")
+        assert coalescer.pending == 0
+        assert coalescer.duplicates == 0
+
+    def test_coalescer_observer_queues_one_entry_per_path(self, tmp_path) -> None:
+        queue: Queue = Queue()
+        coalescer = EventCoalescer()
+        observer = WatchdogObserver(queue, StubHandler(str(tmp_path)), coalescer)
+        observer.on_created(Event(str(tmp_path / "test.txt")))
+        observer.on_modified(Event(str(tmp_path / "test.txt")))
+        observer.on_created(Event(str(tmp_path / "test.txt")))
+        observer.on_created(Event(str(tmp_path / "dir"), True))
+        assert queue.qsize() == 1
+        assert queue.get().src_path == str(tmp_path / "test.txt")
+        assert coalescer.duplicates == 2
@@ -0,0 +1,153 @@
+"""TEST"""
+# pylint: disable=missing-function-docstring, missing-class-docstring, unused-argument
+
+import os
+import time
+import threading
+import pytest
+
+from core.handler import Handler
+from core.inotify import Inotify, InotifyError, available
+from core.completion import inotify as inotify_completion
+from core.completion.quiescence import QuiescenceCompletion
+from core.completion.inotify import InotifyCompletion
+from core.completion.marker import MarkerCompletion
+
+
+def age_file(source_path, seconds: float = 10.0) -> None:
+    old_time = time.time() - seconds
+    os.utime(source_path, (old_time, old_time))
+
+
+def write_slowly(source_path, chunks: int, delay: float) -> None:
+    with open(source_path, "ab") as source_file:
+        for _ in range(chunks):
+            time.sleep(delay)
+            source_file.write(b"x" * 1024)
+            source_file.flush()
+
+
+class TestCoreCompletion:
+    def test_quiescence_old_file_completes_immediately(self, tmp_path) -> None:
+        source_path = tmp_path / "test.txt"
+        source_path.write_bytes(b"x" * 1024)
+        age_file(source_path)
+        start_time = time.monotonic()
+        assert QuiescenceCompletion(1.0).wait(source_path) == source_path
+        assert time.monotonic() - start_time < 0.5
+
+    def test_quiescence_waits_for_growing_file(self, tmp_path) -> None:
+        source_path = tmp_path / "test.txt"
+        source_path.touch()
+        writer = threading.Thread(target=write_slowly, args=(source_path, 5, 0.05))
+        writer.start()
+        assert QuiescenceCompletion(0.2).wait(source_path) == source_path
+        writer.join()
+        assert source_path.stat().st_size == 5 * 1024
+
+    def test_quiescence_waits_only_rest_of_settle_period(self, tmp_path) -> None:
+        source_path = tmp_path / "test.txt"
+        source_path.write_bytes(b"x" * 1024)
+        age_file(source_path, 0.4)
+        started = time.perf_counter()
+        assert QuiescenceCompletion(0.5).wait(source_path) == source_path
+        assert time.perf_counter() - started < 0.3
+
+    def test_quiescence_backs_off_for_slow_writer(self, tmp_path, monkeypatch) -> None:
+        source_path = tmp_path / "test.txt"
+        source_path.touch()
+        stat_calls: list[float] = []
+        path_stat = type(source_path).stat
+
+        def counted_stat(path, *args, **kwargs):
+            if path == source_path:
+                stat_calls.append(time.monotonic())
+            return path_stat(path, *args, **kwargs)
+
+        monkeypatch.setattr(type(source_path), "stat", counted_stat)
+        writer = threading.Thread(target=write_slowly, args=(source_path, 150, 0.01))
+        writer.start()
+        assert QuiescenceCompletion(0.05).wait(source_path) == source_path
+        writer.join()
+        # Settle, then backed off polls of 0.05, 0.1, 0.2, 0.4, 0.8 ... seconds
+        assert len(stat_calls) < 12
+        assert max(
+            later - earlier for earlier, later in zip(stat_calls, stat_calls[1:])
+        ) >= 0.4
+
+    def test_quiescence_missing_file(self, tmp_path) -> None:
+        assert QuiescenceCompletion().wait(tmp_path / "test.txt") is None
+
+    def test_marker_file_then_marker(self, tmp_path) -> None:
+        completion = MarkerCompletion()
+        source_path = tmp_path / "test.csv"
+        source_path.touch()
+        assert completion.wait(source_path) is None
+        (tmp_path / "test.csv.done").touch()
+        assert completion.wait(tmp_path / "test.csv.done") == source_path
+        assert not (tmp_path / "test.csv.done").exists()
+
+    def test_marker_marker_then_file(self, tmp_path) -> None:
+        completion = MarkerCompletion(".ready")
+        source_path = tmp_path / "test.csv"
+        (tmp_path / "test.csv.ready").touch()
+        assert completion.wait(tmp_path / "test.csv.ready") is None
+        source_path.touch()
+        assert completion.wait(source_path) == source_path
+        assert completion.wait(tmp_path / "test.csv.ready") is None
+
+    @pytest.mark.skipif(not available(), reason="inotify not available")
+    def test_inotify_waits_for_close_write(self, tmp_path) -> None:
+        source_path = tmp_path / "test.txt"
+        source_path.touch()
+        writer = threading.Thread(target=write_slowly, args=(source_path, 5, 0.05))
+        writer.start()
+        assert InotifyCompletion(1.0).wait(source_path) == source_path
+        writer.join()
+        assert source_path.stat().st_size == 5 * 1024
+
+    @pytest.mark.skipif(not available(), reason="inotify not available")
+    def test_inotify_already_closed_file(self, tmp_path) -> None:
+        source_path = tmp_path / "test.txt"
+        source_path.write_bytes(b"x" * 1024)
+        assert InotifyCompletion(0.1).wait(source_path) == source_path
+
+    @pytest.mark.skipif(not available(), reason="inotify not available")
+    def test_inotify_falls_back_to_quiescence(self, tmp_path, monkeypatch) -> None:
+        completion = InotifyCompletion(0.1)
+
+        def no_inotify() -> Inotify:
+            raise InotifyError("Too many open files")
+
+        monkeypatch.setattr(inotify_completion, "Inotify", no_inotify)
+        source_path = tmp_path / "test.txt"
+        source_path.write_bytes(b"x" * 1024)
+        assert completion.wait(source_path) == source_path
+        assert completion.wait(tmp_path / "missing.txt") is None
+
+    @pytest.mark.skipif(not available(), reason="inotify not available")
+    def test_inotify_close(self) -> None:
+        inotify = Inotify()
+        assert inotify.wait(0) is False
+        inotify.close()
+        assert inotify.fileno() == -1
+        inotify.close()
+
+    def test_handler_wait_for_copy_completion_makes_file_writable(
+        self, tmp_path
+    ) -> None:
+        source_path = tmp_path / "test.txt"
+        source_path.write_bytes(b"x" * 1024)
+        source_path.chmod(0o444)
+        age_file(source_path)
+        assert Handler.wait_for_copy_completion(source_path) == source_path
+        assert source_path.stat().st_mode & 0o664 == 0o664
+
+    def test_handler_wait_for_copy_completion_of_complete_file(self, tmp_path) -> None:
+        source_path = tmp_path / "test.txt"
+        source_path.write_bytes(b"x" * 1024)
+        # A marker never arrives; a file known to be complete is not waited on
+        assert (
+            Handler.wait_for_copy_completion(source_path, MarkerCompletion(), True)
+            == source_path
+        )
@@ -3,11 +3,22 @@
 
 import pathlib
 from queue import Queue
+import threading
 import time
 import pytest
 
-from core.consumer import Consumer, ConsumerError
+from tests.common import create_copyfile_config, remove_source_destination
+from core.constants import CONFIG_SOURCE, CONFIG_DESTINATION
+from core.config import ConfigDict
+from core.consumer import (
+    Consumer,
+    ConsumerPool,
+    ConsumerError,
+    CONSUMER_BATCH_SIZE,
+    CONSUMER_WORKER_QUEUE_SIZE,
+)
 from core.interface.ihandler import IHandler
+from builtin.copyfile_handler import CopyFileHandler
 
 
 failure_called: bool = False
@@ -21,6 +32,7 @@ def failure_callback(watcher_name: str) -> None:
 class Event:
     def __init__(self, src_path: str) -> None:
         self.src_path = src_path
+        self.complete = False
 
 
 class TestConsumerHandler(IHandler):
@@ -37,6 +49,48 @@ class TestConsumerHandler(IHandler):
         return ""
 
 
+class OrderingHandler(IHandler):
+    def __init__(self) -> None:
+        self.exit_on_failure = False
+        self.delete_source = False
+        self.processed: dict[str, list[str]] = {}
+        self.lock = threading.Lock()
+
+    def process(self, source_path: pathlib.Path) -> bool:
+        time.sleep(0.001)
+        with self.lock:
+            self.processed.setdefault(source_path.parent.name, []).append(
+                source_path.name
+            )
+        return True
+
+    def status(self) -> str:
+        return ""
+
+
+class BlockingHandler(IHandler):
+    def __init__(self) -> None:
+        self.exit_on_failure = False
+        self.delete_source = False
+        self.release = threading.Event()
+
+    def process(self, source_path: pathlib.Path) -> bool:
+        self.release.wait(10)
+        return True
+
+    def status(self) -> str:
+        return ""
+
+
+@pytest.fixture(name="generate_copyfile_config")
+def fixture_generate_copyfile_config() -> ConfigDict:
+    copyfile_config: ConfigDict = create_copyfile_config()
+
+    yield copyfile_config
+
+    remove_source_destination(copyfile_config)
+
+
 class TestCoreConsumer:
     def test_consumer_with_valid_parameters(self) -> None:
         queue: Queue = Queue()
@@ -126,3 +180,119 @@ class TestCoreConsumer:
             time.sleep(0.1)
 
         assert failure_called
+
+    def test_consumer_stop_wakes_blocked_consumer(self) -> None:
+        queue: Queue = Queue()
+        ihandler: IHandler = TestConsumerHandler()
+        consumer: Consumer = Consumer(queue, ihandler, failure_callback)
+
+        consumer.start()
+        time.sleep(0.1)
+        start_time = time.perf_counter()
+        consumer.stop()
+
+        assert consumer.is_running is False
+        assert time.perf_counter() - start_time < 1.0
+
+    def test_consumer_copyfile_throughput(
+        self, generate_copyfile_config: ConfigDict
+    ) -> None:
+        file_count: int = 2000
+        queue: Queue = Queue()
+        generate_copyfile_config["deletesource"] = False
+        ihandler: IHandler = CopyFileHandler(generate_copyfile_config)
+        consumer: Consumer = Consumer(queue, ihandler, failure_callback)
+        source_path = pathlib.Path(generate_copyfile_config[CONFIG_SOURCE])
+        for file_number in range(file_count):
+            (source_path / f"test{file_number}.txt").write_bytes(b"x" * 1024)
+
+        consumer.start()
+        start_time = time.perf_counter()
+        for file_number in range(file_count):
+            queue.put(Event(str(source_path / f"test{file_number}.txt")))
+        while ihandler.files_processed < file_count:
+            time.sleep(0.01)
+        files_per_second = file_count / (time.perf_counter() - start_time)
+        consumer.stop()
+
+        assert (
+            pathlib.Path(generate_copyfile_config[CONFIG_DESTINATION])
+            / f"test{file_count - 1}.txt"
+        ).exists()
+        assert files_per_second > 1000
+
+    def test_consumer_pool_with_invalid_worker_count(self) -> None:
+        with pytest.raises(ConsumerError):
+            _: ConsumerPool = ConsumerPool(
+                Queue(), TestConsumerHandler(), failure_callback, 0
+            )
+
+    def test_consumer_pool_start_then_stop(self) -> None:
+        pool: ConsumerPool = ConsumerPool(
+            Queue(), TestConsumerHandler(), failure_callback, 4
+        )
+        pool.start()
+        assert pool.is_running is True
+        assert pool.workers == 4
+        pool.stop()
+        assert pool.is_running is False
+
+    def test_consumer_pool_files_processed_exact(self, tmp_path) -> None:
+        file_count: int = 1000
+        queue: Queue = Queue()
+        ihandler = OrderingHandler()
+        pool: ConsumerPool = ConsumerPool(queue, ihandler, failure_callback, 8)
+        for file_number in range(file_count):
+            (tmp_path / f"test{file_number}.txt").touch()
+        pool.start()
+        for file_number in range(file_count):
+            queue.put(Event(str(tmp_path / f"test{file_number}.txt")))
+        while ihandler.files_processed < file_count:
+            time.sleep(0.01)
+        pool.stop()
+        assert ihandler.files_processed == file_count
+
+    def test_consumer_pool_ordered_per_directory(self, tmp_path) -> None:
+        directories: list[str] = [f"dir{number}" for number in range(4)]
+        file_count: int = 50
+        queue: Queue = Queue()
+        ihandler = OrderingHandler()
+        pool: ConsumerPool = ConsumerPool(queue, ihandler, failure_callback, 4, True)
+        for directory in directories:
+            (tmp_path / directory).mkdir()
+            for file_number in range(file_count):
+                (tmp_path / directory / f"{file_number:04}.txt").touch()
+        pool.start()
+        for file_number in range(file_count):
+            for directory in directories:
+                queue.put(Event(str(tmp_path / directory / f"{file_number:04}.txt")))
+        while ihandler.files_processed < file_count * len(directories):
+            time.sleep(0.01)
+        pool.stop()
+        for directory in directories:
+            assert ihandler.processed[directory] == sorted(
+                ihandler.processed[directory]
+            )
+            assert len(ihandler.processed[directory]) == file_count
+
+    def test_consumer_pool_ordered_worker_queues_bounded(self, tmp_path) -> None:
+        file_count: int = CONSUMER_WORKER_QUEUE_SIZE * 3
+        queue: Queue = Queue()
+        ihandler = BlockingHandler()
+        pool: ConsumerPool = ConsumerPool(queue, ihandler, failure_callback, 2, True)
+        for file_number in range(file_count):
+            (tmp_path / f"test{file_number}.txt").touch()
+        pool.start()
+        for file_number in range(file_count):
+            queue.put(Event(str(tmp_path / f"test{file_number}.txt")))
+        deadline = time.monotonic() + 5
+        while queue.qsize() > file_count - CONSUMER_WORKER_QUEUE_SIZE - 1:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        time.sleep(0.1)
+        # Worker holds at most a batch, its queue is full and the router waits with one more
+        held = CONSUMER_BATCH_SIZE + CONSUMER_WORKER_QUEUE_SIZE + 1
+        assert queue.qsize() >= file_count - held
+        ihandler.release.set()
+        pool.stop()
+        assert queue.empty()
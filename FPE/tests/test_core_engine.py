@@ -5,7 +5,12 @@ import pytest
 
 from tests.common import json_file_source
 
-from core.constants import CONFIG_WATCHERS, CONFIG_PLUGINS, CONFIG_NAME
+from core.constants import (
+    CONFIG_WATCHERS,
+    CONFIG_PLUGINS,
+    CONFIG_NAME,
+    CONFIG_SHAREDWORKERS,
+)
 from core.arguments import Arguments
 from core.config import Config
 from core.consumer import ConsumerError
@@ -128,3 +133,28 @@ class TestCoreEngine:
         engine.start_watcher(watcher_config[CONFIG_NAME])
         with pytest.raises(EngineError):
             engine.stop_watcher("Not There")
+
+    def test_core_engine_with_shared_workers(self) -> None:
+        engine_config = Config(Arguments([json_file_source("test_valid.json")])).config
+        engine_config[CONFIG_SHAREDWORKERS] = 2
+        engine: Engine = Engine(engine_config)
+        engine.set_failure_callback(failure_callback)
+        engine.startup()
+        assert engine.is_running
+        for watcher_name in engine.watchers_list:
+            assert engine.is_watcher_running(watcher_name)
+        engine.shutdown()
+        assert engine.is_running is False
+
+    def test_core_engine_metrics(self) -> None:
+        engine: Engine = create_engine("test_valid.json")
+        engine.set_failure_callback(failure_callback)
+        engine.startup()
+        metrics = engine.metrics()
+        engine.shutdown()
+        assert sorted(metrics.keys()) == sorted(
+            watcher_config[CONFIG_NAME]
+            for watcher_config in engine.running_config[CONFIG_WATCHERS]
+        )
+        for watcher_metrics in metrics.values():
+            assert watcher_metrics["files_processed"] == 0
@@ -0,0 +1,38 @@
+"""TEST"""
+# pylint: disable=missing-function-docstring, missing-class-docstring, unused-argument
+
+import logging
+
+from core.observers.ignore_filter import IgnoreFilter, IGNORE_PATTERNS
+
+
+class TestCoreIgnoreFilter:
+    def test_ignore_filter_default_ignores_nothing(self) -> None:
+        ignore = IgnoreFilter()
+        assert ignore.patterns == ()
+        assert ignore.ignored("/source/test.tmp") is False
+
+    def test_ignore_filter_common_patterns(self) -> None:
+        ignore = IgnoreFilter(IGNORE_PATTERNS)
+        for name in ("test.tmp", "test.part", ".test.txt.swp", "test.txt~"):
+            assert ignore.ignored(f"/source/{name}") is True
+        assert ignore.ignored("/source/test.txt") is False
+
+    def test_ignore_filter_matches_file_name_only(self) -> None:
+        assert IgnoreFilter(["*.tmp"]).ignored("/source.tmp/test.txt") is False
+
+    def test_ignore_filter_configured_patterns(self) -> None:
+        ignore = IgnoreFilter(["*.upload", "~*"])
+        assert ignore.ignored("/source/test.upload") is True
+        assert ignore.ignored("/source/~test.txt") is True
+        assert ignore.ignored("/source/test.tmp") is False
+
+    def test_ignore_filter_no_patterns(self) -> None:
+        assert IgnoreFilter([]).ignored("/source/test.tmp") is False
+
+    def test_ignore_filter_logs_ignored_file(self, caplog) -> None:
+        with caplog.at_level(logging.INFO):
+            IgnoreFilter(["*.tmp"]).ignored("/source/test.tmp")
+            IgnoreFilter(["*.tmp"]).ignored("/source/test.txt")
+        assert "Ignoring file /source/test.tmp." in caplog.messages
+        assert len(caplog.messages) == 1
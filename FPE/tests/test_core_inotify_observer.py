@@ -0,0 +1,332 @@
+"""TEST"""
+# pylint: disable=missing-function-docstring, missing-class-docstring, unused-argument
+
+import os
+import time
+import threading
+from queue import Queue, Empty
+import pytest
+
+from tests.common import StubHandler
+from core import inotify
+from core.observers import inotify_observer
+from core.observers.inotify_observer import (
+    InotifyDispatcher,
+    InotifyObserver,
+    InotifyObserverError,
+)
+
+pytestmark = pytest.mark.skipif(not inotify.available(), reason="inotify only on Linux")
+
+
+def next_path(file_queue: Queue) -> str:
+    return file_queue.get(timeout=5).src_path
+
+
+def wait_for_watches(dispatcher: InotifyDispatcher, count: int) -> None:
+    deadline = time.monotonic() + 5
+    while dispatcher.watches < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class BlockingQueue(Queue):
+    """Queue whose first put blocks (holding up the dispatch thread) until released."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.blocked = threading.Event()
+        self.release = threading.Event()
+
+    def put(self, item, block=True, timeout=None) -> None:
+        if not self.blocked.is_set():
+            self.blocked.set()
+            self.release.wait(10)
+        super().put(item, block, timeout)
+
+
+def inotify_threads() -> int:
+    return sum(1 for thread in threading.enumerate() if thread.name == "FPE inotify")
+
+
+class TestCoreInotifyObserver:
+    def test_inotify_observer_queues_closed_file(self, tmp_path) -> None:
+        file_queue: Queue = Queue()
+        observer = InotifyObserver(
+            file_queue, StubHandler(str(tmp_path)), dispatcher=InotifyDispatcher()
+        )
+        observer.start()
+        try:
+            (tmp_path / "test.txt").write_text("test")
+            assert next_path(file_queue) == str(tmp_path / "test.txt")
+            assert file_queue.empty()
+        finally:
+            observer.stop()
+
+    def test_inotify_observer_queues_file_renamed_into_place(self, tmp_path) -> None:
+        (tmp_path / "source").mkdir()
+        (tmp_path / "test.tmp").write_text("test")
+        file_queue: Queue = Queue()
+        observer = InotifyObserver(
+            file_queue,
+            StubHandler(str(tmp_path / "source")),
+            dispatcher=InotifyDispatcher(),
+        )
+        observer.start()
+        try:
+            os.rename(tmp_path / "test.tmp", tmp_path / "source" / "test.txt")
+            event = file_queue.get(timeout=5)
+            assert event.src_path == str(tmp_path / "source" / "test.txt")
+            assert event.complete is True
+        finally:
+            observer.stop()
+
+    def test_inotify_observers_share_one_thread(self, tmp_path) -> None:
+        dispatcher = InotifyDispatcher()
+        threads = inotify_threads()
+        queues: list[Queue] = [Queue(), Queue()]
+        observers: list[InotifyObserver] = []
+        for number, file_queue in enumerate(queues):
+            (tmp_path / str(number)).mkdir()
+            observers.append(
+                InotifyObserver(
+                    file_queue,
+                    StubHandler(str(tmp_path / str(number))),
+                    dispatcher=dispatcher,
+                )
+            )
+            observers[-1].start()
+        try:
+            assert inotify_threads() == threads + 1
+            assert dispatcher.watches == 2
+            for number in range(2):
+                (tmp_path / str(number) / "test.txt").write_text("test")
+            for number, file_queue in enumerate(queues):
+                assert next_path(file_queue) == str(tmp_path / str(number) / "test.txt")
+        finally:
+            for observer in observers:
+                observer.stop()
+        assert dispatcher.watches == 0
+        assert dispatcher.is_running is False
+        assert inotify_threads() == threads
+
+    def test_inotify_observer_watches_new_subdirectory(self, tmp_path) -> None:
+        (tmp_path / "existing").mkdir()
+        dispatcher = InotifyDispatcher()
+        file_queue: Queue = Queue()
+        observer = InotifyObserver(
+            file_queue, StubHandler(str(tmp_path), True), dispatcher=dispatcher
+        )
+        observer.start()
+        try:
+            assert dispatcher.watches == 2
+            (tmp_path / "new").mkdir()
+            deadline = time.monotonic() + 5
+            while dispatcher.watches < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            (tmp_path / "new" / "test.txt").write_text("test")
+            assert next_path(file_queue) == str(tmp_path / "new" / "test.txt")
+        finally:
+            observer.stop()
+
+    def test_inotify_observer_queues_files_in_directory_moved_in(self, tmp_path) -> None:
+        (tmp_path / "source").mkdir()
+        (tmp_path / "incoming" / "deeper").mkdir(parents=True)
+        (tmp_path / "incoming" / "test.txt").write_text("test")
+        (tmp_path / "incoming" / "deeper" / "test.txt").write_text("test")
+        file_queue: Queue = Queue()
+        observer = InotifyObserver(
+            file_queue,
+            StubHandler(str(tmp_path / "source"), True),
+            dispatcher=InotifyDispatcher(),
+        )
+        observer.start()
+        try:
+            os.rename(tmp_path / "incoming", tmp_path / "source" / "incoming")
+            assert sorted([next_path(file_queue), next_path(file_queue)]) == [
+                str(tmp_path / "source" / "incoming" / "deeper" / "test.txt"),
+                str(tmp_path / "source" / "incoming" / "test.txt"),
+            ]
+        finally:
+            observer.stop()
+
+    def test_inotify_observer_forgets_listed_files(self, tmp_path) -> None:
+        (tmp_path / "source").mkdir()
+        (tmp_path / "incoming").mkdir()
+        for file_number in range(10):
+            (tmp_path / "incoming" / f"test{file_number}.txt").write_text("test")
+        dispatcher = InotifyDispatcher()
+        file_queue: Queue = Queue()
+        observer = InotifyObserver(
+            file_queue,
+            StubHandler(str(tmp_path / "source"), True),
+            dispatcher=dispatcher,
+        )
+        observer.start()
+        try:
+            os.rename(tmp_path / "incoming", tmp_path / "source" / "incoming")
+            for _ in range(10):
+                next_path(file_queue)
+            deadline = time.monotonic() + 5
+            while dispatcher.listed > 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert dispatcher.listed == 0
+        finally:
+            observer.stop()
+
+    def test_inotify_observer_existing_files_not_queued(self, tmp_path) -> None:
+        (tmp_path / "existing").mkdir()
+        (tmp_path / "existing" / "test.txt").write_text("test")
+        file_queue: Queue = Queue()
+        observer = InotifyObserver(
+            file_queue, StubHandler(str(tmp_path), True), dispatcher=InotifyDispatcher()
+        )
+        observer.start()
+        try:
+            with pytest.raises(Empty):
+                file_queue.get(timeout=0.2)
+        finally:
+            observer.stop()
+
+    def test_inotify_observer_polls_sub_trees_past_watch_limit(self, tmp_path) -> None:
+        for name in ("a", "b", "c"):
+            (tmp_path / name).mkdir()
+        dispatcher = InotifyDispatcher(watch_limit=2)
+        file_queue: Queue = Queue()
+        observer = InotifyObserver(
+            file_queue,
+            StubHandler(str(tmp_path), True),
+            dispatcher=dispatcher,
+            poll_interval=0.05,
+        )
+        observer.start()
+        try:
+            assert dispatcher.watches == 2
+            assert len(observer.polled) == 2
+            for name in ("a", "b", "c"):
+                (tmp_path / name / "test.txt").write_text("test")
+            assert sorted(next_path(file_queue) for _ in range(3)) == [
+                str(tmp_path / name / "test.txt") for name in ("a", "b", "c")
+            ]
+        finally:
+            observer.stop()
+        assert observer.polled == []
+
+    def test_inotify_observer_survives_directories_removed_at_once(
+        self, tmp_path
+    ) -> None:
+        dispatcher = InotifyDispatcher()
+        file_queue: Queue = Queue()
+        observer = InotifyObserver(
+            file_queue, StubHandler(str(tmp_path), True), dispatcher=dispatcher
+        )
+        observer.start()
+        try:
+            for _ in range(50):
+                (tmp_path / "transient").mkdir()
+                (tmp_path / "transient").rmdir()
+            (tmp_path / "test.txt").write_text("test")
+            assert next_path(file_queue) == str(tmp_path / "test.txt")
+            assert inotify_threads() >= 1
+        finally:
+            observer.stop()
+
+    def test_inotify_observer_follows_renamed_directory(self, tmp_path) -> None:
+        dispatcher = InotifyDispatcher()
+        file_queue: Queue = Queue()
+        observer = InotifyObserver(
+            file_queue, StubHandler(str(tmp_path), True), dispatcher=dispatcher
+        )
+        observer.start()
+        try:
+            (tmp_path / "a" / "deeper").mkdir(parents=True)
+            wait_for_watches(dispatcher, 3)
+            os.rename(tmp_path / "a", tmp_path / "b")
+            time.sleep(0.1)
+            (tmp_path / "b" / "test.txt").write_text("test")
+            assert next_path(file_queue) == str(tmp_path / "b" / "test.txt")
+            (tmp_path / "b" / "deeper" / "test.txt").write_text("test")
+            assert next_path(file_queue) == str(tmp_path / "b" / "deeper" / "test.txt")
+            assert dispatcher.watches == 3
+        finally:
+            observer.stop()
+
+    def test_inotify_observer_forgets_directory_moved_out(self, tmp_path) -> None:
+        (tmp_path / "source" / "a" / "deeper").mkdir(parents=True)
+        dispatcher = InotifyDispatcher()
+        file_queue: Queue = Queue()
+        observer = InotifyObserver(
+            file_queue,
+            StubHandler(str(tmp_path / "source"), True),
+            dispatcher=dispatcher,
+        )
+        observer.start()
+        try:
+            assert dispatcher.watches == 3
+            os.rename(tmp_path / "source" / "a", tmp_path / "a")
+            deadline = time.monotonic() + 5
+            while dispatcher.watches > 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert dispatcher.watches == 1
+            (tmp_path / "a" / "test.txt").write_text("test")
+            with pytest.raises(Empty):
+                file_queue.get(timeout=0.2)
+        finally:
+            observer.stop()
+
+    def test_inotify_observer_rescans_source_on_overflow(
+        self, tmp_path, monkeypatch
+    ) -> None:
+        monkeypatch.setattr(inotify_observer, "INOTIFY_RESCAN_MARGIN", 0.0)
+        (tmp_path / "old.txt").write_text("test")
+        time.sleep(0.05)
+        file_queue = BlockingQueue()
+        observer = InotifyObserver(
+            file_queue, StubHandler(str(tmp_path), True), dispatcher=InotifyDispatcher()
+        )
+        observer.start()
+        try:
+            (tmp_path / "first.txt").write_text("test")
+            assert file_queue.blocked.wait(5)
+            # Two events a file overflows the default 16384 event queue
+            files = 10000
+            for file_number in range(files):
+                (tmp_path / f"{file_number}.txt").write_text("test")
+            file_queue.release.set()
+            queued = set()
+            while len(queued) < files + 1:
+                queued.add(next_path(file_queue))
+            assert str(tmp_path / f"{files - 1}.txt") in queued
+            # Files unchanged since events were last read in full are not queued again
+            with pytest.raises(Empty):
+                while True:
+                    assert file_queue.get(timeout=0.5).src_path != str(
+                        tmp_path / "old.txt"
+                    )
+        finally:
+            observer.stop()
+
+    def test_inotify_observer_not_recursive(self, tmp_path) -> None:
+        (tmp_path / "existing").mkdir()
+        file_queue: Queue = Queue()
+        observer = InotifyObserver(
+            file_queue, StubHandler(str(tmp_path)), dispatcher=InotifyDispatcher()
+        )
+        observer.start()
+        try:
+            (tmp_path / "existing" / "test.txt").write_text("test")
+            with pytest.raises(Empty):
+                file_queue.get(timeout=0.2)
+        finally:
+            observer.stop()
+
+    def test_inotify_observer_missing_source(self, tmp_path) -> None:
+        dispatcher = InotifyDispatcher()
+        observer = InotifyObserver(
+            Queue(), StubHandler(str(tmp_path / "missing")), dispatcher=dispatcher
+        )
+        with pytest.raises(InotifyObserverError):
+            observer.start()
+        assert dispatcher.is_running is False
+
+    def test_inotify_dispatcher_shared(self) -> None:
+        assert InotifyDispatcher.shared() is InotifyDispatcher.shared()
@@ -0,0 +1,112 @@
+"""TEST"""
+# pylint: disable=missing-function-docstring, missing-class-docstring, unused-argument
+
+from queue import Empty
+import pytest
+
+from core.event import FileEvent
+from core.journal import JournalQueue, JournalError
+
+
+class TestCoreJournal:
+    def test_journal_with_invalid_window(self, tmp_path) -> None:
+        with pytest.raises(JournalError):
+            _ = JournalQueue(str(tmp_path / "journal.db"), 0)
+
+    def test_journal_put_then_get_in_order(self, tmp_path) -> None:
+        journal = JournalQueue(str(tmp_path / "journal.db"))
+        for file_number in range(10):
+            journal.put(FileEvent(f"/source/test{file_number}.txt"))
+        assert journal.qsize() == 10
+        for file_number in range(10):
+            assert journal.get().src_path == f"/source/test{file_number}.txt"
+        assert journal.empty()
+        journal.close()
+
+    def test_journal_sentinel_is_not_journaled(self, tmp_path) -> None:
+        journal = JournalQueue(str(tmp_path / "journal.db"))
+        journal.put(None)
+        assert journal.get() is None
+        assert journal.journaled == 0
+        journal.close()
+
+    def test_journal_unacknowledged_entries_replayed_on_reopen(self, tmp_path) -> None:
+        journal = JournalQueue(str(tmp_path / "journal.db"))
+        for file_number in range(4):
+            journal.put(FileEvent(f"/source/test{file_number}.txt"))
+        journal.acknowledge(journal.get())
+        _ = journal.get()
+        journal.close()
+        journal = JournalQueue(str(tmp_path / "journal.db"))
+        assert journal.qsize() == 3
+        assert [journal.get().src_path for _ in range(3)] == [
+            "/source/test1.txt",
+            "/source/test2.txt",
+            "/source/test3.txt",
+        ]
+        journal.close()
+
+    def test_journal_replay_requeues_unacknowledged_entries(self, tmp_path) -> None:
+        journal = JournalQueue(str(tmp_path / "journal.db"))
+        for file_number in range(4):
+            journal.put(FileEvent(f"/source/test{file_number}.txt"))
+        journal.acknowledge(journal.get())
+        while not journal.empty():
+            _ = journal.get()
+        assert journal.replay() == 3
+        assert journal.qsize() == 3
+        assert [journal.get().src_path for _ in range(3)] == [
+            f"/source/test{file_number}.txt" for file_number in range(1, 4)
+        ]
+        journal.close()
+
+    def test_journal_contains_unacknowledged_entries(self, tmp_path) -> None:
+        journal = JournalQueue(str(tmp_path / "journal.db"), sync_batch=2)
+        journal.put(FileEvent("/source/test1.txt"))
+        assert journal.contains("/source/test1.txt") is True
+        journal.put(FileEvent("/source/test2.txt"))
+        journal.sync()
+        assert journal.contains("/source/test2.txt") is True
+        journal.acknowledge(journal.get())
+        journal.sync()
+        assert journal.contains("/source/test1.txt") is False
+        assert journal.contains("/source/test3.txt") is False
+        journal.close()
+
+    def test_journal_replay_reopens_closed_journal(self, tmp_path) -> None:
+        journal = JournalQueue(str(tmp_path / "journal.db"))
+        journal.put(FileEvent("/source/test1.txt"))
+        journal.close()
+        assert journal.closed is True
+        journal.close()
+        journal.replay()
+        assert journal.closed is False
+        assert journal.get().src_path == "/source/test1.txt"
+        journal.close()
+
+    def test_journal_bounded_window_pages_entries_in(self, tmp_path) -> None:
+        journal = JournalQueue(str(tmp_path / "journal.db"), 10, 7)
+        for file_number in range(100):
+            journal.put(FileEvent(f"/source/test{file_number}.txt"))
+        assert journal.qsize() == 100
+        for file_number in range(100):
+            event = journal.get()
+            assert event.src_path == f"/source/test{file_number}.txt"
+            journal.acknowledge(event)
+        with pytest.raises(Empty):
+            journal.get_nowait()
+        journal.sync()
+        assert journal.journaled == 0
+        journal.close()
+
+    def test_journal_new_entries_after_reopen_keep_order(self, tmp_path) -> None:
+        journal = JournalQueue(str(tmp_path / "journal.db"))
+        journal.put(FileEvent("/source/test0.txt"))
+        journal.close()
+        journal = JournalQueue(str(tmp_path / "journal.db"))
+        journal.put(FileEvent("/source/test1.txt"))
+        first, second = journal.get(), journal.get()
+        assert first.src_path == "/source/test0.txt"
+        assert second.src_path == "/source/test1.txt"
+        assert second.sequence > first.sequence
+        journal.close()
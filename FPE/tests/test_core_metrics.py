@@ -0,0 +1,101 @@
+"""TEST"""
+# pylint: disable=missing-function-docstring, missing-class-docstring, unused-argument
+
+import time
+import urllib.request
+import pytest
+
+from core.metrics import (
+    Histogram,
+    WatcherMetrics,
+    MetricsExporter,
+    MetricsError,
+    prometheus_text,
+)
+
+
+class TestCoreMetrics:
+    def test_histogram_buckets_are_cumulative(self) -> None:
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value)
+        snapshot = histogram.snapshot()
+        assert snapshot["buckets"] == [(0.1, 1), (1.0, 3), (float("inf"), 4)]
+        assert snapshot["count"] == 4
+        assert snapshot["sum"] == pytest.approx(6.05)
+
+    def test_watcher_metrics_initial_snapshot(self) -> None:
+        snapshot = WatcherMetrics().snapshot()
+        assert snapshot["files_processed"] == 0
+        assert snapshot["bytes_processed"] == 0
+        assert snapshot["files_per_second"] == 0
+        assert snapshot["queue_depth"] == 0
+        assert snapshot["duplicates_dropped"] == 0
+        assert snapshot["processing_seconds"]["count"] == 0
+
+    def test_watcher_metrics_record_processed(self) -> None:
+        metrics = WatcherMetrics(lambda: 7)
+        for _ in range(20):
+            metrics.record_processed(0.002, 100)
+        snapshot = metrics.snapshot()
+        assert snapshot["files_processed"] == 20
+        assert snapshot["bytes_processed"] == 2000
+        assert snapshot["files_per_second"] == 2.0
+        assert snapshot["queue_depth"] == 7
+        assert snapshot["processing_seconds"]["count"] == 20
+
+    def test_watcher_metrics_record_wait(self) -> None:
+        metrics = WatcherMetrics()
+        now = time.monotonic()
+        metrics.record_wait(now - 0.5, now)
+        metrics.record_wait(0.0, now)
+        snapshot = metrics.snapshot()
+        assert snapshot["queue_wait_seconds"]["count"] == 1
+        assert snapshot["queue_wait_seconds"]["sum"] == pytest.approx(0.5)
+
+    def test_prometheus_text(self) -> None:
+        metrics = WatcherMetrics(lambda: 3)
+        metrics.record_processed(0.02, 10)
+        text = prometheus_text({"Test": metrics.snapshot()})
+        assert "# TYPE fpe_processing_seconds histogram" in text
+        assert 'fpe_processing_seconds_bucket{watcher="Test",le="0.05"} 1' in text
+        assert 'fpe_processing_seconds_bucket{watcher="Test",le="+Inf"} 1' in text
+        assert 'fpe_bytes_processed{watcher="Test"} 10' in text
+        assert 'fpe_queue_depth{watcher="Test"} 3' in text
+
+    def test_watcher_metrics_operations(self) -> None:
+        metrics = WatcherMetrics(operations_fn=lambda: {"copy_rename": 2})
+        snapshot = metrics.snapshot()
+        assert snapshot["operations"] == {"copy_rename": 2}
+        text = prometheus_text({"Test": snapshot})
+        assert 'fpe_operations_total{watcher="Test",operation="copy_rename"} 2' in text
+
+    def test_watcher_metrics_duplicates_dropped(self) -> None:
+        metrics = WatcherMetrics(duplicates_fn=lambda: 4)
+        snapshot = metrics.snapshot()
+        assert snapshot["duplicates_dropped"] == 4
+        text = prometheus_text({"Test": snapshot})
+        assert "# TYPE fpe_duplicates_dropped counter" in text
+        assert 'fpe_duplicates_dropped{watcher="Test"} 4' in text
+
+    def test_metrics_exporter_serves_metrics(self) -> None:
+        metrics = WatcherMetrics()
+        metrics.record_processed(0.02, 10)
+        exporter = MetricsExporter(lambda: {"Test": metrics.snapshot()}, 0)
+        exporter.start()
+        try:
+            with urllib.request.urlopen(
+                f"http://127.0.0.1:{exporter.port}/metrics", timeout=5
+            ) as response:
+                text = response.read().decode("utf-8")
+        finally:
+            exporter.stop()
+        assert 'fpe_files_processed{watcher="Test"} 1' in text
+
+    def test_metrics_exporter_port_in_use(self) -> None:
+        exporter = MetricsExporter(dict, 0)
+        try:
+            with pytest.raises(MetricsError):
+                _ = MetricsExporter(dict, exporter.port)
+        finally:
+            exporter.stop()
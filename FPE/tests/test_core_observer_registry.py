@@ -0,0 +1,117 @@
+"""TEST"""
+# pylint: disable=missing-function-docstring, missing-class-docstring, unused-argument
+
+import threading
+from queue import Queue
+import pytest
+
+from watchdog.observers.api import BaseObserver
+
+from tests.common import StubHandler
+from core.observers.observer_registry import ObserverRegistry, ObserverRegistryError
+from core.observers.watchdog_observer import WatchdogObserver, WatchdogObserverError
+
+
+def next_path(file_queue: Queue) -> str:
+    return file_queue.get(timeout=5).src_path
+
+
+def observer_threads() -> int:
+    return sum(1 for thread in threading.enumerate() if isinstance(thread, BaseObserver))
+
+
+class TestCoreObserverRegistry:
+    def test_registry_not_running_until_watch_added(self) -> None:
+        registry = ObserverRegistry()
+        assert registry.is_running is False
+        assert registry.watches == 0
+
+    def test_registry_routes_events_to_owning_observer(self, tmp_path) -> None:
+        registry = ObserverRegistry()
+        queues: list[Queue] = [Queue(), Queue()]
+        observers: list[WatchdogObserver] = []
+        for number, file_queue in enumerate(queues):
+            (tmp_path / str(number)).mkdir()
+            observers.append(
+                WatchdogObserver(
+                    file_queue,
+                    StubHandler(str(tmp_path / str(number))),
+                    registry=registry,
+                )
+            )
+            observers[-1].start()
+        try:
+            assert registry.watches == 2
+            (tmp_path / "1" / "test.txt").write_text("test")
+            assert next_path(queues[1]) == str(tmp_path / "1" / "test.txt")
+            assert queues[0].empty()
+        finally:
+            for observer in observers:
+                observer.stop()
+            assert registry.watches == 0
+            registry.shutdown()
+
+    def test_registry_add_and_remove_while_running(self, tmp_path) -> None:
+        registry = ObserverRegistry()
+        (tmp_path / "first").mkdir()
+        (tmp_path / "second").mkdir()
+        first_queue: Queue = Queue()
+        first = WatchdogObserver(
+            first_queue, StubHandler(str(tmp_path / "first")), registry=registry
+        )
+        first.start()
+        dispatchers = observer_threads()
+        second_queue: Queue = Queue()
+        second = WatchdogObserver(
+            second_queue, StubHandler(str(tmp_path / "second")), registry=registry
+        )
+        second.start()
+        try:
+            # The new watch adds an emitter but not another Observer
+            assert observer_threads() == dispatchers
+            first.stop()
+            assert registry.is_running is True
+            (tmp_path / "first" / "test.txt").write_text("test")
+            (tmp_path / "second" / "test.txt").write_text("test")
+            assert next_path(second_queue) == str(tmp_path / "second" / "test.txt")
+            assert first_queue.empty()
+        finally:
+            second.stop()
+            registry.shutdown()
+        assert registry.is_running is False
+
+    def test_registry_shares_watch_of_same_path(self, tmp_path) -> None:
+        registry = ObserverRegistry()
+        queues: list[Queue] = [Queue(), Queue()]
+        observers = [
+            WatchdogObserver(file_queue, StubHandler(str(tmp_path)), registry=registry)
+            for file_queue in queues
+        ]
+        for observer in observers:
+            observer.start()
+        try:
+            assert registry.watches == 1
+            observers[0].stop()
+            assert registry.watches == 1
+            (tmp_path / "test.txt").write_text("test")
+            assert next_path(queues[1]) == str(tmp_path / "test.txt")
+        finally:
+            observers[1].stop()
+            registry.shutdown()
+        assert registry.watches == 0
+
+    def test_registry_missing_path(self, tmp_path) -> None:
+        registry = ObserverRegistry()
+        with pytest.raises(ObserverRegistryError):
+            registry.add(
+                WatchdogObserver(Queue(), StubHandler(str(tmp_path))),
+                str(tmp_path / "missing"),
+                False,
+            )
+        registry.shutdown()
+
+    def test_watchdog_observer_missing_source(self, tmp_path) -> None:
+        observer = WatchdogObserver(Queue(), StubHandler(str(tmp_path / "missing")))
+        with pytest.raises(WatchdogObserverError):
+            observer.start()
+        observer.stop()
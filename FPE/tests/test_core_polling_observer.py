@@ -0,0 +1,193 @@
+"""TEST"""
+# pylint: disable=missing-function-docstring, missing-class-docstring, unused-argument
+
+import os
+import pathlib
+from queue import Queue
+import pytest
+
+from tests.common import StubHandler
+from core.coalescer import EventCoalescer
+from core.observers.polling_observer import PollingObserver, PollingObserverError
+
+
+def drain(file_queue: Queue) -> list[str]:
+    events: list[str] = []
+    while not file_queue.empty():
+        events.append(file_queue.get().src_path)
+    return events
+
+
+def age(*paths: pathlib.Path) -> None:
+    # Directories last modified well outside the racy window
+    for path in paths:
+        os.utime(path, (1_000_000, 1_000_000))
+
+
+def create_observer(
+    tmp_path: pathlib.Path, recursive: bool = False, coalescer: EventCoalescer = None  # type: ignore
+) -> tuple[PollingObserver, Queue]:
+    file_queue: Queue = Queue()
+    observer = PollingObserver(
+        file_queue, StubHandler(str(tmp_path), recursive), coalescer, interval=3600
+    )
+    observer.start()
+    return observer, file_queue
+
+
+class TestCorePollingObserver:
+    def test_polling_observer_invalid_interval(self, tmp_path) -> None:
+        with pytest.raises(PollingObserverError):
+            _ = PollingObserver(Queue(), StubHandler(str(tmp_path)), interval=0)
+
+    def test_polling_observer_missing_source(self, tmp_path) -> None:
+        observer = PollingObserver(Queue(), StubHandler(str(tmp_path / "missing")))
+        with pytest.raises(PollingObserverError):
+            observer.start()
+
+    def test_polling_observer_existing_files_not_queued(self, tmp_path) -> None:
+        (tmp_path / "existing.txt").write_text("test")
+        observer, file_queue = create_observer(tmp_path)
+        try:
+            assert observer.files == 1
+            observer.poll()
+            assert file_queue.empty()
+        finally:
+            observer.stop()
+
+    def test_polling_observer_queues_new_file(self, tmp_path) -> None:
+        observer, file_queue = create_observer(tmp_path)
+        try:
+            (tmp_path / "test.txt").write_text("test")
+            observer.poll()
+            assert drain(file_queue) == [str(tmp_path / "test.txt")]
+            observer.poll()
+            assert file_queue.empty()
+        finally:
+            observer.stop()
+
+    def test_polling_observer_queues_replaced_file(self, tmp_path) -> None:
+        (tmp_path / "test.txt").write_text("test")
+        observer, file_queue = create_observer(tmp_path)
+        try:
+            (tmp_path / "test.tmp").write_text("new")
+            os.replace(tmp_path / "test.tmp", tmp_path / "test.txt")
+            observer.poll()
+            assert drain(file_queue) == [str(tmp_path / "test.txt")]
+        finally:
+            observer.stop()
+
+    def test_polling_observer_queues_recreated_file(self, tmp_path) -> None:
+        observer, file_queue = create_observer(tmp_path)
+        try:
+            (tmp_path / "test.txt").write_text("test")
+            observer.poll()
+            assert drain(file_queue) == [str(tmp_path / "test.txt")]
+            inode = (tmp_path / "test.txt").stat().st_ino
+            (tmp_path / "test.txt").unlink()
+            (tmp_path / "test.txt").write_text("recreated")
+            observer.poll()
+            if (tmp_path / "test.txt").stat().st_ino != inode:
+                pytest.skip("Filesystem did not reuse the inode.")
+            assert drain(file_queue) == [str(tmp_path / "test.txt")]
+        finally:
+            observer.stop()
+
+    def test_polling_observer_changed_pending_file_not_requeued(self, tmp_path) -> None:
+        coalescer = EventCoalescer()
+        observer, file_queue = create_observer(tmp_path, coalescer=coalescer)
+        try:
+            (tmp_path / "test.txt").write_text("test")
+            observer.poll()
+            assert drain(file_queue) == [str(tmp_path / "test.txt")]
+            (tmp_path / "test.txt").write_text("longer test")
+            observer.poll()
+            assert file_queue.empty()
+            assert coalescer.duplicates == 1
+        finally:
+            observer.stop()
+
+    def test_polling_observer_unchanged_directories_not_listed(self, tmp_path) -> None:
+        for number in range(10):
+            (tmp_path / str(number)).mkdir()
+            (tmp_path / str(number) / "test.txt").write_text("test")
+        age(tmp_path, *(tmp_path / str(number) for number in range(10)))
+        observer, file_queue = create_observer(tmp_path, True)
+        try:
+            assert observer.files == 10
+            listed = observer.listed
+            observer.poll()
+            assert observer.listed == listed
+            (tmp_path / "5" / "new.txt").write_text("test")
+            observer.poll()
+            assert observer.listed == listed + 1
+            assert drain(file_queue) == [str(tmp_path / "5" / "new.txt")]
+        finally:
+            observer.stop()
+
+    def test_polling_observer_queues_files_in_new_directory(self, tmp_path) -> None:
+        observer, file_queue = create_observer(tmp_path, True)
+        try:
+            (tmp_path / "new" / "deeper").mkdir(parents=True)
+            (tmp_path / "new" / "deeper" / "test.txt").write_text("test")
+            observer.poll()
+            assert drain(file_queue) == [str(tmp_path / "new" / "deeper" / "test.txt")]
+        finally:
+            observer.stop()
+
+    def test_polling_observer_not_recursive(self, tmp_path) -> None:
+        observer, file_queue = create_observer(tmp_path)
+        try:
+            (tmp_path / "new").mkdir()
+            (tmp_path / "new" / "test.txt").write_text("test")
+            observer.poll()
+            assert file_queue.empty()
+        finally:
+            observer.stop()
+
+    def test_polling_observer_forgets_removed_directory(self, tmp_path) -> None:
+        (tmp_path / "old").mkdir()
+        (tmp_path / "old" / "test.txt").write_text("test")
+        observer, file_queue = create_observer(tmp_path, True)
+        try:
+            assert observer.files == 1
+            (tmp_path / "old" / "test.txt").unlink()
+            (tmp_path / "old").rmdir()
+            observer.poll()
+            assert observer.files == 0
+        finally:
+            observer.stop()
+
+    def test_polling_observer_offers_to_coalescer(self, tmp_path) -> None:
+        coalescer = EventCoalescer()
+        observer, file_queue = create_observer(tmp_path, coalescer=coalescer)
+        try:
+            coalescer.offer(str(tmp_path / "test.txt"))
+            (tmp_path / "test.txt").write_text("test")
+            observer.poll()
+            assert file_queue.empty()
+        finally:
+            observer.stop()
+
+    def test_polling_observer_add_root(self, tmp_path) -> None:
+        (tmp_path / "first").mkdir()
+        (tmp_path / "second").mkdir()
+        (tmp_path / "second" / "existing.txt").write_text("test")
+        file_queue: Queue = Queue()
+        observer = PollingObserver(
+            file_queue,
+            StubHandler(str(tmp_path)),
+            interval=3600,
+            roots=[str(tmp_path / "first")],
+        )
+        observer.start()
+        try:
+            observer.add_root(str(tmp_path / "second"), emit=True)
+            assert drain(file_queue) == [str(tmp_path / "second" / "existing.txt")]
+            assert observer.roots == [str(tmp_path / "first"), str(tmp_path / "second")]
+            (tmp_path / "first" / "test.txt").write_text("test")
+            (tmp_path / "test.txt").write_text("test")
+            observer.poll()
+            assert drain(file_queue) == [str(tmp_path / "first" / "test.txt")]
+        finally:
+            observer.stop()
@@ -0,0 +1,94 @@
+"""TEST"""
+# pylint: disable=missing-function-docstring, missing-class-docstring, unused-argument
+
+import pathlib
+import pytest
+
+from tests.common import (
+    create_test_file,
+    create_copyfile_config,
+    remove_source_destination,
+)
+from core.constants import CONFIG_SOURCE, CONFIG_DESTINATION, CONFIG_NAME, CONFIG_TYPE
+from core.config import ConfigDict
+from core.factory import Factory
+from core.process_handler import ProcessPoolHandler, ProcessPoolHandlerError
+from builtin.copyfile_handler import CopyFileHandler
+
+
+@pytest.fixture(name="generate_copyfile_config")
+def fixture_generate_copyfile_config() -> ConfigDict:
+    Factory.clear()
+    Factory.register("CopyFile", CopyFileHandler)
+
+    copyfile_config: ConfigDict = create_copyfile_config()
+
+    yield copyfile_config
+
+    remove_source_destination(copyfile_config)
+
+
+class TestCoreProcessHandler:
+    def test_process_handler_pass_none_as_config(self) -> None:
+        with pytest.raises(ProcessPoolHandlerError):
+            _ = ProcessPoolHandler(None, 1)  # type: ignore
+
+    def test_process_handler_with_invalid_worker_count(
+        self, generate_copyfile_config: ConfigDict
+    ) -> None:
+        with pytest.raises(ProcessPoolHandlerError):
+            _ = ProcessPoolHandler(generate_copyfile_config, 0)
+
+    def test_process_handler_with_unknown_handler_type(
+        self, generate_copyfile_config: ConfigDict
+    ) -> None:
+        generate_copyfile_config[CONFIG_TYPE] = "Unknown"
+        with pytest.raises(ProcessPoolHandlerError):
+            _ = ProcessPoolHandler(generate_copyfile_config, 1)
+
+    def test_process_handler_does_not_create_handler_in_parent(
+        self, generate_copyfile_config: ConfigDict
+    ) -> None:
+        created: list[ConfigDict] = []
+
+        def create_handler(handler_config: ConfigDict) -> CopyFileHandler:
+            created.append(handler_config)
+            return CopyFileHandler(handler_config)
+
+        Factory.register("CopyFile", create_handler)
+        handler = ProcessPoolHandler(generate_copyfile_config, 1)
+        assert created == []
+        assert handler.name == generate_copyfile_config[CONFIG_NAME]
+        assert handler.source == str(pathlib.Path(generate_copyfile_config[CONFIG_SOURCE]))
+
+    def test_process_handler_copy_files_in_worker_processes(
+        self, generate_copyfile_config: ConfigDict
+    ) -> None:
+        handler = ProcessPoolHandler(generate_copyfile_config, 2)
+        assert handler.source == str(pathlib.Path(generate_copyfile_config[CONFIG_SOURCE]))
+        for file_number in range(4):
+            source_path = pathlib.Path(handler.source) / f"test{file_number}.txt"
+            create_test_file(source_path)
+            assert handler.process(source_path) is True
+        handler.close()
+        for file_number in range(4):
+            assert (
+                pathlib.Path(generate_copyfile_config[CONFIG_DESTINATION])
+                / f"test{file_number}.txt"
+            ).exists()
+        assert handler.errors == 0
+
+    def test_process_handler_errors_returned_to_parent(
+        self, generate_copyfile_config: ConfigDict
+    ) -> None:
+        handler = ProcessPoolHandler(generate_copyfile_config, 1)
+        source_path = pathlib.Path(handler.source) / "test.txt"
+        create_test_file(source_path)
+        destination_path = pathlib.Path(generate_copyfile_config[CONFIG_DESTINATION])
+        if destination_path.exists():
+            destination_path.rmdir()
+        destination_path.write_text("")
+        assert handler.process(source_path) is False
+        handler.close()
+        assert handler.errors == 1
+        destination_path.unlink()
@@ -0,0 +1,168 @@
+"""TEST"""
+# pylint: disable=missing-function-docstring, missing-class-docstring, unused-argument
+
+import time
+import threading
+from queue import Queue
+import pytest
+
+from core.event import FileEvent
+from core.file_queue import FileQueue
+from core.scheduler import WorkerScheduler, WorkerSchedulerError
+
+
+class Recorder:
+    def __init__(self, gate: threading.Event | None = None, result: bool = True) -> None:
+        self.gate = gate
+        self.result = result
+        self.handled: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def handle(self, event: FileEvent) -> bool:
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if self.gate is not None:
+            self.gate.wait()
+        else:
+            time.sleep(0.001)
+        with self.lock:
+            self.in_flight -= 1
+            self.handled.append(event.src_path)
+        return self.result
+
+
+def fill_queue(name: str, count: int) -> FileQueue:
+    file_queue: FileQueue = FileQueue()
+    for file_number in range(count):
+        file_queue.put(FileEvent(f"/{name}/test{file_number}.txt"))
+    return file_queue
+
+
+def wait_for(condition, timeout: float = 10.0) -> None:
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+
+
+class TestCoreScheduler:
+    def test_scheduler_with_no_workers(self) -> None:
+        with pytest.raises(WorkerSchedulerError):
+            _ = WorkerScheduler(0)
+
+    def test_scheduler_register_twice(self) -> None:
+        scheduler = WorkerScheduler(1)
+        scheduler.register("test", FileQueue(), Recorder().handle)
+        with pytest.raises(WorkerSchedulerError):
+            scheduler.register("test", FileQueue(), Recorder().handle)
+        scheduler.shutdown()
+
+    def test_scheduler_register_invalid_weight(self) -> None:
+        scheduler = WorkerScheduler(1)
+        with pytest.raises(WorkerSchedulerError):
+            scheduler.register("test", FileQueue(), Recorder().handle, weight=0)
+
+    def test_scheduler_register_plain_queue(self) -> None:
+        scheduler = WorkerScheduler(1)
+        with pytest.raises(WorkerSchedulerError):
+            scheduler.register("test", Queue(), Recorder().handle)
+
+    def test_scheduler_processes_queued_and_new_events(self) -> None:
+        scheduler = WorkerScheduler(2)
+        recorder = Recorder()
+        file_queue = fill_queue("test", 10)
+        scheduler.register("test", file_queue, recorder.handle)
+        for file_number in range(10, 20):
+            file_queue.put(FileEvent(f"/test/test{file_number}.txt"))
+        wait_for(lambda: len(recorder.handled) == 20)
+        scheduler.shutdown()
+        assert len(recorder.handled) == 20
+
+    def test_scheduler_higher_priority_served_first(self) -> None:
+        scheduler = WorkerScheduler(1)
+        recorder = Recorder()
+        scheduler.register("high", fill_queue("high", 20), recorder.handle, priority=1)
+        scheduler.register("low", fill_queue("low", 20), recorder.handle)
+        wait_for(lambda: len(recorder.handled) == 40)
+        scheduler.shutdown()
+        assert all(path.startswith("/high") for path in recorder.handled[:20])
+
+    def test_scheduler_weighted_fair_share(self) -> None:
+        scheduler = WorkerScheduler(1)
+        gate = threading.Event()
+        recorder = Recorder(gate)
+        scheduler.register("heavy", fill_queue("heavy", 40), recorder.handle, weight=3)
+        scheduler.register("light", fill_queue("light", 40), recorder.handle)
+        gate.set()
+        wait_for(lambda: len(recorder.handled) == 80)
+        scheduler.shutdown()
+        heavy = [path for path in recorder.handled[:20] if path.startswith("/heavy")]
+        assert 14 <= len(heavy) <= 16
+
+    def test_scheduler_idle_queue_rejoins_at_virtual_time(self) -> None:
+        scheduler = WorkerScheduler(1)
+        gate = threading.Event()
+        gate.set()
+        recorder = Recorder(gate)
+        busy = fill_queue("busy", 40)
+        idle = FileQueue()
+        scheduler.register("busy", busy, recorder.handle)
+        scheduler.register("idle", idle, recorder.handle)
+        wait_for(lambda: len(recorder.handled) == 40)
+        # Hold the worker while both queues are filled
+        gate.clear()
+        busy.put(FileEvent("/busy/hold.txt"))
+        wait_for(lambda: recorder.in_flight == 1)
+        for file_number in range(20):
+            busy.put(FileEvent(f"/busy/more{file_number}.txt"))
+            idle.put(FileEvent(f"/idle/test{file_number}.txt"))
+        gate.set()
+        wait_for(lambda: len(recorder.handled) == 81)
+        scheduler.shutdown()
+        rejoined = [path for path in recorder.handled[41:61] if path.startswith("/idle")]
+        assert 9 <= len(rejoined) <= 11
+
+    def test_scheduler_concurrency_per_queue(self) -> None:
+        scheduler = WorkerScheduler(4)
+        single = Recorder()
+        double = Recorder()
+        scheduler.register("single", fill_queue("single", 20), single.handle)
+        scheduler.register("double", fill_queue("double", 20), double.handle, concurrency=2)
+        wait_for(lambda: len(single.handled) + len(double.handled) == 40)
+        scheduler.shutdown()
+        assert single.max_in_flight == 1
+        assert double.max_in_flight <= 2
+
+    def test_scheduler_threads_do_not_grow_with_watchers(self) -> None:
+        threads = threading.active_count()
+        scheduler = WorkerScheduler(2)
+        for watcher_number in range(50):
+            scheduler.register(f"test{watcher_number}", FileQueue(), Recorder().handle)
+        assert threading.active_count() == threads + 2
+        assert len(scheduler.watchers) == 50
+        scheduler.shutdown()
+        assert threading.active_count() == threads
+
+    def test_scheduler_unregister_stops_processing(self) -> None:
+        scheduler = WorkerScheduler(1)
+        recorder = Recorder()
+        file_queue: FileQueue = FileQueue()
+        scheduler.register("test", file_queue, recorder.handle)
+        scheduler.unregister("test")
+        assert file_queue.listener is None
+        file_queue.put(FileEvent("/test/test.txt"))
+        time.sleep(0.1)
+        scheduler.shutdown()
+        assert recorder.handled == []
+        assert scheduler.watchers == []
+
+    def test_scheduler_failed_queue_is_not_served(self) -> None:
+        scheduler = WorkerScheduler(1)
+        recorder = Recorder(result=False)
+        scheduler.register("test", fill_queue("test", 5), recorder.handle)
+        wait_for(lambda: len(recorder.handled) == 1)
+        time.sleep(0.1)
+        scheduler.shutdown()
+        assert len(recorder.handled) == 1
@@ -0,0 +1,75 @@
+"""TEST"""
+# pylint: disable=missing-function-docstring, missing-class-docstring, unused-argument
+
+import os
+from queue import Queue, Empty
+import pytest
+from watchdog.events import FileModifiedEvent
+
+from tests.common import StubHandler
+from core.event import FileEvent
+from core.coalescer import EventCoalescer
+from core.observers.ignore_filter import IgnoreFilter, IGNORE_PATTERNS
+from core.observers.watchdog_observer import WatchdogObserver
+
+
+@pytest.fixture(name="observed")
+def fixture_observed(tmp_path):
+    (tmp_path / "source").mkdir()
+    file_queue: Queue = Queue()
+    observer = WatchdogObserver(
+        file_queue,
+        StubHandler(str(tmp_path / "source")),
+        ignore=IgnoreFilter(IGNORE_PATTERNS),
+    )
+    observer.start()
+    yield tmp_path / "source", file_queue
+    observer.stop()
+
+
+def next_event(file_queue: Queue) -> FileEvent:
+    return file_queue.get(timeout=5)
+
+
+class TestCoreWatchdogObserver:
+    def test_watchdog_observer_queues_created_file(self, observed) -> None:
+        source, file_queue = observed
+        (source / "test.txt").write_text("test")
+        event = next_event(file_queue)
+        assert event.src_path == str(source / "test.txt")
+        assert event.complete is False
+
+    def test_watchdog_observer_renamed_into_place_is_complete(self, observed) -> None:
+        source, file_queue = observed
+        (source / "test.tmp").write_text("test")
+        os.rename(source / "test.tmp", source / "test.txt")
+        event = next_event(file_queue)
+        assert event.src_path == str(source / "test.txt")
+        assert event.complete is True
+        with pytest.raises(Empty):
+            file_queue.get(timeout=0.2)
+
+    def test_watchdog_observer_ignores_temporary_files(self, observed) -> None:
+        source, file_queue = observed
+        (source / "test.part").write_text("test")
+        with pytest.raises(Empty):
+            file_queue.get(timeout=0.2)
+
+    def test_watchdog_observer_ignores_moves_out_of_source(self, observed) -> None:
+        source, file_queue = observed
+        (source / "test.tmp").write_text("test")
+        os.rename(source / "test.tmp", source.parent / "test.txt")
+        with pytest.raises(Empty):
+            file_queue.get(timeout=0.2)
+
+    def test_watchdog_observer_modified_bytes_path_refreshes_pending(
+        self, tmp_path
+    ) -> None:
+        coalescer = EventCoalescer(1.0)
+        observer = WatchdogObserver(
+            Queue(), StubHandler(str(tmp_path)), coalescer=coalescer
+        )
+        src_path = str(tmp_path / "test.txt")
+        assert coalescer.offer(src_path) is True
+        observer.on_modified(FileModifiedEvent(os.fsencode(src_path)))
+        assert coalescer.duplicates == 1
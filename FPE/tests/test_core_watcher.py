@@ -12,16 +12,34 @@ from tests.common import (
     remove_source_destination,
 )
 from core.constants import (
+    CONFIG_NAME,
     CONFIG_SOURCE,
     CONFIG_DESTINATION,
     CONFIG_DELETESOURCE,
     CONFIG_RECURSIVE,
+    CONFIG_WORKERS,
+    CONFIG_ORDERED,
+    CONFIG_EXECUTOR,
+    CONFIG_DEBOUNCE,
+    CONFIG_COMPLETION,
+    CONFIG_JOURNAL,
+    CONFIG_BACKLOG,
+    CONFIG_CONNECTIONS,
+    CONFIG_OBSERVER,
+    OBSERVER_INOTIFY,
+    OBSERVER_POLLING,
+    CONFIG_POLLINTERVAL,
+    CONFIG_IGNOREPATTERNS,
 )
 from core.config import ConfigDict
 from core.watcher import Watcher, WatcherError
 from core.factory import Factory
+from core.event import FileEvent
+from core.journal import JournalQueue
+from core.scheduler import WorkerScheduler
 from builtin.copyfile_handler import CopyFileHandler
 from builtin.ftp_copyfile_handler import FTPCopyFileHandler
+from core import inotify
 
 
 @pytest.fixture(name="generate_config")
@@ -147,6 +165,219 @@ class TestCoreWatcher:
     ) -> None:
         self.__copy_count_files(generate_config, 10)
 
+    def test_watcher_copy_ten_files_with_four_workers(
+        self, generate_config: ConfigDict
+    ) -> None:
+        generate_config[CONFIG_WORKERS] = 4
+        self.__copy_count_files(generate_config, 10)
+
+    def test_watcher_copy_ten_files_with_four_ordered_workers(
+        self, generate_config: ConfigDict
+    ) -> None:
+        generate_config[CONFIG_WORKERS] = 4
+        generate_config[CONFIG_ORDERED] = True
+        self.__copy_count_files(generate_config, 10)
+
+    def test_watcher_copy_ten_files_with_process_executor(
+        self, generate_config: ConfigDict
+    ) -> None:
+        generate_config[CONFIG_EXECUTOR] = "process"
+        generate_config[CONFIG_WORKERS] = 2
+        self.__copy_count_files(generate_config, 10)
+
+    def test_watcher_copy_ten_files_with_async_executor(
+        self, generate_config: ConfigDict
+    ) -> None:
+        generate_config[CONFIG_EXECUTOR] = "async"
+        self.__copy_count_files(generate_config, 10)
+
+    def test_watcher_copy_ten_files_with_debounce(
+        self, generate_config: ConfigDict
+    ) -> None:
+        generate_config[CONFIG_DEBOUNCE] = 0.1
+        self.__copy_count_files(generate_config, 10)
+
+    def test_watcher_copy_a_single_file_with_marker_completion(
+        self, generate_config: ConfigDict
+    ) -> None:
+        generate_config[CONFIG_COMPLETION] = "marker"
+        watcher = Watcher(generate_config, self.__failure_callback)
+        watcher.start()
+        source_path = pathlib.Path(generate_config[CONFIG_SOURCE]) / "test.txt"
+        create_test_file(source_path)
+        time.sleep(0.5)
+        assert watcher.files_processed == 0
+        (source_path.parent / "test.txt.done").touch()
+        self.__wait_for_processed_files(watcher, 1)
+        watcher.stop()
+        assert source_path.exists() is False
+        assert (source_path.parent / "test.txt.done").exists() is False
+        assert (
+            pathlib.Path(generate_config[CONFIG_DESTINATION]) / "test.txt"
+        ).exists() is True
+
+    def test_watcher_file_renamed_into_place_skips_completion(
+        self, generate_config: ConfigDict
+    ) -> None:
+        generate_config[CONFIG_COMPLETION] = "marker"
+        generate_config[CONFIG_IGNOREPATTERNS] = ["*.tmp"]
+        watcher = Watcher(generate_config, self.__failure_callback)
+        watcher.start()
+        source_path = pathlib.Path(generate_config[CONFIG_SOURCE]) / "test.txt"
+        create_test_file(source_path.with_suffix(".tmp"))
+        source_path.with_suffix(".tmp").rename(source_path)
+        self.__wait_for_processed_files(watcher, 1)
+        watcher.stop()
+        assert watcher.files_processed == 1
+        assert (
+            pathlib.Path(generate_config[CONFIG_DESTINATION]) / "test.txt"
+        ).exists() is True
+
+    def test_watcher_invalid_completion(self, generate_config: ConfigDict) -> None:
+        generate_config[CONFIG_COMPLETION] = "hopeful"
+        with pytest.raises(WatcherError):
+            _ = Watcher(generate_config, self.__failure_callback)
+
+    def test_watcher_replays_journal_on_start(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        generate_config[CONFIG_JOURNAL] = str(tmp_path / "journal.db")
+        source_path = pathlib.Path(generate_config[CONFIG_SOURCE]) / "test.txt"
+        create_test_file(source_path)
+        journal = JournalQueue(generate_config[CONFIG_JOURNAL])
+        journal.put(FileEvent(str(source_path)))
+        journal.close()
+        watcher = Watcher(generate_config, self.__failure_callback)
+        watcher.start()
+        self.__wait_for_processed_files(watcher, 1)
+        watcher.stop()
+        assert source_path.exists() is False
+        assert (
+            pathlib.Path(generate_config[CONFIG_DESTINATION]) / "test.txt"
+        ).exists() is True
+        journal = JournalQueue(generate_config[CONFIG_JOURNAL])
+        assert journal.journaled == 0
+        journal.close()
+
+    def test_watcher_stop_closes_journal_and_restart_reopens_it(
+        self, generate_config: ConfigDict
+    ) -> None:
+        generate_config[CONFIG_JOURNAL] = str(
+            pathlib.Path(generate_config[CONFIG_SOURCE]).parent / "journal.db"
+        )
+        watcher = Watcher(generate_config, self.__failure_callback)
+        watcher.start()
+        watcher.stop()
+        source_path = pathlib.Path(generate_config[CONFIG_SOURCE]) / "test.txt"
+        create_test_file(source_path)
+        journal = JournalQueue(generate_config[CONFIG_JOURNAL])
+        journal.put(FileEvent(str(source_path)))
+        journal.close()
+        watcher.start()
+        self.__wait_for_processed_files(watcher, 1)
+        watcher.stop()
+        assert source_path.exists() is False
+
+    def test_watcher_processes_backlog_on_start(
+        self, generate_config: ConfigDict
+    ) -> None:
+        generate_config[CONFIG_BACKLOG] = True
+        source_path = pathlib.Path(generate_config[CONFIG_SOURCE])
+        for file_number in range(5):
+            create_test_file(source_path / f"test{file_number}.txt")
+        watcher = Watcher(generate_config, self.__failure_callback)
+        watcher.start()
+        self.__wait_for_processed_files(watcher, 5)
+        watcher.stop()
+        assert watcher.files_processed == 5
+        assert len(list(source_path.iterdir())) == 0
+
+    def test_watcher_backlog_skips_files_replayed_from_journal(
+        self, generate_config: ConfigDict, tmp_path
+    ) -> None:
+        generate_config[CONFIG_JOURNAL] = str(tmp_path / "journal.db")
+        generate_config[CONFIG_BACKLOG] = True
+        generate_config[CONFIG_DEBOUNCE] = 0
+        generate_config[CONFIG_DELETESOURCE] = False
+        source_path = pathlib.Path(generate_config[CONFIG_SOURCE])
+        journal = JournalQueue(generate_config[CONFIG_JOURNAL])
+        for file_number in range(3):
+            create_test_file(source_path / f"test{file_number}.txt")
+            journal.put(FileEvent(str(source_path / f"test{file_number}.txt")))
+        journal.close()
+        watcher = Watcher(generate_config, self.__failure_callback)
+        watcher.start()
+        self.__wait_for_processed_files(watcher, 3)
+        time.sleep(0.5)
+        watcher.stop()
+        assert watcher.files_processed == 3
+
+    def test_watcher_with_shared_scheduler(self, generate_config: ConfigDict) -> None:
+        scheduler = WorkerScheduler(2)
+        watcher = Watcher(generate_config, self.__failure_callback, scheduler)
+        watcher.start()
+        assert scheduler.watchers == [generate_config[CONFIG_NAME]]
+        source_path = pathlib.Path(generate_config[CONFIG_SOURCE])
+        for file_number in range(5):
+            create_test_file(source_path / f"test{file_number}.txt")
+        self.__wait_for_processed_files(watcher, 5)
+        watcher.stop()
+        scheduler.shutdown()
+        assert watcher.files_processed == 5
+        assert scheduler.watchers == []
+
+    def test_watcher_metrics(self, generate_config: ConfigDict) -> None:
+        watcher = Watcher(generate_config, self.__failure_callback)
+        watcher.start()
+        source_path = pathlib.Path(generate_config[CONFIG_SOURCE])
+        for file_number in range(5):
+            create_test_file(source_path / f"test{file_number}.txt")
+        self.__wait_for_processed_files(watcher, 5)
+        watcher.stop()
+        metrics = watcher.metrics
+        assert metrics["files_processed"] == 5
+        assert metrics["bytes_processed"] > 0
+        assert metrics["queue_wait_seconds"]["count"] == 5
+        assert metrics["processing_seconds"]["count"] == 5
+        assert metrics["queue_depth"] == 0
+        assert metrics["duplicates_dropped"] == watcher.duplicates_dropped
+
+    def test_watcher_invalid_executor(self, generate_config: ConfigDict) -> None:
+        generate_config[CONFIG_EXECUTOR] = "quantum"
+        with pytest.raises(WatcherError):
+            _ = Watcher(generate_config, self.__failure_callback)
+
+    def test_watcher_workers_default_to_connections(
+        self, generate_config: ConfigDict
+    ) -> None:
+        generate_config[CONFIG_CONNECTIONS] = 3
+        _ = Watcher(generate_config, self.__failure_callback)
+        assert generate_config[CONFIG_WORKERS] == 3
+
+    @pytest.mark.skipif(not inotify.available(), reason="inotify only on Linux")
+    def test_watcher_copy_ten_files_with_inotify_observer(
+        self, generate_config: ConfigDict
+    ) -> None:
+        generate_config[CONFIG_OBSERVER] = OBSERVER_INOTIFY
+        self.__copy_count_files(generate_config, 10)
+
+    def test_watcher_copy_ten_files_with_polling_observer(
+        self, generate_config: ConfigDict
+    ) -> None:
+        generate_config[CONFIG_OBSERVER] = OBSERVER_POLLING
+        generate_config[CONFIG_POLLINTERVAL] = 0.05
+        self.__copy_count_files(generate_config, 10)
+
+    def test_watcher_invalid_observer(self, generate_config: ConfigDict) -> None:
+        generate_config[CONFIG_OBSERVER] = "unknown"
+        with pytest.raises(WatcherError):
+            _ = Watcher(generate_config)
+
+    def test_watcher_invalid_workers(self, generate_config: ConfigDict) -> None:
+        generate_config[CONFIG_WORKERS] = "many"
+        with pytest.raises(WatcherError):
+            _ = Watcher(generate_config, self.__failure_callback)
+
     @pytest.mark.skip(reason="takes to long")
     def test_watcher_copy_fifty_files_from_source_to_destination(
         self, generate_config: ConfigDict